@@ -0,0 +1,246 @@
+"""
+Backlog-Modus über die Anthropic Message Batches API
+
+Nach einer Downtime oder einem viralen Moment können hunderte Mentions
+warten. Statt sie einzeln synchron (und zum vollen Preis) zu generieren,
+werden die Generierungen als Batches eingereicht. Ein Hintergrund-Thread
+pollt die Batches und übergibt jedes Ergebnis an einen Callback (der die
+Antwort postet), sobald der jeweilige Batch fertig ist.
+
+Der Backlog wird in mehrere kleinere Batches aufgeteilt, damit die ersten
+Antworten nicht erst kommen, wenn der letzte Request verarbeitet ist.
+Live-Traffic bleibt währenddessen auf dem schnellen synchronen Pfad.
+
+Mit einem store werden die laufenden Batches (Batch-ID → Job-Schlüssel)
+persistiert. Nach einem Neustart nimmt resume() sie wieder auf - die Jobs
+gelten dann weiter als "im Batch" (pending_keys) und werden nicht ein
+zweites Mal generiert.
+"""
+
+import threading
+import time
+
+# Schlüssel im store für die laufenden Batches
+STORE_KEY = 'pending_batches'
+
+
+class BatchRunner:
+    """
+    Reicht Jobs als Message Batches ein und verarbeitet die Ergebnisse
+
+    Args:
+        claude: ClaudeClient (bzw. Objekt mit .client.messages.batches)
+        build_params: Funktion job -> Parameter für messages.create
+        on_result: Funktion (job, antwort_text_oder_None) für jedes Ergebnis
+        job_key: Funktion job -> eindeutiger Schlüssel (gegen Doppelverarbeitung)
+        poll_interval: Sekunden zwischen zwei Status-Abfragen
+        chunk_size: Max. Requests pro Batch
+        store: Optional Key-Value-Speicher (get/set/delete, z.B. StateStore)
+               für die laufenden Batches
+        load_job: Funktion Schlüssel -> Job oder None (für resume)
+    """
+
+    def __init__(self, claude, build_params, on_result, job_key,
+                 poll_interval=30, chunk_size=50, store=None, load_job=None):
+        self.claude = claude
+        self.build_params = build_params
+        self.on_result = on_result
+        self.job_key = job_key
+        self.poll_interval = poll_interval
+        self.chunk_size = max(1, int(chunk_size))
+        self.store = store
+        self.load_job = load_job
+
+        # batch_id -> {custom_id: job}
+        self._pending = {}
+        self._keys = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def is_pending(self, job):
+        """True wenn der Job bereits in einem laufenden Batch steckt"""
+        with self._lock:
+            return self.job_key(job) in self._keys
+
+    def pending_keys(self):
+        """Schlüssel aller Jobs in noch nicht abgeschlossenen Batches"""
+        with self._lock:
+            return set(self._keys)
+
+    def pending_count(self):
+        """Anzahl Jobs in noch nicht abgeschlossenen Batches"""
+        with self._lock:
+            return len(self._keys)
+
+    def resume(self):
+        """
+        Nimmt nach einem Neustart die im store gesicherten Batches wieder auf
+
+        Returns:
+            Anzahl wieder aufgenommener Jobs
+        """
+        if self.store is None or self.load_job is None:
+            return 0
+
+        resumed = 0
+        for batch_id, keys in (self.store.get(STORE_KEY) or {}).items():
+            by_id = {}
+            for custom_id, key in keys.items():
+                job = self.load_job(key)
+                if job is not None:
+                    by_id[custom_id] = job
+
+            with self._lock:
+                if batch_id in self._pending:
+                    continue
+                self._pending[batch_id] = by_id
+                self._keys.update(self.job_key(job) for job in by_id.values())
+            resumed += len(by_id)
+            print(f"♻️  Batch {batch_id} wieder aufgenommen ({len(by_id)} Requests)")
+
+        self._ensure_polling()
+        return resumed
+
+    def _persist(self):
+        """Sichert Batch-ID → {custom_id: Job-Schlüssel} der laufenden Batches"""
+        if self.store is None:
+            return
+        with self._lock:
+            pending = {
+                batch_id: {custom_id: self.job_key(job) for custom_id, job in by_id.items()}
+                for batch_id, by_id in self._pending.items()
+            }
+        if pending:
+            self.store.set(STORE_KEY, pending)
+        else:
+            self.store.delete(STORE_KEY)
+
+    def wait(self, timeout=None):
+        """Wartet bis alle eingereichten Batches verarbeitet sind"""
+        thread = self._thread
+        if thread:
+            thread.join(timeout)
+        return self.pending_count() == 0
+
+    def submit(self, jobs):
+        """
+        Reicht Jobs in Batches zu je chunk_size Requests ein
+
+        Returns:
+            Anzahl eingereichter Jobs
+        """
+        jobs = [job for job in jobs if not self.is_pending(job)]
+        submitted = 0
+
+        for start in range(0, len(jobs), self.chunk_size):
+            chunk = jobs[start:start + self.chunk_size]
+            by_id = {f"job-{start + i}": job for i, job in enumerate(chunk)}
+
+            requests = []
+            for custom_id, job in by_id.items():
+                params = dict(self.build_params(job))
+                params.setdefault('model', self.claude.model)
+                requests.append({'custom_id': custom_id, 'params': params})
+
+            try:
+                batch = self.claude.client.messages.batches.create(requests=requests)
+            except Exception as e:
+                print(f"❌ Fehler beim Einreichen des Batches: {e}")
+                # Ergebnisse als fehlgeschlagen melden, damit der Aufrufer aufräumen kann
+                for job in chunk:
+                    self._deliver(job, None)
+                continue
+
+            with self._lock:
+                self._pending[batch.id] = by_id
+                self._keys.update(self.job_key(job) for job in chunk)
+            self._persist()
+
+            submitted += len(chunk)
+            print(f"📦 Batch {batch.id} eingereicht ({len(chunk)} Requests)")
+
+        self._ensure_polling()
+        return submitted
+
+    def _ensure_polling(self):
+        """Startet den Poll-Thread falls er nicht schon läuft"""
+        with self._lock:
+            if not self._pending:
+                return
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._poll_loop, name='batch-poll', daemon=True)
+            self._thread.start()
+
+    def _poll_loop(self):
+        """Pollt alle offenen Batches bis keiner mehr aussteht"""
+        while True:
+            with self._lock:
+                batch_ids = list(self._pending)
+            if not batch_ids:
+                return
+
+            for batch_id in batch_ids:
+                try:
+                    batch = self.claude.client.messages.batches.retrieve(batch_id)
+                except Exception as e:
+                    print(f"⚠️ Konnte Batch-Status von {batch_id} nicht abfragen: {e}")
+                    continue
+
+                if batch.processing_status == 'ended':
+                    self._collect(batch_id)
+
+            with self._lock:
+                if not self._pending:
+                    return
+            time.sleep(self.poll_interval)
+
+    def _collect(self, batch_id):
+        """Holt die Ergebnisse eines fertigen Batches und übergibt sie"""
+        with self._lock:
+            by_id = self._pending.get(batch_id, {})
+
+        delivered = set()
+        try:
+            for entry in self.claude.client.messages.batches.results(batch_id):
+                job = by_id.get(entry.custom_id)
+                if job is None:
+                    continue
+
+                text = None
+                if entry.result.type == 'succeeded':
+                    text = entry.result.message.content[0].text
+                else:
+                    print(f"⚠️ Batch-Request {entry.custom_id}: {entry.result.type}")
+
+                delivered.add(entry.custom_id)
+                self._deliver(job, text)
+        except Exception as e:
+            print(f"⚠️ Fehler beim Abholen der Batch-Ergebnisse von {batch_id}: {e}")
+            # Bereits übergebene Ergebnisse beim nächsten Versuch nicht doppelt posten
+            with self._lock:
+                for custom_id in delivered:
+                    job = by_id.pop(custom_id)
+                    self._keys.discard(self.job_key(job))
+            self._persist()
+            return
+
+        # Requests ohne Ergebnis-Eintrag gelten als fehlgeschlagen
+        for custom_id, job in by_id.items():
+            if custom_id not in delivered:
+                self._deliver(job, None)
+
+        with self._lock:
+            self._pending.pop(batch_id, None)
+            for job in by_id.values():
+                self._keys.discard(self.job_key(job))
+        self._persist()
+
+        print(f"✅ Batch {batch_id} abgeschlossen ({len(delivered)} Ergebnisse)")
+
+    def _deliver(self, job, text):
+        """Ruft den Callback auf - Fehler dort dürfen das Polling nicht stoppen"""
+        try:
+            self.on_result(job, text)
+        except Exception as e:
+            print(f"❌ Fehler beim Verarbeiten eines Batch-Ergebnisses: {e}")
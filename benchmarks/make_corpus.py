@@ -0,0 +1,287 @@
+"""
+Erzeugt die grossen Seiten des Benchmark-Korpus (benchmarks/corpus/*_large.html)
+
+Die handgeschriebenen Korpus-Seiten sind 4-9 KB gross - echte Seiten haben
+100 KB bis 1 MB, vor allem wegen Inline-Skripten (Tracking, Hydration-State
+als JSON), Inline-CSS und -SVG, Mega-Menüs, Sidebars und Link-Footern. Die
+Extraktionskosten wachsen mit diesem Ballast, nicht mit dem Artikeltext.
+
+Fremde Seiten dürfen nicht ins Repository. Deshalb baut dieses Skript zwei
+Seiten mit der Struktur und den Grössenverhältnissen solcher Seiten nach:
+
+- news_portal_large: Newsportal (~300 KB) mit Hydration-JSON, Tracking-
+  und Werbe-Skripten, Mega-Menü, Artikel, Teasern, Kommentaren und Footer
+- docs_portal_large: Dokumentations-Seite (~700 KB) mit riesiger Sidebar,
+  Inline-Suchindex, SVG-Sprite, langem Artikel mit Code und Tabellen
+
+Die Ausgabe ist deterministisch (fester Seed) - die Dateien sind
+eingecheckt, damit Baseline und Messung immer dieselben Bytes sehen.
+Neu erzeugen nur wenn der Korpus bewusst geändert werden soll:
+
+    python benchmarks/make_corpus.py
+"""
+
+import json
+import os
+import random
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(BENCH_DIR, 'corpus')
+
+SUBJECTS = [
+    'Der Stadtrat', 'Die Regierung', 'Das Bundesamt', 'Die Kommission', 'Eine Studie der Universität',
+    'Die Verwaltung', 'Der Verband', 'Die Mehrheit im Parlament', 'Das Forschungsteam', 'Die Gemeinde'
+]
+VERBS = [
+    'hat beschlossen', 'prüft derzeit', 'kritisiert', 'unterstützt', 'verlangt',
+    'plant bis Ende Jahr', 'lehnt ab', 'begrüsst', 'untersucht', 'will ausbauen'
+]
+OBJECTS = [
+    'den Ausbau der Velorouten', 'eine neue Regelung für Mieten', 'die Finanzierung der Schulen',
+    'das Konzept für erneuerbare Energie', 'die Digitalisierung der Verwaltung', 'mehr Grünflächen in den Quartieren',
+    'eine Reform der Pflegeberufe', 'den Schutz der Gewässer', 'die Förderung junger Unternehmen',
+    'tiefere Gebühren für Familien'
+]
+CLAUSES = [
+    'obwohl die Kosten noch nicht bekannt sind', 'weil die Nachfrage seit Jahren steigt',
+    'nachdem mehrere Quartiervereine Einsprache erhoben hatten', 'wie aus einem internen Bericht hervorgeht',
+    'was bei der Opposition auf Widerstand stösst', 'damit die Ziele bis 2030 erreicht werden',
+    'sofern der Kanton die Hälfte der Kosten übernimmt', 'während andere Städte bereits weiter sind'
+]
+WORDS = [
+    'Projekt', 'Umsetzung', 'Bevölkerung', 'Abstimmung', 'Budget', 'Verkehr', 'Wohnungen', 'Energie',
+    'Klima', 'Bildung', 'Gesundheit', 'Quartier', 'Bericht', 'Zahlen', 'Entscheid', 'Frist', 'Antrag',
+    'Vorlage', 'Kanton', 'Gemeinde', 'Region', 'Zukunft', 'Planung', 'Mittel', 'Nutzen', 'Risiko'
+]
+SECTIONS = ['Zürich', 'Schweiz', 'International', 'Wirtschaft', 'Sport', 'Kultur', 'Meinungen',
+            'Leben', 'Wissen', 'Digital', 'Auto', 'Reisen', 'Gesellschaft', 'Podcasts', 'Video']
+
+
+def sentence(rng):
+    text = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+    if rng.random() < 0.6:
+        text += f", {rng.choice(CLAUSES)}"
+    return text + '.'
+
+
+def paragraph(rng, sentences):
+    return ' '.join(sentence(rng) for _ in range(sentences))
+
+
+def title(rng, words=6):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def slug(rng, words=4):
+    return '-'.join(rng.choice(WORDS).lower() for _ in range(words)) + f"-{rng.randrange(10 ** 6)}"
+
+
+def hex_id(rng, length=16):
+    return ''.join(rng.choice('0123456789abcdef') for _ in range(length))
+
+
+def minified_script(rng, functions):
+    """Minifiziertes JavaScript wie aus einem Bundler (nur als Ballast)"""
+    parts = []
+    for i in range(functions):
+        a, b, c = (rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(3))
+        parts.append(
+            f"function _{hex_id(rng, 6)}({a},{b}){{var {c}={a}.{rng.choice(['map', 'filter', 'reduce'])}"
+            f"(function(e){{return e&&e.{rng.choice(['id', 'key', 'ts', 'slot'])}!=={b}?e:null}});"
+            f"return {c}.length>{i % 7}?{c}[{i % 5}]:void 0}}"
+        )
+    return ';'.join(parts)
+
+
+def inline_css(rng, rules):
+    lines = []
+    for _ in range(rules):
+        lines.append(
+            f".c-{hex_id(rng, 6)}{{display:{rng.choice(['flex', 'grid', 'block'])};"
+            f"margin:{rng.randrange(0, 32)}px {rng.randrange(0, 32)}px;"
+            f"color:#{hex_id(rng, 6)};font-size:{rng.randrange(11, 22)}px}}"
+        )
+    return ''.join(lines)
+
+
+def svg_icon(rng, name):
+    points = ' '.join(f"{rng.randrange(24)} {rng.randrange(24)}" for _ in range(30))
+    return f'<symbol id="icon-{name}" viewBox="0 0 24 24"><path d="M{points}Z"/></symbol>'
+
+
+def teaser(rng, base):
+    return (
+        f'<li class="teaser"><a href="{base}/{slug(rng)}">'
+        f'<img src="{base}/img/{hex_id(rng)}.jpg" srcset="{base}/img/{hex_id(rng)}_320.jpg 320w, '
+        f'{base}/img/{hex_id(rng)}_640.jpg 640w" alt="" loading="lazy" width="320" height="180">'
+        f'<span class="kicker">{rng.choice(SECTIONS)}</span><h3>{title(rng)}</h3></a></li>'
+    )
+
+
+def news_portal(rng):
+    base = 'https://www.news.example'
+    article_id = hex_id(rng)
+    headline = 'Stadt plant neues Velonetz - Gewerbe und Quartiere uneins'
+    body = [paragraph(rng, rng.randrange(3, 7)) for _ in range(28)]
+
+    # Hydration-State wie bei Next.js/Nuxt: der ganze Artikel nochmal als JSON plus Teaser, Menüs, Ads
+    state = {
+        'props': {'pageProps': {
+            'article': {'id': article_id, 'title': headline, 'paragraphs': body,
+                        'tags': [rng.choice(WORDS) for _ in range(12)]},
+            'related': [{'id': hex_id(rng), 'title': title(rng), 'url': f"{base}/{slug(rng)}",
+                         'teaser': paragraph(rng, 2), 'image': f"{base}/img/{hex_id(rng)}.jpg"}
+                        for _ in range(120)],
+            'navigation': [{'label': section, 'children': [
+                {'label': title(rng, 2), 'url': f"{base}/{section.lower()}/{slug(rng, 2)}"} for _ in range(20)
+            ]} for section in SECTIONS],
+            'ads': [{'slot': f"ad-{i}", 'sizes': [[300, 250], [728, 90]], 'targeting': {
+                'kw': [rng.choice(WORDS) for _ in range(8)], 'pos': i}} for i in range(40)]
+        }},
+        'buildId': hex_id(rng, 24)
+    }
+
+    out = ['<!DOCTYPE html>\n<html lang="de">\n<head>\n<meta charset="utf-8">',
+           '<meta name="viewport" content="width=device-width, initial-scale=1">',
+           f'<title>{headline} | News Beispiel</title>',
+           f'<meta name="description" content="{sentence(rng)}">',
+           f'<meta property="og:title" content="{headline}">',
+           f'<link rel="canonical" href="{base}/zuerich/{article_id}">']
+    for _ in range(40):
+        out.append(f'<link rel="preload" href="{base}/_next/static/chunks/{hex_id(rng)}.js" as="script">')
+    out.append(f'<style>{inline_css(rng, 900)}</style>')
+    out.append('<script>window.dataLayer=window.dataLayer||[];function gtag(){dataLayer.push(arguments)}'
+               'gtag("js",new Date());gtag("config","G-XXXXXXXXXX",{anonymize_ip:true});</script>')
+    out.append(f'<script>{minified_script(rng, 220)}</script>')
+    out.append('<script type="application/ld+json">' + json.dumps({
+        '@context': 'https://schema.org', '@type': 'NewsArticle', 'headline': headline,
+        'datePublished': '2025-03-11T09:30:00+01:00', 'author': [{'@type': 'Person', 'name': 'Anna Muster'}]
+    }) + '</script>')
+    out.append('</head>\n<body class="article-page">')
+
+    out.append('<svg xmlns="http://www.w3.org/2000/svg" style="display:none">'
+               + ''.join(svg_icon(rng, f"i{i}") for i in range(60)) + '</svg>')
+    out.append('<div id="cookie-banner" role="dialog"><p>Wir verwenden Cookies, um Inhalte zu personalisieren '
+               'und Zugriffe zu analysieren. <a href="/datenschutz">Mehr erfahren</a></p>'
+               '<button>Alle akzeptieren</button><button>Einstellungen</button></div>')
+
+    # Mega-Menü
+    out.append('<header class="site-header"><a class="logo" href="/">News Beispiel</a><nav class="mega-menu"><ul>')
+    for section in SECTIONS:
+        out.append(f'<li><a href="{base}/{section.lower()}">{section}</a><ul class="sub">')
+        for _ in range(25):
+            out.append(f'<li><a href="{base}/{section.lower()}/{slug(rng, 2)}">{title(rng, 2)}</a></li>')
+        out.append('</ul></li>')
+    out.append('</ul></nav><form class="search" action="/suche"><input name="q"></form></header>')
+
+    out.append('<div class="ad-slot" id="ad-top"><script>loadAd("top")</script></div>')
+    out.append('<main><nav class="breadcrumb"><a href="/">Startseite</a> › <a href="/zuerich">Zürich</a></nav>')
+    out.append(f'<article class="article"><header><p class="kicker">Verkehrspolitik</p><h1>{headline}</h1>'
+               f'<p class="lead">{paragraph(rng, 2)}</p><p class="byline">Anna Muster, 11.03.2025</p></header>')
+    out.append(f'<figure><img src="{base}/img/{hex_id(rng)}.jpg" alt="Velofahrer auf einer Brücke">'
+               f'<figcaption>{sentence(rng)}</figcaption></figure>')
+    for i, text in enumerate(body):
+        if i and i % 6 == 0:
+            out.append(f'<h2>{title(rng, 4)}</h2>')
+        out.append(f'<p>{text}</p>')
+        if i % 9 == 4:
+            out.append(f'<aside class="ad-slot" id="ad-mid-{i}"><script>loadAd("mid-{i}")</script></aside>')
+        if i == 12:
+            out.append(f'<blockquote><p>«{sentence(rng)}»</p><cite>Stadträtin Beispiel</cite></blockquote>')
+    out.append('</article>')
+
+    out.append('<section class="related"><h2>Mehr zum Thema</h2><ul>')
+    out.extend(teaser(rng, base) for _ in range(60))
+    out.append('</ul></section>')
+
+    out.append('<section class="comments"><h2>Kommentare</h2>')
+    for _ in range(40):
+        out.append(f'<div class="comment"><span class="user">{rng.choice(WORDS)}{rng.randrange(100)}</span>'
+                   f'<p>{paragraph(rng, rng.randrange(1, 3))}</p><button>Antworten</button></div>')
+    out.append('</section></main>')
+
+    out.append('<footer class="site-footer">')
+    for section in SECTIONS:
+        out.append(f'<div class="col"><h4>{section}</h4><ul>')
+        for _ in range(15):
+            out.append(f'<li><a href="{base}/{section.lower()}/{slug(rng, 2)}">{title(rng, 3)}</a></li>')
+        out.append('</ul></div>')
+    out.append('<p>© 2025 News Beispiel AG</p></footer>')
+
+    out.append('<script id="__NEXT_DATA__" type="application/json">'
+               + json.dumps(state, ensure_ascii=False) + '</script>')
+    out.append(f'<script>{minified_script(rng, 160)}</script>')
+    out.append('</body>\n</html>\n')
+    return '\n'.join(out)
+
+
+def docs_portal(rng):
+    base = 'https://docs.example.dev'
+    chapters = [title(rng, 3) for _ in range(60)]
+
+    out = ['<!DOCTYPE html>\n<html lang="de">\n<head>\n<meta charset="utf-8">',
+           '<title>Konfiguration der Warteschlange - Handbuch | Docs Beispiel</title>',
+           '<meta name="viewport" content="width=device-width, initial-scale=1">']
+    out.append(f'<style>{inline_css(rng, 2500)}</style>')
+    out.append(f'<script>{minified_script(rng, 600)}</script>')
+    out.append('</head>\n<body class="docs">')
+    out.append('<svg xmlns="http://www.w3.org/2000/svg" style="display:none">'
+               + ''.join(svg_icon(rng, f"d{i}") for i in range(200)) + '</svg>')
+    out.append('<header class="topbar"><a href="/">Docs Beispiel</a><nav><a href="/guide">Guide</a>'
+               '<a href="/api">API</a><a href="/blog">Blog</a></nav><div id="search"></div></header>')
+
+    # Sidebar mit dem ganzen Inhaltsverzeichnis (wie bei vielen Doku-Generatoren)
+    out.append('<div class="layout"><nav class="sidebar"><ul>')
+    for chapter in chapters:
+        out.append(f'<li class="chapter"><span>{chapter}</span><ul>')
+        for _ in range(25):
+            out.append(f'<li><a href="{base}/guide/{slug(rng, 3)}">{title(rng, 3)}</a></li>')
+        out.append('</ul></li>')
+    out.append('</ul></nav>')
+
+    out.append('<main class="content"><article><h1>Konfiguration der Warteschlange</h1>'
+               f'<p class="lead">{paragraph(rng, 3)}</p>')
+    for section in range(30):
+        out.append(f'<h2 id="s{section}">{title(rng, 4)}</h2>')
+        for _ in range(rng.randrange(3, 6)):
+            out.append(f'<p>{paragraph(rng, rng.randrange(3, 6))}</p>')
+        if section % 2 == 0:
+            code = '\n'.join(f'{rng.choice(WORDS).upper()}_{i}={rng.randrange(1000)}' for i in range(12))
+            out.append(f'<pre><code class="language-env">{code}</code></pre>')
+        if section % 3 == 0:
+            rows = ''.join(f'<tr><td><code>{rng.choice(WORDS).lower()}_{i}</code></td>'
+                           f'<td>{rng.randrange(100)}</td><td>{sentence(rng)}</td></tr>' for i in range(10))
+            out.append(f'<table><thead><tr><th>Option</th><th>Default</th><th>Beschreibung</th></tr>'
+                       f'</thead><tbody>{rows}</tbody></table>')
+    out.append('</article>')
+    out.append('<nav class="pager"><a href="/guide/zurueck">Zurück</a><a href="/guide/weiter">Weiter</a></nav>')
+    out.append('</main><aside class="toc"><ul>'
+               + ''.join(f'<li><a href="#s{i}">Abschnitt {i}</a></li>' for i in range(30))
+               + '</ul></aside></div>')
+    out.append('<footer>Lizenz: CC BY 4.0 · <a href="/impressum">Impressum</a></footer>')
+
+    # Suchindex inline (z.B. Docusaurus/MkDocs-Themes)
+    index = [{'id': hex_id(rng, 8), 'title': title(rng, 4), 'path': f"/guide/{slug(rng, 3)}",
+              'text': paragraph(rng, 3)} for _ in range(650)]
+    out.append('<script>window.__SEARCH_INDEX__=' + json.dumps(index, ensure_ascii=False) + ';</script>')
+    out.append('</body>\n</html>\n')
+    return '\n'.join(out)
+
+
+PAGES = {
+    'news_portal_large': news_portal,
+    'docs_portal_large': docs_portal,
+}
+
+
+def main():
+    for name, build in PAGES.items():
+        html = build(random.Random(name)).encode('utf-8')
+        path = os.path.join(CORPUS_DIR, f"{name}.html")
+        with open(path, 'wb') as f:
+            f.write(html)
+        print(f"📝 {path} ({len(html) // 1024} KB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+"""
+Offline-Mikrobenchmarks für die CPU-lastigen reinen Funktionen aus main.py
+
+Gemessen werden:
+- extract_urls und extract_urls_from_post (tiefe Quote-Post-Embeds, viele Facets)
+- truncate_for_bluesky
+- Prompt-Aufbau von generate_response_with_claude (build_claude_request)
+- Trafilatura und der BeautifulSoup-Fallback über den HTML-Korpus in
+  benchmarks/corpus/ (kleine handgeschriebene Seiten und zwei realistisch
+  grosse aus make_corpus.py)
+
+Ohne Netzwerk und ohne API-Keys. Die Ergebnisse landen als JSON in
+benchmarks/results/latest.json und werden mit benchmarks/baseline.json
+verglichen - ist ein Benchmark deutlich langsamer als die Baseline, endet
+das Skript mit Exit-Code 1 (z.B. als Gate vor dem Deploy).
+
+Die Baseline wird nie automatisch erzeugt, sondern nur mit
+--save-baseline auf der Maschine, auf der später verglichen wird
+(Zeiten sind maschinenabhängig).
+
+Aufruf (im Projektverzeichnis):
+    python benchmarks/run.py                  # messen und vergleichen
+    python benchmarks/run.py --save-baseline  # aktuelle Messung als Baseline
+    python benchmarks/run.py --filter trafilatura
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+import main  # noqa: E402
+
+CORPUS_DIR = os.path.join(BENCH_DIR, 'corpus')
+RESULTS_PATH = os.path.join(BENCH_DIR, 'results', 'latest.json')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+
+# --- Fixtures -----------------------------------------------------------------
+
+def link_facet(uri):
+    return SimpleNamespace(features=[SimpleNamespace(uri=uri, py_type='app.bsky.richtext.facet#link')])
+
+
+def mention_facet(did):
+    # Mention-Features haben kein uri-Attribut
+    return SimpleNamespace(features=[SimpleNamespace(did=did, py_type='app.bsky.richtext.facet#mention')])
+
+
+def make_post(depth, facets=20, external=True):
+    """
+    Post mit `facets` Link-/Mention-Facets, Link-Card und einer Kette von
+    `depth` zitierten Posts (gleiche Attribut-Struktur wie die atproto-Modelle)
+    """
+    text = (
+        f"Ebene {depth}: Lesenswert https://example.org/artikel/{depth} und "
+        f"https://news.example.com/2025/03/{depth}?utm_source=bsky dazu @someone.bsky.social "
+        + "Lorem ipsum dolor sit amet " * 4
+    )
+    post = SimpleNamespace(
+        text=text,
+        facets=[
+            link_facet(f"https://example.org/{depth}/{i}") if i % 3 else mention_facet(f"did:plc:{depth}{i:04d}")
+            for i in range(facets)
+        ],
+        embed=None
+    )
+
+    if depth > 0:
+        quoted = make_post(depth - 1, facets, external)
+        post.embed = SimpleNamespace(
+            record=SimpleNamespace(uri=f"at://did:plc:quoted/app.bsky.feed.post/{depth}", value=quoted)
+        )
+    elif external:
+        post.embed = SimpleNamespace(
+            external=SimpleNamespace(uri="https://www.example.net/long/path/to/page.html", title="Titel")
+        )
+    return post
+
+
+def make_thread(length=10):
+    return [
+        {'author': f"user{i}.bsky.social",
+         'text': f"Post {i} im Thread mit etwas Text und einem Link https://example.org/{i} " * 3}
+        for i in range(length)
+    ]
+
+
+def load_corpus(directory=CORPUS_DIR):
+    """Alle .html-Dateien des Korpus als Bytes (Name ohne Endung -> Bytes)"""
+    corpus = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.html'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                corpus[os.path.splitext(name)[0]] = f.read()
+    return corpus
+
+
+def build_benchmarks(corpus):
+    """Name -> Funktion ohne Argumente"""
+    shallow_post = make_post(depth=1, facets=5)
+    deep_post = make_post(depth=8, facets=40)
+    long_text = " ".join(f"Wort{i} https://example.org/{i}" for i in range(200))
+    long_reply = "Das ist eine ziemlich lange Antwort von Claude, die gekürzt werden muss. " * 10
+    thread = make_thread(10)
+    url_contents = {f"https://example.org/{i}": "Inhalt einer Webseite. " * 200 for i in range(3)}
+
+    benchmarks = {
+        'extract_urls': lambda: main.extract_urls(long_text),
+        'extract_urls_from_post[shallow]': lambda: main.extract_urls_from_post(shallow_post),
+        'extract_urls_from_post[deep]': lambda: main.extract_urls_from_post(deep_post),
+        'truncate_for_bluesky[short]': lambda: main.truncate_for_bluesky("Kurze Antwort."),
+        'truncate_for_bluesky[long]': lambda: main.truncate_for_bluesky(long_reply),
+        'build_claude_request': lambda: main.build_claude_request(
+            "@sagemate was sagst du dazu?", thread, url_contents),
+    }
+
+    for name, html in corpus.items():
+        benchmarks[f"trafilatura_extract[{name}]"] = lambda html=html: main.extract_with_trafilatura(html)
+        benchmarks[f"beautifulsoup_fallback[{name}]"] = lambda html=html: main.extract_with_beautifulsoup(html, 'utf-8')
+
+    return benchmarks
+
+
+# --- Messung ------------------------------------------------------------------
+
+def measure(func, repeat=5, min_time=0.2):
+    """
+    Zeit pro Aufruf in Sekunden (Anzahl Aufrufe pro Runde automatisch)
+
+    Returns:
+        Dict mit number, repeat, min, median, mean, stdev (pro Aufruf)
+    """
+    func()  # Aufwärmen (Imports, Caches, Regex-Kompilierung)
+
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(benchmarks, repeat=5, min_time=0.2):
+    results = {}
+    for name, func in benchmarks.items():
+        results[name] = measure(func, repeat=repeat, min_time=min_time)
+        print(f"  {name:<45} {format_time(results[name]['median']):>10}  (±{format_time(results[name]['stdev'])})")
+
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine()
+        },
+        'results': results
+    }
+
+
+def format_time(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} µs"
+
+
+def compare(current, baseline, threshold, show_missing=True):
+    """
+    Vergleicht die Mediane mit der Baseline
+
+    Returns:
+        Liste der Benchmarks die mehr als `threshold` (0.2 = 20%) langsamer sind
+    """
+    regressions = []
+    print(f"\n📊 Vergleich mit Baseline ({baseline['meta'].get('commit') or '?'}, {baseline['meta'].get('created_at', '?')[:19]}):")
+
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"  {name:<45} neu (keine Baseline)")
+            continue
+
+        ratio = result['median'] / base['median'] if base['median'] else float('inf')
+        marker = '❌' if ratio > 1 + threshold else ('✅' if ratio < 1 - threshold else '  ')
+        print(f"{marker}{name:<45} {format_time(base['median']):>10} → {format_time(result['median']):>10}  ({ratio - 1:+.0%})")
+
+        if ratio > 1 + threshold:
+            regressions.append(name)
+
+    if show_missing:
+        for name in sorted(set(baseline['results']) - set(current['results'])):
+            print(f"  {name:<45} nicht gemessen")
+
+    return regressions
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description='Offline-Mikrobenchmarks für Sagemate')
+    parser.add_argument('--output', default=RESULTS_PATH, help='JSON-Datei für die Ergebnisse')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline zum Vergleich')
+    parser.add_argument('--save-baseline', action='store_true', help='Messung als neue Baseline speichern')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Erlaubte Verlangsamung (0.2 = 20%%)')
+    parser.add_argument('--filter', default=None, help='Nur Benchmarks deren Name das enthält')
+    parser.add_argument('--repeat', type=int, default=5, help='Runden pro Benchmark')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Mindestdauer einer Runde (Sekunden)')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Verzeichnis mit HTML-Seiten')
+    args = parser.parse_args(argv)
+
+    benchmarks = build_benchmarks(load_corpus(args.corpus))
+    if args.filter:
+        benchmarks = {name: func for name, func in benchmarks.items() if args.filter in name}
+    if not benchmarks:
+        print("❌ Keine Benchmarks ausgewählt")
+        return 2
+
+    print(f"⏱️  {len(benchmarks)} Benchmarks (Median pro Aufruf):")
+    started = time.monotonic()
+    current = run(benchmarks, repeat=args.repeat, min_time=args.min_time)
+    print(f"\n✅ Fertig in {time.monotonic() - started:.0f}s → {args.output}")
+    write_json(args.output, current)
+
+    if args.save_baseline:
+        write_json(args.baseline, current)
+        print(f"💾 Baseline gespeichert: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"ℹ️  Keine Baseline unter {args.baseline} - anlegen mit --save-baseline")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regressions = compare(current, baseline, args.threshold, show_missing=not args.filter)
+    if regressions:
+        print(f"\n❌ {len(regressions)} Regression(en) über {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+
+    print(f"\n✅ Keine Regression über {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
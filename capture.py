@@ -0,0 +1,830 @@
+"""
+Mitschnitt und Wiedergabe des Produktionsverkehrs
+
+Mitschnitt (python main.py --continuous --capture capture.jsonl.gz oder
+CAPTURE_FILE=...): Jeder ausgehende Aufruf landet mit Startzeit und Dauer
+als JSON-Zeile in der Datei (.gz → gzip-komprimiert):
+- atproto: XRPC-Methode, Parameter, Daten und Antwort (auch Chat-Proxy)
+- http: URL und geladenes HTML (Status, Header, Bytes)
+- llm: Claude-Request und Antwort (messages.create und Batch-Ergebnisse)
+- mark: wann der Dauerbetrieb Mentions bzw. DMs gepollt hat
+
+Passwörter, Tokens (JWTs, API-Keys), E-Mail-Adressen und geheime
+Query-Parameter werden vor dem Schreiben geschwärzt - E-Mail-Adressen
+überall, also auch in Post- und DM-Texten, Prompts und im geladenen HTML.
+Request-Header werden gar nicht gespeichert.
+
+Wiedergabe (python capture.py capture.jsonl.gz [--fast]): pollt Mentions
+und DMs zu denselben Zeitpunkten wie im Mitschnitt und beantwortet jeden
+ausgehenden Aufruf aus dem Mitschnitt - ohne Netzwerk. In
+Originalgeschwindigkeit dauert jeder Aufruf so lange wie damals, mit
+--fast läuft alles ohne Pausen und ohne Rate-Limits. Der Bericht (Zeit pro
+Poll, Stufe und Aufruf) lässt sich als JSON speichern und mit --compare
+gegen einen früheren Lauf vergleichen.
+
+Antworten werden zuerst über den exakten Request gesucht. Gibt es den
+nicht (z.B. weil sich der Prompt geändert hat oder ein Post einen neuen
+Zeitstempel trägt), wird die nächste unbenutzte Antwort derselben Methode
+genommen - wie oft das passiert, steht im Bericht.
+"""
+
+import argparse
+import base64
+import contextlib
+import gzip
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+FORMAT_VERSION = 1
+REDACTED = '[REDACTED]'
+
+# Schlüssel deren Werte nie im Mitschnitt landen (Vergleich in Kleinbuchstaben)
+SECRET_KEYS = {
+    'password', 'accessjwt', 'refreshjwt', 'authfactortoken', 'email',
+    'authorization', 'api_key', 'apikey', 'x-api-key', 'token'
+}
+
+# Query-Parameter mit geheimem Inhalt und Token-artige Werte bzw. E-Mail-Adressen
+# in beliebigen Strings (Handles wie @name.bsky.social haben keinen lokalen Teil)
+SECRET_PARAM = re.compile(r'token|key|secret|sig|auth|password|session', re.IGNORECASE)
+EMAIL = r'[\w.+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}'
+SECRET_VALUE = re.compile(r'eyJ[\w-]+\.[\w-]+\.[\w-]*|sk-ant-[\w-]+|' + EMAIL)
+# Dasselbe für HTML-Bytes (die base64-kodiert im Mitschnitt landen)
+SECRET_BYTES = re.compile(SECRET_VALUE.pattern.encode('ascii'))
+
+# Antwort-Header die bei der Wiedergabe gebraucht werden (Rate-Limits, Caching)
+KEEP_HEADERS = {
+    'content-type', 'content-length', 'etag', 'last-modified', 'retry-after',
+    'ratelimit-limit', 'ratelimit-remaining', 'ratelimit-reset', 'ratelimit-policy'
+}
+
+# Beantwortet die Wiedergabe selbst (mit unsignierten Tokens)
+SESSION_METHODS = {
+    'com.atproto.server.createSession',
+    'com.atproto.server.refreshSession',
+    'com.atproto.server.getSession'
+}
+
+MATCHES = ('exact', 'fallback', 'reused', 'missing')
+
+
+class ReplayError(Exception):
+    """Aufruf ist im Mitschnitt gescheitert oder gar nicht vorhanden"""
+
+
+# --- Hilfsfunktionen ----------------------------------------------------------
+
+def redact(value):
+    """Schwärzt geheime Schlüssel und Token-artige Strings (rekursiv)"""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in SECRET_KEYS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    if isinstance(value, str):
+        return SECRET_VALUE.sub(REDACTED, value)
+    return value
+
+
+def redact_bytes(body):
+    """Schwärzt Token-artige Werte und E-Mail-Adressen in rohen Bytes (z.B. HTML)"""
+    return SECRET_BYTES.sub(REDACTED.encode('ascii'), body)
+
+
+def redact_url(url):
+    """Entfernt Zugangsdaten und geheime Query-Parameter aus einer URL"""
+    parts = urlsplit(url)
+    netloc = parts.netloc
+    if '@' in netloc:
+        netloc = f"{REDACTED}@{netloc.rsplit('@', 1)[1]}"
+
+    query = parts.query
+    if query:
+        query = urlencode([
+            (key, REDACTED if SECRET_PARAM.search(key) else value)
+            for key, value in parse_qsl(query, keep_blank_values=True)
+        ])
+    return urlunsplit(parts._replace(netloc=netloc, query=query))
+
+
+def plain(value):
+    """pydantic-Modelle (atproto, anthropic) und Bytes → JSON-taugliche Werte"""
+    if hasattr(value, 'model_dump'):
+        return value.model_dump(mode='json', exclude_none=True, by_alias=True)
+    if isinstance(value, (bytes, bytearray)):
+        return {'$bytes': base64.b64encode(bytes(value)).decode('ascii')}
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    return value
+
+
+def unplain(value):
+    if isinstance(value, dict) and set(value) == {'$bytes'}:
+        return base64.b64decode(value['$bytes'])
+    return value
+
+
+def keep_headers(headers):
+    return {key: value for key, value in (headers or {}).items() if key.lower() in KEEP_HEADERS}
+
+
+def nsid_of(url):
+    return (url or '').rstrip('/').rsplit('/', 1)[-1]
+
+
+def request_key(*parts):
+    return json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def atproto_request(kwargs):
+    """Vergleichbarer (geschwärzter) Teil eines XRPC-Calls"""
+    return redact({
+        'nsid': nsid_of(kwargs.get('url')),
+        'params': plain(kwargs.get('params')),
+        'data': plain(kwargs.get('data'))
+    })
+
+
+def llm_key(params):
+    """Schlüssel eines Claude-Requests (ohne Modell - ein Modellwechsel soll noch passen)"""
+    params = redact(plain(params or {}))
+    return request_key({key: value for key, value in params.items() if key != 'model'})
+
+
+# --- Mitschnitt ---------------------------------------------------------------
+
+class Recorder:
+    """
+    Schreibt den Mitschnitt als JSON-Zeilen
+
+    Thread-sicher. Jede Zeile wird sofort geschrieben (bei .gz mit
+    Sync-Flush), ein Absturz kostet also höchstens die letzte Zeile.
+
+    Args:
+        path: Zieldatei (.gz → gzip), wird überschrieben
+        **meta: Zusätzliche Angaben für die Kopfzeile
+    """
+
+    def __init__(self, path, **meta):
+        self.path = path
+        self.count = 0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        opener = gzip.open if path.endswith('.gz') else open
+        self._file = opener(path, 'wt', encoding='utf-8')
+
+        self._write({
+            'type': 'meta',
+            'version': FORMAT_VERSION,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            **meta
+        })
+
+    def record(self, kind, started, **fields):
+        """Ein Aufruf: kind (atproto/http/llm/mark), Startzeit (time.monotonic()) und Details"""
+        self._write({'type': kind, 't': round(started - self._started, 6), **fields})
+
+    def mark(self, event, **fields):
+        """Zeitpunkt an dem der Dauerbetrieb pollt (mentions, dms, dm_probe)"""
+        self.record('mark', time.monotonic(), event=event, **fields)
+
+    def _write(self, entry):
+        line = json.dumps(redact(entry), ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + '\n')
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def capture_client(client, recorder):
+    """
+    Schneidet alle XRPC-Calls eines atproto-Clients mit
+
+    Wie limit_client über client._invoke - vor limit_client anwenden, damit
+    die Wartezeit im Rate-Limiter nicht in die gemessene Dauer eingeht.
+    """
+    invoke = client._invoke
+
+    def _invoke(*args, **kwargs):
+        request = atproto_request(kwargs)
+        started = time.monotonic()
+        try:
+            response = invoke(*args, **kwargs)
+        except Exception as e:
+            failed = getattr(e, 'response', None)
+            recorder.record(
+                'atproto', started, elapsed=time.monotonic() - started, **request,
+                error=type(e).__name__, message=str(e),
+                status=getattr(failed, 'status_code', None),
+                content=plain(getattr(failed, 'content', None)),
+                headers=keep_headers(getattr(failed, 'headers', None))
+            )
+            raise
+
+        recorder.record(
+            'atproto', started, elapsed=time.monotonic() - started, **request,
+            status=response.status_code, content=plain(response.content),
+            headers=keep_headers(response.headers)
+        )
+        return response
+
+    client._invoke = _invoke
+    return client
+
+
+def capture_http(http_client, recorder):
+    """Schneidet alle Webseiten-Abrufe eines HttpClient mit (inkl. HTML-Bytes)"""
+    get_limited = http_client.get_limited
+
+    def _get_limited(url, headers=None, **kwargs):
+        request = {'url': redact_url(url), 'conditional': bool(headers)}
+        started = time.monotonic()
+        try:
+            response, body, truncated = get_limited(url, headers=headers, **kwargs)
+        except Exception as e:
+            recorder.record(
+                'http', started, elapsed=time.monotonic() - started, **request,
+                error=type(e).__name__, message=str(e)
+            )
+            raise
+
+        recorder.record(
+            'http', started, elapsed=time.monotonic() - started, **request,
+            status=response.status_code, headers=keep_headers(response.headers),
+            encoding=response.encoding, truncated=truncated,
+            body=base64.b64encode(redact_bytes(body)).decode('ascii')
+        )
+        return response, body, truncated
+
+    http_client.get_limited = _get_limited
+    return http_client
+
+
+def capture_llm(claude, recorder):
+    """Schneidet messages.create und die Ergebnisse der Message Batches eines ClaudeClient mit"""
+    create = claude.create
+
+    def _create(**kwargs):
+        request = plain(dict(kwargs, model=kwargs.get('model', claude.model)))
+        started = time.monotonic()
+        try:
+            message = create(**kwargs)
+        except Exception as e:
+            recorder.record(
+                'llm', started, elapsed=time.monotonic() - started, via='create',
+                request=request, error=type(e).__name__, message=str(e)
+            )
+            raise
+
+        recorder.record(
+            'llm', started, elapsed=time.monotonic() - started, via='create',
+            request=request, response=plain(message)
+        )
+        return message
+
+    claude.create = _create
+    claude.client = _AnthropicCapture(claude.client, recorder)
+    return claude
+
+
+class _Delegate:
+    """Reicht alles nicht Überschriebene an das Original weiter"""
+
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+class _AnthropicCapture(_Delegate):
+    def __init__(self, anthropic_client, recorder):
+        super().__init__(anthropic_client)
+        self.messages = _MessagesCapture(anthropic_client.messages, recorder)
+
+
+class _MessagesCapture(_Delegate):
+    def __init__(self, messages, recorder):
+        super().__init__(messages)
+        self.batches = _BatchesCapture(messages.batches, recorder)
+
+
+class _BatchesCapture(_Delegate):
+    """Merkt sich die Requests jedes Batches und schreibt pro Ergebnis einen llm-Eintrag"""
+
+    def __init__(self, batches, recorder):
+        super().__init__(batches)
+        self._recorder = recorder
+        self._submitted = {}
+        self._lock = threading.Lock()
+
+    def create(self, requests, **kwargs):
+        started = time.monotonic()
+        batch = self._target.create(requests=requests, **kwargs)
+        with self._lock:
+            self._submitted[batch.id] = (started, {r['custom_id']: r['params'] for r in requests})
+        return batch
+
+    def results(self, batch_id, **kwargs):
+        with self._lock:
+            started, params = self._submitted.get(batch_id, (time.monotonic(), {}))
+
+        for entry in self._target.results(batch_id, **kwargs):
+            succeeded = entry.result.type == 'succeeded'
+            self._recorder.record(
+                'llm', started, elapsed=time.monotonic() - started, via='batch',
+                request=plain(params.get(entry.custom_id)),
+                response=plain(entry.result.message) if succeeded else None,
+                error=None if succeeded else entry.result.type
+            )
+            yield entry
+
+        with self._lock:
+            self._submitted.pop(batch_id, None)
+
+
+# --- Wiedergabe ---------------------------------------------------------------
+
+def read_capture(path):
+    """
+    Liest einen Mitschnitt
+
+    Returns:
+        (meta, records) - records nach Startzeit sortiert. Ein
+        abgeschnittenes Ende (Absturz während des Mitschnitts) wird ignoriert.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    meta, records = {}, []
+
+    with opener(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if entry.get('type') == 'meta':
+                    meta = entry
+                else:
+                    records.append(entry)
+        except (EOFError, OSError):
+            pass
+
+    records.sort(key=lambda entry: entry['t'])
+    return meta, records
+
+
+def _fake_jwt(did, scope):
+    """Unsigniertes JWT - atproto liest nur den Payload (sub, exp)"""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).rstrip(b'=').decode('ascii')
+
+    now = int(time.time())
+    return '.'.join([
+        encode({'alg': 'none', 'typ': 'JWT'}),
+        encode({'scope': scope, 'sub': did, 'iat': now, 'exp': now + 30 * 24 * 3600}),
+        'replay'
+    ])
+
+
+class Player:
+    """
+    Beantwortet ausgehende Aufrufe aus einem Mitschnitt
+
+    Pro Aufruf: exakt gleicher Request (in Mitschnitt-Reihenfolge), sonst
+    die nächste unbenutzte Antwort derselben Gruppe (XRPC-Methode, Webseite,
+    Claude), sonst nochmal die zuletzt gelieferte Antwort der Gruppe.
+
+    Args:
+        records: Einträge aus read_capture
+        realtime: True = jeder Aufruf dauert so lange wie im Mitschnitt
+    """
+
+    def __init__(self, records, realtime=True):
+        self.realtime = realtime
+        self.stats = {}
+        self._records = records
+        self._exact = {}
+        self._groups = {}
+        self._last = {}
+        self._used = set()
+        self._lock = threading.Lock()
+
+        for index, record in enumerate(records):
+            keys = self._keys(record)
+            if keys is None:
+                continue
+            key, group = keys
+            self._exact.setdefault((record['type'], key), deque()).append(index)
+            self._groups.setdefault((record['type'], group), deque()).append(index)
+
+    @staticmethod
+    def _keys(record):
+        if record['type'] == 'atproto':
+            return request_key(record['nsid'], record.get('params'), record.get('data')), record['nsid']
+        if record['type'] == 'http':
+            return record['url'], 'page'
+        if record['type'] == 'llm':
+            return llm_key(record.get('request')), 'llm'
+        return None
+
+    def identity(self):
+        """(did, handle) des Bots laut Mitschnitt (Session- oder Profil-Antworten)"""
+        for record in self._records:
+            content = record.get('content')
+            if (record['type'] == 'atproto' and isinstance(content, dict) and content.get('did')
+                    and (record['nsid'] in SESSION_METHODS or record['nsid'] == 'app.bsky.actor.getProfile')):
+                return content['did'], content.get('handle')
+        return None, None
+
+    def session(self, handle=None):
+        """Session-Antwort mit unsignierten Tokens (Login ohne Netzwerk)"""
+        did, recorded_handle = self.identity()
+        did = did or 'did:plc:replay'
+        return {
+            'did': did,
+            'handle': recorded_handle or handle or 'replay.invalid',
+            'accessJwt': _fake_jwt(did, 'com.atproto.appPassPrivileged'),
+            'refreshJwt': _fake_jwt(did, 'com.atproto.refresh'),
+            'active': True
+        }
+
+    def take(self, kind, key, group, wait=True):
+        """
+        Nächste passende Antwort (oder None wenn die Gruppe leer ist)
+
+        Args:
+            wait: Bei realtime so lange warten wie der Aufruf damals gedauert hat
+        """
+        with self._lock:
+            stats = self.stats.setdefault(kind, dict.fromkeys(MATCHES, 0))
+            index = self._pop_unused(self._exact.get((kind, key)))
+            match = 'exact'
+            if index is None:
+                index = self._pop_unused(self._groups.get((kind, group)))
+                match = 'fallback'
+            if index is None:
+                index = self._last.get((kind, group))
+                match = 'reused'
+            if index is None:
+                stats['missing'] += 1
+                return None
+
+            stats[match] += 1
+            self._used.add(index)
+            self._last[(kind, group)] = index
+            record = self._records[index]
+
+        if wait and self.realtime and record.get('elapsed'):
+            time.sleep(record['elapsed'])
+        return record
+
+    def _pop_unused(self, queue):
+        while queue:
+            index = queue.popleft()
+            if index not in self._used:
+                return index
+        return None
+
+
+def replay_client(client, player):
+    """Beantwortet alle XRPC-Calls eines atproto-Clients aus dem Mitschnitt (statt Netzwerk)"""
+    from atproto_client import exceptions
+    from atproto_client.models.common import XrpcError
+    from atproto_client.request import Response
+
+    def _invoke(*args, **kwargs):
+        request = atproto_request(kwargs)
+        nsid = request['nsid']
+
+        if nsid in SESSION_METHODS:
+            return Response(True, 200, player.session(), {})
+
+        record = player.take('atproto', request_key(nsid, request['params'], request['data']), nsid)
+        if record is None:
+            raise exceptions.NetworkError(
+                Response(False, 503, XrpcError(error='ReplayMiss', message=f"{nsid} nicht im Mitschnitt"), {})
+            )
+
+        headers = record.get('headers') or {}
+        if record.get('error'):
+            response = None
+            if record.get('status'):
+                content = record.get('content')
+                if isinstance(content, dict) and 'error' in content:
+                    content = XrpcError(error=content['error'], message=content.get('message'))
+                response = Response(False, record['status'], content, headers)
+
+            error = getattr(exceptions, record['error'], None)
+            if not (isinstance(error, type) and issubclass(error, exceptions.RequestErrorBase)):
+                error = exceptions.NetworkError
+            raise error(response)
+
+        return Response(True, record['status'], unplain(record.get('content')), headers)
+
+    client._invoke = _invoke
+    return client
+
+
+class ReplayedResponse:
+    """HTTP-Antwort mit den Attributen die download_page braucht"""
+
+    def __init__(self, status_code, headers, encoding):
+        from requests.structures import CaseInsensitiveDict
+
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.encoding = encoding
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise ReplayError(f"HTTP {self.status_code} (laut Mitschnitt)")
+
+
+class ReplayHttpClient:
+    """Stand-in für HttpClient: Webseiten aus dem Mitschnitt"""
+
+    def __init__(self, player):
+        self.player = player
+        self.requests = 0
+
+    def get_limited(self, url, headers=None, **kwargs):
+        from http_client import DownloadRejected
+
+        self.requests += 1
+        record = self.player.take('http', redact_url(url), 'page')
+        if record is None:
+            raise ReplayError(f"{url} nicht im Mitschnitt")
+        if record.get('error') == 'DownloadRejected':
+            raise DownloadRejected(record.get('message'))
+        if record.get('error'):
+            raise ReplayError(record.get('message') or record['error'])
+
+        response = ReplayedResponse(record['status'], record.get('headers'), record.get('encoding'))
+        return response, base64.b64decode(record.get('body') or ''), record.get('truncated', False)
+
+    def stats(self):
+        return {'hosts': {}, 'requests': self.requests, 'connections': 0, 'reused': 0}
+
+
+class ReplayClaude:
+    """Stand-in für ClaudeClient: Antworten und Batch-Ergebnisse aus dem Mitschnitt"""
+
+    def __init__(self, player, model):
+        self.player = player
+        self.model = model
+        self.limiter = None
+        self.client = SimpleNamespace(messages=SimpleNamespace(batches=_ReplayBatches(self)))
+
+    def create(self, **kwargs):
+        kwargs.setdefault('model', self.model)
+        return self.message_for(kwargs)
+
+    def message_for(self, params, wait=True):
+        from anthropic.types import Message
+
+        record = self.player.take('llm', llm_key(params), 'llm', wait=wait)
+        if record is None or not record.get('response'):
+            raise ReplayError(f"Claude-Antwort nicht im Mitschnitt ({(record or {}).get('error') or 'fehlt'})")
+        return Message.model_validate(record['response'])
+
+
+class _ReplayBatches:
+    """Batches sind sofort fertig, die Ergebnisse kommen aus dem Mitschnitt"""
+
+    def __init__(self, claude):
+        self.claude = claude
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def create(self, requests, **kwargs):
+        with self._lock:
+            batch_id = f"msgbatch_replay_{len(self._requests) + 1}"
+            self._requests[batch_id] = list(requests)
+        return SimpleNamespace(id=batch_id, processing_status='in_progress')
+
+    def retrieve(self, batch_id, **kwargs):
+        return SimpleNamespace(id=batch_id, processing_status='ended')
+
+    def results(self, batch_id, **kwargs):
+        with self._lock:
+            requests = self._requests.get(batch_id, [])
+
+        for request in requests:
+            try:
+                result = SimpleNamespace(type='succeeded', message=self.claude.message_for(request['params'], wait=False))
+            except ReplayError:
+                result = SimpleNamespace(type='errored', message=None)
+            yield SimpleNamespace(custom_id=request['custom_id'], result=result)
+
+
+def summarize(values):
+    values = sorted(values)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'total': sum(values),
+        'p50': values[(len(values) - 1) // 2],
+        'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+        'max': values[-1]
+    }
+
+
+def run_replay(args, out):
+    """Spielt einen Mitschnitt ab und liefert den Bericht (Dict)"""
+    meta, records = read_capture(args.capture)
+    marks = [record for record in records if record['type'] == 'mark']
+    if not marks:
+        print("❌ Keine Poll-Zeitpunkte im Mitschnitt (mitgeschnitten wird im Dauerbetrieb: --continuous)", file=out)
+        return None
+
+    player = Player(records, realtime=not args.fast)
+    did, handle = player.identity()
+    handle = handle or meta.get('handle') or 'replay.invalid'
+
+    # Vor dem Import von main: nichts darf ins Netz (.env überschreibt das nicht)
+    os.environ.update({
+        'BLUESKY_HANDLE': handle,
+        'BLUESKY_PASSWORD': 'replay',
+        'ANTHROPIC_API_KEY': 'sk-ant-replay',
+        'DATA_DIR': args.data_dir or tempfile.mkdtemp(prefix='sagemate-replay-'),
+        'METRICS_PORT': '0'
+    })
+    if args.fast:
+        for name in ('RATE_LIMIT_BLUESKY', 'RATE_LIMIT_CHAT', 'RATE_LIMIT_CLAUDE'):
+            os.environ[name] = '1000000'
+        os.environ.setdefault('BATCH_POLL_INTERVAL', '0.1')
+
+    bot_output = out if args.verbose else io.StringIO()
+    durations = {}
+
+    with contextlib.redirect_stdout(bot_output):
+        import main
+        from atproto import Client
+
+        main._claude_client = ReplayClaude(player, main.CLAUDE_MODEL)
+        main._http_client = ReplayHttpClient(player)
+
+        client = main.limit_client(replay_client(Client(), player), main._bluesky_limiter)
+        main.login_with_saved_session(client, handle, 'replay')
+        # Chat-Proxy ist ein Klon mit eigenem _invoke → ebenfalls aus dem Mitschnitt
+        client._chat_client = main.limit_client(
+            replay_client(client.with_bsky_chat_proxy(), player), main._chat_limiter
+        )
+
+        started = time.monotonic()
+        try:
+            for mark in marks:
+                if not args.fast:
+                    delay = (mark['t'] - marks[0]['t']) - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+
+                dry_run = mark.get('dry_run', False)
+                poll_started = time.monotonic()
+                try:
+                    if mark['event'] == 'mentions':
+                        main.process_all_mentions(client, dry_run=dry_run)
+                    elif mark['event'] == 'dms':
+                        main.process_all_dms(client, dry_run=dry_run)
+                    elif mark['event'] == 'dm_probe':
+                        main.get_direct_messages(client)
+                except Exception as e:
+                    print(f"❌ Fehler bei {mark['event']}: {e}", file=out)
+                durations.setdefault(mark['event'], []).append(time.monotonic() - poll_started)
+
+            if main._batch_runner is not None and main._batch_runner.pending_count():
+                main._batch_runner.wait()
+                main.flush_dm_housekeeping(client)
+        except KeyboardInterrupt:
+            print("\n🛑 Wiedergabe abgebrochen", file=out)
+
+        wall_seconds = time.monotonic() - started
+
+    stages = {
+        name: main._stage_seconds.snapshot(stage=name)
+        for name in main.PIPELINE_WORKERS
+    }
+    calls = {
+        name: main._call_seconds.snapshot(call=name)
+        for name in ('get_thread_context', 'fetch_url_content', 'generate_response_with_claude',
+                     'send_post', 'send_message')
+    }
+
+    return {
+        'capture': args.capture,
+        'captured_at': meta.get('started_at'),
+        'mode': 'fast' if args.fast else 'original',
+        'captured_seconds': marks[-1]['t'] - marks[0]['t'],
+        'wall_seconds': wall_seconds,
+        'polls': {event: summarize(values) for event, values in durations.items()},
+        'replies': {
+            kind: {
+                result: main._replies_total.value(kind=kind, result=result)
+                for result in ('answered', 'failed')
+            }
+            for kind in ('mention', 'dm')
+        },
+        'stage_mean_seconds': {
+            name: snapshot['sum'] / snapshot['count'] for name, snapshot in stages.items() if snapshot['count']
+        },
+        'call_mean_seconds': {
+            name: snapshot['sum'] / snapshot['count'] for name, snapshot in calls.items() if snapshot['count']
+        },
+        'matches': player.stats
+    }
+
+
+def print_report(report, out, baseline=None):
+    def change(path, value):
+        base = baseline
+        for key in path:
+            base = (base or {}).get(key)
+        if not base or value is None:
+            return ''
+        return f"  (vorher {base:.3f}s, {value / base - 1:+.0%})"
+
+    print("\n" + "=" * 60, file=out)
+    print(f"🔁 WIEDERGABE ({report['mode']})", file=out)
+    print("=" * 60, file=out)
+    print(
+        f"Mitschnitt: {report['captured_seconds']:.0f}s, Wiedergabe: {report['wall_seconds']:.1f}s"
+        + change(('wall_seconds',), report['wall_seconds']), file=out
+    )
+    for kind, results in report['replies'].items():
+        print(f"Antworten {kind}: {results['answered']:.0f} ok, {results['failed']:.0f} fehlgeschlagen", file=out)
+
+    print("\nZeit pro Poll:", file=out)
+    for event, stats in report['polls'].items():
+        print(
+            f"  {event:<10} n={stats['count']:<4} p50={stats['p50']:.3f}s  p95={stats['p95']:.3f}s  "
+            f"max={stats['max']:.3f}s" + change(('polls', event, 'p50'), stats['p50']), file=out
+        )
+
+    print("\nMittlere Dauer pro Stufe / Aufruf:", file=out)
+    for section in ('stage_mean_seconds', 'call_mean_seconds'):
+        for name, seconds in report[section].items():
+            print(f"  {name:<32} {seconds:.3f}s" + change((section, name), seconds), file=out)
+
+    print("\nAntworten aus dem Mitschnitt (exakt / Ersatz / wiederholt / fehlend):", file=out)
+    for kind, stats in report['matches'].items():
+        print(f"  {kind:<8} " + " / ".join(str(stats[match]) for match in MATCHES), file=out)
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description='Wiedergabe eines Sagemate-Mitschnitts (ohne Netzwerk)')
+    parser.add_argument('capture', help='Mitschnitt (CAPTURE_FILE bzw. --capture von main.py)')
+    parser.add_argument('--fast', action='store_true', help='So schnell wie möglich (keine Pausen, keine Rate-Limits)')
+    parser.add_argument('--data-dir', default=None, help='DATA_DIR (Default: neues Temp-Verzeichnis)')
+    parser.add_argument('--json', default=None, help='Bericht als JSON speichern')
+    parser.add_argument('--compare', default=None, help='Früheren JSON-Bericht zum Vergleich')
+    parser.add_argument('--verbose', action='store_true', help='Log-Ausgaben des Bots anzeigen')
+    args = parser.parse_args(argv)
+
+    out = sys.stdout
+    report = run_replay(args, out)
+    if report is None:
+        return 2
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, out, baseline)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Bericht gespeichert: {args.json}", file=out)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
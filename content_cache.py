@@ -0,0 +1,214 @@
+"""
+Persistenter Cache für extrahierte Webseiten-Inhalte
+
+Beliebte Links (News-Artikel, virale Posts) werden oft mehrfach erwähnt.
+Der Cache speichert den bereits extrahierten Text in SQLite, so dass ein
+Treffer weder einen Download noch die CPU-lastige Extraktion braucht.
+
+- Schlüssel: kanonische URL (ohne Fragment und Tracking-Parameter)
+- TTL: Einträge verfallen nach einer festen Zeit. Abgelaufene Einträge
+  mit ETag/Last-Modified bleiben noch eine Weile für bedingte GETs
+  (Revalidierung) erhalten - ein 304 macht den Eintrag wieder frisch
+- LRU: Überschreitet der Cache seine Maximalgrösse, fliegen die am
+  längsten nicht genutzten Einträge raus
+- Die Datei liegt in DATA_DIR und überlebt so Neustarts (auf Railway
+  DATA_DIR auf ein Volume legen, damit auch Redeploys überlebt werden)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query-Parameter die nur dem Tracking dienen und den Inhalt nicht ändern
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'igshid', 'ref_src'}
+
+
+def canonical_url(url):
+    """
+    Normalisiert eine URL für den Cache-Schlüssel
+
+    - Schema und Host klein geschrieben, Standard-Ports entfernt
+    - Fragment (#...) entfernt
+    - Tracking-Parameter (utm_*, fbclid, ...) entfernt, Rest sortiert
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ]
+    query.sort()
+
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+class ContentCache:
+    """
+    SQLite-basierter Cache: kanonische URL -> extrahierter Text
+
+    Args:
+        path: Pfad der SQLite-Datei
+        ttl: Lebensdauer eines Eintrags in Sekunden
+        max_bytes: Maximale Gesamtgrösse der gespeicherten Inhalte
+        max_stale: Wie lange abgelaufene Einträge für Revalidierung
+                   aufbewahrt werden (Sekunden nach Ablauf der TTL)
+    """
+
+    def __init__(self, path, ttl=24 * 3600, max_bytes=50 * 1024 * 1024, max_stale=7 * 24 * 3600):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+        # Eine Verbindung für alle Threads, Zugriffe über Lock serialisiert
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS content_cache (
+                url TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )
+        ''')
+
+        # Ältere Cache-Dateien ohne Validator-Spalten nachrüsten
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(content_cache)')}
+        for column in ('etag', 'last_modified'):
+            if column not in columns:
+                self._db.execute(f'ALTER TABLE content_cache ADD COLUMN {column} TEXT')
+
+        self._db.execute(
+            'CREATE INDEX IF NOT EXISTS idx_content_cache_access ON content_cache (last_access)'
+        )
+        self._db.commit()
+
+    def get(self, url):
+        """Liefert den gecachten Inhalt oder None (abgelaufen zählt als Fehlgriff)"""
+        key = canonical_url(url)
+        now = time.time()
+
+        with self._lock:
+            row = self._db.execute(
+                'SELECT content, fetched_at FROM content_cache WHERE url = ?', (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+
+            self._db.execute(
+                'UPDATE content_cache SET last_access = ? WHERE url = ?', (now, key)
+            )
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def get_stale(self, url):
+        """
+        Liefert einen abgelaufenen Eintrag mit Validatoren für einen bedingten GET
+
+        Returns:
+            Dict mit content, etag, last_modified oder None
+        """
+        key = canonical_url(url)
+
+        with self._lock:
+            row = self._db.execute(
+                'SELECT content, etag, last_modified FROM content_cache '
+                'WHERE url = ? AND (etag IS NOT NULL OR last_modified IS NOT NULL)',
+                (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return {'content': row[0], 'etag': row[1], 'last_modified': row[2]}
+
+    def refresh(self, url):
+        """Markiert einen Eintrag nach einem 304 wieder als frisch"""
+        key = canonical_url(url)
+        now = time.time()
+
+        with self._lock:
+            self._db.execute(
+                'UPDATE content_cache SET fetched_at = ?, last_access = ? WHERE url = ?',
+                (now, now, key)
+            )
+            self._db.commit()
+            self.revalidated += 1
+
+    def put(self, url, content, etag=None, last_modified=None):
+        """Speichert einen Inhalt und räumt bei Bedarf alte Einträge ab"""
+        key = canonical_url(url)
+        now = time.time()
+        size = len(content.encode('utf-8'))
+
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO content_cache '
+                '(url, content, size, fetched_at, last_access, etag, last_modified) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, content, size, now, now, etag, last_modified)
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now):
+        """Entfernt abgelaufene Einträge und danach LRU-Einträge bis unter max_bytes"""
+        # Ohne Validatoren ist ein abgelaufener Eintrag wertlos, mit Validatoren
+        # wird er noch max_stale Sekunden für Revalidierung aufbewahrt
+        self._db.execute(
+            'DELETE FROM content_cache WHERE fetched_at < ? '
+            'AND ((etag IS NULL AND last_modified IS NULL) OR fetched_at < ?)',
+            (now - self.ttl, now - self.ttl - self.max_stale)
+        )
+
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM content_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._db.execute('SELECT url, size FROM content_cache ORDER BY last_access').fetchall()
+        to_delete = []
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            to_delete.append((url,))
+            total -= size
+
+        self._db.executemany('DELETE FROM content_cache WHERE url = ?', to_delete)
+
+    def stats(self):
+        """Treffer/Fehlgriffe seit Prozessstart plus aktuelle Grösse"""
+        with self._lock:
+            entries, total = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM content_cache'
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': total
+        }
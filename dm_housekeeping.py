@@ -0,0 +1,109 @@
+"""
+Gesammelte Aufräumarbeiten für verarbeitete Direktnachrichten
+
+Jede verarbeitete DM wird gelöscht (verhindert Duplikate) und ihr Chat als
+gelesen markiert. Statt das pro Nachricht sofort zu tun, sammelt die
+Pipeline die Aufträge hier und flush() erledigt sie am Ende des Zyklus:
+
+- Löschungen werden dedupliziert und parallel abgeschickt (die Chat-API
+  kennt kein Batch-Delete)
+- Pro Chat gibt es nur ein einziges updateRead, bis zur neuesten
+  verarbeiteten Nachricht
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DmHousekeeping:
+    """
+    Sammelt DM-Löschungen und Gelesen-Markierungen bis zum nächsten flush()
+
+    Args:
+        workers: Max. parallele Löschungen beim Flush
+    """
+
+    def __init__(self, workers=4):
+        self.workers = max(1, int(workers))
+        self.deleted = 0
+        self.marked_read = 0
+        self.failed = 0
+
+        # (convo_id, message_id) in Einfüge-Reihenfolge
+        self._deletes = {}
+        # convo_id -> (sent_at, message_id) der neuesten verarbeiteten Nachricht
+        self._reads = {}
+        self._lock = threading.Lock()
+
+    def queue_delete(self, convo_id, message_id):
+        """Merkt eine Nachricht zum Löschen vor"""
+        with self._lock:
+            self._deletes[(convo_id, message_id)] = True
+
+    def queue_read(self, convo_id, message_id, sent_at=''):
+        """Merkt einen Chat als gelesen vor (bis zur neuesten Nachricht)"""
+        with self._lock:
+            current = self._reads.get(convo_id)
+            if current is None or str(sent_at) >= str(current[0]):
+                self._reads[convo_id] = (sent_at, message_id)
+
+    def pending(self):
+        """Anzahl ausstehender Aufträge"""
+        with self._lock:
+            return len(self._deletes) + len(self._reads)
+
+    def flush(self, chat):
+        """
+        Führt alle gesammelten Aufträge aus
+
+        Args:
+            chat: Chat-Proxy-Client (mit .chat.bsky.convo)
+
+        Returns:
+            Anzahl erfolgreicher Aufträge
+        """
+        with self._lock:
+            deletes = list(self._deletes)
+            reads = [(convo_id, message_id) for convo_id, (_, message_id) in self._reads.items()]
+            self._deletes = {}
+            self._reads = {}
+
+        if not deletes and not reads:
+            return 0
+
+        convo = chat.chat.bsky.convo
+
+        def delete(item):
+            convo_id, message_id = item
+            convo.delete_message_for_self({'convo_id': convo_id, 'message_id': message_id})
+
+        def mark_read(item):
+            convo_id, message_id = item
+            convo.update_read({'convo_id': convo_id, 'message_id': message_id})
+
+        tasks = [(delete, item) for item in deletes] + [(mark_read, item) for item in reads]
+        deleted = 0
+        marked_read = 0
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(tasks))) as executor:
+            futures = [(func, item, executor.submit(func, item)) for func, item in tasks]
+
+            for func, item, future in futures:
+                try:
+                    future.result()
+                    if func is delete:
+                        deleted += 1
+                    else:
+                        marked_read += 1
+                except Exception as e:
+                    with self._lock:
+                        self.failed += 1
+                    action = 'löschen' if func is delete else 'als gelesen markieren'
+                    print(f"⚠️ Konnte DM {item[1]} nicht {action}: {e}")
+
+        with self._lock:
+            self.deleted += deleted
+            self.marked_read += marked_read
+
+        print(f"🗑️  {deleted}/{len(deletes)} DM(s) gelöscht, {marked_read}/{len(reads)} Chat(s) als gelesen markiert")
+        return deleted + marked_read
@@ -0,0 +1,310 @@
+"""
+HTML-Extraktion in einem Prozess-Pool
+
+Trafilatura und der BeautifulSoup-Fallback (html.parser) sind reine
+CPU-Arbeit und halten dabei den GIL - eine schwere Seite bremst sonst
+jeden anderen Thread des Bots (Polling, Claude, Posten). Deshalb laufen
+sie in eigenen Prozessen:
+
+- Die HTML-Bytes gehen über Shared Memory an den Worker (ein memcpy statt
+  Pickle + Pipe), nur falls kein Shared Memory angelegt werden kann als
+  normales Argument
+- CPU-Zeit-Limit pro Dokument: ITIMER_PROF bricht die Extraktion im Worker
+  ab, RLIMIT_CPU beendet einen Worker der in C-Code (lxml) hängen bleibt
+- Worker werden nach max_tasks_per_child Dokumenten ersetzt, damit
+  Speicherlecks in den Parsern nicht unbegrenzt wachsen
+- Start per forkserver (kein fork() aus dem Bot mit seinen Threads);
+  trafilatura und bs4 werden im Forkserver vorgeladen, neue Worker starten
+  deshalb ohne deren Import-Kosten. Wie bei multiprocessing üblich lädt
+  jeder Worker das Startskript (main.py) einmal als __mp_main__ - dort
+  passiert ausserhalb von `if __name__ == "__main__"` nichts Teures
+
+Die Extraktionsfunktionen selbst sind normale Funktionen und können auch
+direkt (ohne Pool) aufgerufen werden.
+"""
+
+import math
+import multiprocessing
+import signal
+import threading
+import time
+from multiprocessing import shared_memory
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Im Forkserver vorgeladen (fehlende Module werden übersprungen)
+PRELOAD_MODULES = ['trafilatura', 'bs4']
+
+
+def extract_with_trafilatura(html):
+    """Extrahiert den Hauptinhalt aus HTML-Bytes mit Trafilatura (bessere Extraktion)"""
+    try:
+        import trafilatura
+
+        # Trafilatura extrahiert den Hauptinhalt (Artikel, Blog-Posts, etc.)
+        # Entfernt automatisch Menüs, Werbung, Footer, etc.
+        content = trafilatura.extract(
+            html,
+            include_comments=False,  # Keine Kommentare
+            include_tables=True,     # Tabellen beibehalten
+            no_fallback=False,       # Fallback-Methoden nutzen
+            favor_precision=True,    # Höhere Qualität, weniger Rauschen
+            with_metadata=False      # Keine Meta-Infos (Autor, Datum, etc.)
+        )
+    except Exception as e:
+        print(f"⚠️ Fehler bei Trafilatura-Extraktion: {e}")
+        return None
+
+    if content:
+        # Begrenze auf 4000 Zeichen (Kosten sparen!)
+        return content[:4000]
+    return None
+
+
+def extract_with_beautifulsoup(html, encoding=None):
+    """Extrahiert den sichtbaren Text aus HTML-Bytes mit BeautifulSoup (Fallback)"""
+    try:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, 'html.parser', from_encoding=encoding)
+
+        # Entferne Scripts, Styles, Navigation, etc.
+        for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
+            tag.decompose()
+
+        # Hole und bereinige Text
+        text = soup.get_text()
+        lines = (line.strip() for line in text.splitlines())
+        text = '\n'.join(line for line in lines if line)
+    except Exception as e:
+        print(f"⚠️ Auch Fallback fehlgeschlagen: {e}")
+        return None
+
+    # Begrenze auf 3000 Zeichen (Kosten sparen!)
+    return text[:3000]
+
+
+def extract_html(html, encoding=None):
+    """
+    Trafilatura, bei Fehlschlag BeautifulSoup auf denselben Bytes
+
+    Returns:
+        (Inhalt oder None, 'trafilatura' | 'beautifulsoup')
+    """
+    content = extract_with_trafilatura(html)
+    if content:
+        return content, 'trafilatura'
+    return extract_with_beautifulsoup(html, encoding), 'beautifulsoup'
+
+
+# --- Worker -------------------------------------------------------------------
+
+class CpuLimitExceeded(BaseException):
+    """
+    CPU-Zeit-Limit eines Dokuments überschritten
+
+    Bewusst keine Exception-Unterklasse: Trafilatura und die Extraktions-
+    funktionen fangen Exception ab und würden einfach weiterrechnen.
+    """
+
+
+def _on_cpu_limit(signum, frame):
+    raise CpuLimitExceeded()
+
+
+def _init_worker():
+    """Signal-Handler für das CPU-Limit; Imports nachholen falls nicht vorgeladen"""
+    if hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGPROF, _on_cpu_limit)
+    # Strg+C trifft die ganze Prozessgruppe - beenden macht der Hauptprozess
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for module in PRELOAD_MODULES:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _arm_cpu_limit(cpu_limit):
+    """
+    Startet das CPU-Limit für ein Dokument
+
+    ITIMER_PROF zählt CPU-Zeit (nicht Wartezeit) und löst CpuLimitExceeded
+    aus. Python-Signal-Handler laufen aber nur zwischen Bytecodes - hängt
+    der Worker in C-Code, beendet ihn das weiche RLIMIT_CPU (SIGXCPU) mit
+    etwas Reserve. Der Pool ersetzt den Worker dann.
+    """
+    if not cpu_limit or not hasattr(signal, 'setitimer'):
+        return
+    signal.setitimer(signal.ITIMER_PROF, cpu_limit)
+    if resource is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = math.ceil(_cpu_seconds() + cpu_limit * 2 + 1)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _disarm_cpu_limit():
+    if hasattr(signal, 'setitimer'):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+
+
+def _read_source(source):
+    """HTML-Bytes aus Shared Memory (Name, Länge) oder direkt übergeben"""
+    kind, *value = source
+    if kind == 'bytes':
+        return value[0]
+
+    name, size = value
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return bytes(shm.buf[:size])
+    finally:
+        shm.close()
+
+
+def _extract_task(source, encoding, cpu_limit):
+    """
+    Läuft im Worker
+
+    Returns:
+        (Inhalt oder None, Methode, CPU-Sekunden); Methode 'cpu_limit'
+        wenn das Dokument abgebrochen wurde
+    """
+    html = _read_source(source)
+    started = _cpu_seconds() if resource is not None else time.process_time()
+    try:
+        _arm_cpu_limit(cpu_limit)
+        try:
+            content, method = extract_html(html, encoding)
+        finally:
+            _disarm_cpu_limit()
+    except CpuLimitExceeded:
+        content, method = None, 'cpu_limit'
+    used = (_cpu_seconds() if resource is not None else time.process_time()) - started
+    return content, method, used
+
+
+def _context():
+    """forkserver wo vorhanden (Linux/macOS), sonst spawn"""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__] + PRELOAD_MODULES)
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+# --- Pool ---------------------------------------------------------------------
+
+class ExtractPool:
+    """
+    Prozess-Pool für die HTML-Extraktion
+
+    Args:
+        workers: Anzahl Worker-Prozesse
+        max_tasks_per_child: Worker nach so vielen Dokumenten ersetzen (0 = nie)
+        cpu_limit: CPU-Sekunden pro Dokument (0 = kein Limit)
+        timeout: Wartezeit auf ein Ergebnis in Sekunden (Default: aus cpu_limit)
+    """
+
+    def __init__(self, workers=2, max_tasks_per_child=100, cpu_limit=5.0, timeout=None):
+        self.workers = workers
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self.cpu_limit = cpu_limit
+        # Reserve für Warteschlange und Worker-Neustart (RLIMIT_CPU greift erst bei 2x + 1s)
+        self.timeout = timeout or (cpu_limit * 3 + 10 if cpu_limit else 60)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'documents': 0,
+            'shared_memory': 0,
+            'bytes': 0,
+            'cpu_seconds': 0.0,
+            'cpu_limit': 0,
+            'timeouts': 0,
+            'errors': 0
+        }
+
+    def start(self):
+        """Startet die Worker (sonst beim ersten Dokument)"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = _context().Pool(
+                    processes=self.workers,
+                    initializer=_init_worker,
+                    maxtasksperchild=self.max_tasks_per_child
+                )
+            return self._pool
+
+    def extract(self, html, encoding=None):
+        """
+        Extrahiert ein Dokument in einem Worker (blockiert nur den aufrufenden Thread)
+
+        Returns:
+            (Inhalt oder None, Methode) - Methode 'trafilatura', 'beautifulsoup',
+            'cpu_limit' (abgebrochen), 'timeout' (kein Ergebnis) oder 'error'
+        """
+        pool = self.start()
+        shm = None
+        try:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, len(html)))
+            shm.buf[:len(html)] = html
+            source = ('shm', shm.name, len(html))
+        except OSError as e:
+            # z.B. /dev/shm fehlt oder ist voll → Bytes werden mitgeschickt
+            print(f"⚠️ Shared Memory nicht verfügbar ({e}) - übergebe Kopie")
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+                shm = None
+            source = ('bytes', html)
+
+        try:
+            result = pool.apply_async(_extract_task, (source, encoding, self.cpu_limit))
+            content, method, used = result.get(self.timeout)
+        except multiprocessing.TimeoutError:
+            self._count(len(html), shm, timeouts=1)
+            print(f"⏱️ Extraktion nach {self.timeout:.0f}s abgebrochen (Worker hängt oder Pool ausgelastet)")
+            return None, 'timeout'
+        except Exception as e:
+            self._count(len(html), shm, errors=1)
+            print(f"⚠️ Fehler im Extraktions-Worker: {e}")
+            return None, 'error'
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+        self._count(len(html), shm, cpu_seconds=used, cpu_limit=int(method == 'cpu_limit'))
+        if method == 'cpu_limit':
+            print(f"⏱️ Extraktion nach {self.cpu_limit:g}s CPU-Zeit abgebrochen")
+        return content, method
+
+    def _count(self, size, shm, **increments):
+        with self._lock:
+            self._stats['documents'] += 1
+            self._stats['shared_memory'] += int(shm is not None)
+            self._stats['bytes'] += size
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, workers=self.workers, running=self._pool is not None)
+
+    def close(self):
+        """Beendet die Worker (laufende Extraktionen werden abgebrochen)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+            pool.join()
@@ -0,0 +1,915 @@
+"""
+Lokale Stand-ins für externe Dienste (zum Testen ohne echte API-Kosten)
+
+FakeAnthropicServer spricht die relevanten Teile der Anthropic HTTP-API:
+- POST /v1/messages
+- POST /v1/messages/batches
+- GET  /v1/messages/batches/<id>
+- GET  /v1/messages/batches/<id>/results (JSONL)
+
+Das echte anthropic-SDK kann über ANTHROPIC_BASE_URL darauf zeigen:
+
+    python fakes.py anthropic --port 8765
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 python main.py --dry-run
+
+FakeJetstreamServer liefert Jetstream-Events über einen lokalen Websocket
+(mit Cursor-Unterstützung) für den --stream Modus:
+
+    python fakes.py jetstream --port 6008
+    JETSTREAM_URL=ws://127.0.0.1:6008/subscribe python main.py --stream --dry-run
+
+FakePdsServer bildet PDS und Chat-Dienst nach (Notifications, Threads,
+Posten, DMs), FakeWebServer liefert HTML-Seiten für URL-Abrufe. Beide
+nutzt der Lastsimulator (simulate.py).
+"""
+
+import base64
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def _now_iso(offset_seconds=0):
+    return (datetime.now(timezone.utc) + timedelta(seconds=offset_seconds)).isoformat()
+
+
+def _last_user_text(params):
+    """Letzter Text-Block der letzten User-Nachricht"""
+    content = params.get('messages', [{}])[-1].get('content', '')
+    if isinstance(content, list):
+        texts = [block.get('text', '') for block in content if block.get('type') == 'text']
+        return texts[-1] if texts else ''
+    return content
+
+
+def fake_message(params, reply=None):
+    """Erzeugt eine Message-Antwort im Format der Anthropic-API"""
+    if reply is None:
+        mention = re.search(r'AKTUELLE MENTION \(an dich gerichtet\):\n(.*)', _last_user_text(params))
+        topic = mention.group(1) if mention else 'deine Frage'
+        reply = f"Danke für deine Nachricht zu: {topic[:120]}"
+
+    return {
+        'id': f"msg_{uuid.uuid4().hex[:24]}",
+        'type': 'message',
+        'role': 'assistant',
+        'model': params.get('model', 'fake-model'),
+        'content': [{'type': 'text', 'text': reply}],
+        'stop_reason': 'end_turn',
+        'stop_sequence': None,
+        'usage': {
+            'input_tokens': len(json.dumps(params.get('messages', []))) // 4,
+            'output_tokens': len(reply) // 4,
+            'cache_creation_input_tokens': 0,
+            'cache_read_input_tokens': 0
+        }
+    }
+
+
+class FakeAnthropicServer:
+    """
+    Lokaler HTTP-Server der die Anthropic Messages- und Batches-API nachbildet
+
+    Args:
+        port: Port (0 = beliebiger freier Port)
+        batch_delay: Sekunden bis ein Batch als 'ended' gilt
+        latency: Funktion () -> Sekunden Verzögerung pro messages.create
+        error_rate: Funktion () -> True wenn der Request mit 529 scheitern soll
+        reply: Optional fester Antworttext
+        requests_per_minute: Optional Rate-Limit für messages.create
+                             (Header anthropic-ratelimit-requests-*, sonst 429)
+        outcome: Optional Funktion custom_id -> Ergebnis eines Batch-Requests
+                 ('succeeded', 'errored', 'expired' oder 'canceled')
+    """
+
+    def __init__(self, port=0, batch_delay=1.0, latency=None, error_rate=None, reply=None,
+                 requests_per_minute=None, outcome=None):
+        self.batch_delay = batch_delay
+        self.outcome = outcome
+        self.latency = latency
+        self.error_rate = error_rate
+        self.reply = reply
+        self.requests_per_minute = requests_per_minute
+        self.rate_limited = 0
+        self._window = []
+        self.batches = {}
+        self.requests_seen = 0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                server._handle_post(self, body)
+
+            def do_GET(self):
+                server._handle_get(self)
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.port = self._httpd.server_address[1]
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _send_json(self, handler, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _result_type(self, request):
+        return self.outcome(request['custom_id']) if self.outcome else 'succeeded'
+
+    def _batch_view(self, batch):
+        ended = time.time() - batch['created'] >= self.batch_delay
+        counts = {'processing': 0, 'succeeded': 0, 'errored': 0, 'canceled': 0, 'expired': 0}
+        for request in batch['requests']:
+            counts[self._result_type(request) if ended else 'processing'] += 1
+        return {
+            'id': batch['id'],
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': counts,
+            'created_at': batch['created_at'],
+            'expires_at': batch['expires_at'],
+            'ended_at': _now_iso() if ended else None,
+            'cancel_initiated_at': None,
+            'archived_at': None,
+            'results_url': f"{self.base_url}/v1/messages/batches/{batch['id']}/results" if ended else None
+        }
+
+    def _handle_post(self, handler, body):
+        with self._lock:
+            self.requests_seen += 1
+
+        if handler.path.startswith('/v1/messages/batches'):
+            batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+            batch = {
+                'id': batch_id,
+                'requests': body.get('requests', []),
+                'created': time.time(),
+                'created_at': _now_iso(),
+                'expires_at': _now_iso(24 * 3600)
+            }
+            with self._lock:
+                self.batches[batch_id] = batch
+            self._send_json(handler, 200, self._batch_view(batch))
+            return
+
+        if handler.path.startswith('/v1/messages'):
+            headers = self._rate_limit_headers()
+            if headers and headers['anthropic-ratelimit-requests-remaining'] == '-1':
+                headers['anthropic-ratelimit-requests-remaining'] = '0'
+                with self._lock:
+                    self.rate_limited += 1
+                self._send_json(handler, 429, {
+                    'type': 'error',
+                    'error': {'type': 'rate_limit_error', 'message': 'Rate limit exceeded (fake)'}
+                }, headers)
+                return
+
+            if self.latency:
+                time.sleep(self.latency())
+            if self.error_rate and self.error_rate():
+                self._send_json(handler, 529, {
+                    'type': 'error',
+                    'error': {'type': 'overloaded_error', 'message': 'Overloaded (fake)'}
+                })
+                return
+            self._send_json(handler, 200, fake_message(body, self.reply), headers)
+            return
+
+        self._send_json(handler, 404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': handler.path}})
+
+    def _rate_limit_headers(self):
+        """Zählt den Request im 60s-Fenster (remaining -1 = Limit überschritten)"""
+        if not self.requests_per_minute:
+            return {}
+
+        now = time.time()
+        with self._lock:
+            self._window = [t for t in self._window if now - t < 60]
+            allowed = len(self._window) < self.requests_per_minute
+            if allowed:
+                self._window.append(now)
+            reset = (self._window[0] + 60) if self._window else now
+            remaining = self.requests_per_minute - len(self._window) if allowed else -1
+
+        headers = {
+            'anthropic-ratelimit-requests-limit': str(self.requests_per_minute),
+            'anthropic-ratelimit-requests-remaining': str(remaining),
+            'anthropic-ratelimit-requests-reset': datetime.fromtimestamp(reset, timezone.utc).isoformat()
+        }
+        if not allowed:
+            headers['retry-after'] = str(max(1, int(reset - now) + 1))
+        return headers
+
+    def _handle_get(self, handler):
+        match = re.match(r'^/v1/messages/batches/([^/?]+)(/results)?', handler.path)
+        batch = self.batches.get(match.group(1)) if match else None
+
+        if batch is None:
+            self._send_json(handler, 404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': handler.path}})
+            return
+
+        if not match.group(2):
+            self._send_json(handler, 200, self._batch_view(batch))
+            return
+
+        lines = []
+        for request in batch['requests']:
+            result_type = self._result_type(request)
+            if result_type == 'succeeded':
+                result = {'type': 'succeeded', 'message': fake_message(request['params'], self.reply)}
+            elif result_type == 'errored':
+                result = {'type': 'errored', 'error': {
+                    'type': 'error',
+                    'error': {'type': 'invalid_request_error', 'message': 'Invalid request (fake)'}
+                }}
+            else:
+                result = {'type': result_type}
+            lines.append(json.dumps({'custom_id': request['custom_id'], 'result': result}))
+        data = ('\n'.join(lines) + '\n').encode('utf-8')
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/binary')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def jetstream_post_event(did, rkey, text, mention_did=None, reply_to=None, time_us=None):
+    """Baut ein Jetstream-Commit-Event für einen neuen Post"""
+    record = {
+        '$type': 'app.bsky.feed.post',
+        'text': text,
+        'createdAt': _now_iso(),
+        'langs': ['de']
+    }
+
+    if mention_did:
+        record['facets'] = [{
+            'index': {'byteStart': 0, 'byteEnd': 1},
+            'features': [{'$type': 'app.bsky.richtext.facet#mention', 'did': mention_did}]
+        }]
+
+    if reply_to:
+        record['reply'] = {'root': reply_to, 'parent': reply_to}
+
+    return {
+        'did': did,
+        'time_us': time_us or int(time.time() * 1_000_000),
+        'kind': 'commit',
+        'commit': {
+            'rev': uuid.uuid4().hex[:13],
+            'operation': 'create',
+            'collection': 'app.bsky.feed.post',
+            'rkey': rkey,
+            'record': record,
+            'cid': f"bafyrei{uuid.uuid4().hex}"
+        }
+    }
+
+
+class FakeJetstreamServer:
+    """
+    Lokaler Websocket-Server der Jetstream nachbildet
+
+    Gespeicherte Events werden ab dem angefragten Cursor (time_us)
+    ausgeliefert, danach werden neue Events per push() live verteilt.
+    drop_connections() trennt alle Clients (zum Testen des Reconnects).
+
+    Args:
+        port: Port (0 = beliebiger freier Port)
+    """
+
+    def __init__(self, port=0):
+        from websockets.sync.server import serve
+
+        self.events = []
+        self.connections = 0
+        self._clients = set()
+        self._condition = threading.Condition()
+        self._server = serve(self._handle, '127.0.0.1', port)
+        self.port = self._server.socket.getsockname()[1]
+        self.url = f"ws://127.0.0.1:{self.port}/subscribe"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+    def push(self, event):
+        """Fügt ein Event hinzu und weckt alle verbundenen Clients"""
+        with self._condition:
+            self.events.append(event)
+            self._condition.notify_all()
+
+    def drop_connections(self):
+        """Trennt alle Clients (simuliert einen Verbindungsabbruch)"""
+        with self._condition:
+            clients = list(self._clients)
+        for websocket in clients:
+            websocket.close()
+
+    def _handle(self, websocket):
+        query = parse_qs(urlsplit(websocket.request.path).query)
+        cursor = int(query.get('cursor', ['0'])[0])
+
+        with self._condition:
+            self.connections += 1
+            self._clients.add(websocket)
+            # Ohne Cursor: nur Events ab jetzt
+            position = len(self.events) if 'cursor' not in query else 0
+
+        try:
+            while True:
+                with self._condition:
+                    while position >= len(self.events):
+                        self._condition.wait(timeout=1)
+                        if websocket.state.name != 'OPEN':
+                            return
+                    pending = self.events[position:]
+                    position = len(self.events)
+
+                for event in pending:
+                    if event['time_us'] > cursor:
+                        websocket.send(json.dumps(event))
+        except Exception:
+            pass
+        finally:
+            with self._condition:
+                self._clients.discard(websocket)
+
+
+def _fake_jwt(did, lifetime=3600):
+    """Unsigniertes JWT - atproto liest nur den Payload (sub, exp)"""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).rstrip(b'=').decode('ascii')
+
+    now = int(time.time())
+    return '.'.join([
+        encode({'alg': 'none', 'typ': 'JWT'}),
+        encode({'scope': 'com.atproto.appPassPrivileged', 'sub': did, 'iat': now, 'exp': now + lifetime}),
+        'fake'
+    ])
+
+
+def _did_for(handle):
+    return 'did:plc:' + re.sub(r'[^a-z0-9]', '', handle.lower())[:24]
+
+
+class FakePdsServer:
+    """
+    Lokaler XRPC-Server der die vom Bot genutzten Teile von PDS und Chat-Dienst nachbildet
+
+    Der echte atproto-Client zeigt per base_url darauf; Chat-Calls kommen
+    über denselben Server (der Chat-Proxy-Header wird ignoriert).
+
+    Unterstützt: createSession/refreshSession/getSession, getProfile,
+    listNotifications, updateSeen, getPostThread, createRecord sowie
+    chat.bsky.convo getLog, listConvos, getMessages, sendMessage,
+    deleteMessageForSelf und updateRead.
+
+    Last erzeugen: add_mention() und add_dm(). Jede Antwort des Bots ruft
+    on_reply(kind, target, text) auf ('mention' bei einem öffentlichen Reply
+    mit der URI des Eltern-Posts - auch für DMs, die der Bot öffentlich
+    beantwortet -, 'dm' bei einer Chat-Nachricht mit der Convo-ID).
+
+    Args:
+        port: Port (0 = beliebiger freier Port)
+        handle: Handle des Bot-Kontos
+        latency: Funktion () -> Sekunden Verzögerung pro PDS-Request
+        error_rate: Funktion () -> True wenn der Request mit 502 scheitern soll
+                    (Login-Endpunkte com.atproto.server.* sind ausgenommen)
+        chat_latency: Wie latency, für chat.bsky.* Requests
+        chat_error_rate: Wie error_rate, für chat.bsky.* Requests
+    """
+
+    def __init__(self, port=0, handle='sagemate.test', latency=None, error_rate=None,
+                 chat_latency=None, chat_error_rate=None):
+        self.handle = handle
+        self.did = _did_for(handle)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.chat_latency = chat_latency
+        self.chat_error_rate = chat_error_rate
+        self.on_reply = None
+
+        # uri -> {'post': postView, 'parent': uri, 'replies': [uri]}
+        self.posts = {}
+        # Älteste zuerst
+        self.notifications = []
+        self.seen_at = ''
+        # convo_id -> {'member': profile, 'messages': [messageView], 'unread': int, 'rev': str}
+        self.convos = {}
+        # (rev, event) in Reihenfolge
+        self.chat_log = []
+        self.replies = []
+        self.dm_replies = []
+        self.requests_seen = 0
+        self.errors_injected = 0
+
+        self._counter = 0
+        self._last_time = 0.0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._dispatch(self, None)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                server._dispatch(self, json.loads(self.rfile.read(length) or b'{}'))
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    # --- Daten ---------------------------------------------------------------
+
+    def _next_id(self):
+        """Fortlaufende ID (Lock muss gehalten werden)"""
+        self._counter += 1
+        return self._counter
+
+    def _timestamp(self):
+        """Streng steigender Zeitstempel (Lock muss gehalten werden)"""
+        self._last_time = max(time.time(), self._last_time + 1e-6)
+        return datetime.fromtimestamp(self._last_time, timezone.utc).isoformat(timespec='microseconds').replace('+00:00', 'Z')
+
+    def _profile(self, handle):
+        return {'did': _did_for(handle), 'handle': handle, 'displayName': handle.split('.')[0]}
+
+    def _create_post(self, author, record, parent_uri=None):
+        """Speichert einen Post (Lock muss gehalten werden)"""
+        rkey = f"3fake{self._next_id():08d}"
+        uri = f"at://{_did_for(author)}/app.bsky.feed.post/{rkey}"
+        post = {
+            'uri': uri,
+            'cid': f"bafyrei{uuid.uuid4().hex}",
+            'author': self._profile(author),
+            'record': record,
+            'indexedAt': self._timestamp(),
+            'replyCount': 0,
+            'repostCount': 0,
+            'likeCount': 0,
+            'labels': []
+        }
+        self.posts[uri] = {'post': post, 'parent': parent_uri, 'replies': []}
+        if parent_uri in self.posts:
+            self.posts[parent_uri]['replies'].append(uri)
+            self.posts[parent_uri]['post']['replyCount'] += 1
+        return post
+
+    def _post_record(self, text, url=None, mention=False, parent_uri=None):
+        """Post-Record mit Mention-/Link-Facets (Lock muss gehalten werden)"""
+        record = {'$type': 'app.bsky.feed.post', 'text': text, 'createdAt': self._timestamp(), 'langs': ['de']}
+        facets = []
+        encoded = text.encode('utf-8')
+
+        if mention:
+            tag = f"@{self.handle}".encode('utf-8')
+            start = encoded.find(tag)
+            if start >= 0:
+                facets.append({
+                    'index': {'byteStart': start, 'byteEnd': start + len(tag)},
+                    'features': [{'$type': 'app.bsky.richtext.facet#mention', 'did': self.did}]
+                })
+        if url:
+            start = encoded.find(url.encode('utf-8'))
+            if start >= 0:
+                facets.append({
+                    'index': {'byteStart': start, 'byteEnd': start + len(url.encode('utf-8'))},
+                    'features': [{'$type': 'app.bsky.richtext.facet#link', 'uri': url}]
+                })
+        if facets:
+            record['facets'] = facets
+
+        if parent_uri in self.posts:
+            parent = self.posts[parent_uri]
+            root_uri = parent_uri
+            while self.posts.get(root_uri, {}).get('parent') in self.posts:
+                root_uri = self.posts[root_uri]['parent']
+            ref = lambda uri: {'uri': uri, 'cid': self.posts[uri]['post']['cid']}
+            record['reply'] = {'root': ref(root_uri), 'parent': ref(parent_uri)}
+
+        return record
+
+    def add_post(self, author, text, url=None, parent_uri=None):
+        """Legt einen normalen Post an (ohne Mention) und liefert seine URI"""
+        with self._lock:
+            record = self._post_record(text, url=url, parent_uri=parent_uri)
+            return self._create_post(author, record, parent_uri)['uri']
+
+    def add_mention(self, author, text, url=None, parent_uri=None):
+        """
+        Legt einen Post mit Mention des Bots samt Notification an
+
+        Returns:
+            URI des Posts
+        """
+        with self._lock:
+            text = f"@{self.handle} {text}" + (f" {url}" if url else '')
+            record = self._post_record(text, url=url, mention=True, parent_uri=parent_uri)
+            post = self._create_post(author, record, parent_uri)
+            self.notifications.append({
+                'uri': post['uri'],
+                'cid': post['cid'],
+                'author': post['author'],
+                'reason': 'mention',
+                'record': record,
+                'indexedAt': post['indexedAt'],
+                'labels': []
+            })
+            return post['uri']
+
+    def _message_view(self, sender_did, text, embed=None):
+        """Chat-Nachricht (Lock muss gehalten werden)"""
+        message = {
+            '$type': 'chat.bsky.convo.defs#messageView',
+            'id': f"msg{self._next_id():08d}",
+            'rev': f"{self._next_id():012d}",
+            'text': text,
+            'sender': {'did': sender_did},
+            'sentAt': self._timestamp()
+        }
+        if embed:
+            message['embed'] = embed
+        return message
+
+    def _log(self, convo_id, message, member):
+        """Hängt ein logCreateMessage-Event an das Chat-Log (Lock muss gehalten werden)"""
+        self.chat_log.append((message['rev'], {
+            '$type': 'chat.bsky.convo.defs#logCreateMessage',
+            'rev': message['rev'],
+            'convoId': convo_id,
+            'message': message,
+            'relatedProfiles': [member, {'did': self.did, 'handle': self.handle}]
+        }))
+
+    def add_dm(self, sender, post_uri, text=''):
+        """
+        Schickt dem Bot eine DM mit Verweis auf einen Post ("Per Direktnachricht senden")
+
+        Returns:
+            Convo-ID (ein Chat pro Absender)
+        """
+        with self._lock:
+            entry = self.posts[post_uri]
+            post = entry['post']
+            embed = {
+                '$type': 'app.bsky.embed.record#view',
+                'record': {
+                    '$type': 'app.bsky.embed.record#viewRecord',
+                    'uri': post['uri'],
+                    'cid': post['cid'],
+                    'author': post['author'],
+                    'value': post['record'],
+                    'indexedAt': post['indexedAt']
+                }
+            }
+
+            convo_id = f"convo-{_did_for(sender)[8:]}"
+            member = self._profile(sender)
+            convo = self.convos.setdefault(convo_id, {'member': member, 'messages': [], 'unread': 0, 'rev': '0'})
+            message = self._message_view(member['did'], text, embed)
+            convo['messages'].append(message)
+            convo['unread'] += 1
+            convo['rev'] = message['rev']
+            self._log(convo_id, message, member)
+            return convo_id
+
+    def _convo_view(self, convo_id):
+        convo = self.convos[convo_id]
+        view = {
+            'id': convo_id,
+            'rev': convo['rev'],
+            'members': [{'did': self.did, 'handle': self.handle}, convo['member']],
+            'muted': False,
+            'unreadCount': convo['unread']
+        }
+        if convo['messages']:
+            view['lastMessage'] = convo['messages'][-1]
+        return view
+
+    def _thread_view(self, uri, depth, parent_height):
+        entry = self.posts[uri]
+        view = {'$type': 'app.bsky.feed.defs#threadViewPost', 'post': entry['post']}
+        if parent_height > 0 and entry['parent'] in self.posts:
+            view['parent'] = self._thread_view(entry['parent'], 0, parent_height - 1)
+        if depth > 0:
+            view['replies'] = [self._thread_view(reply, depth - 1, 0) for reply in entry['replies']]
+        return view
+
+    # --- HTTP ----------------------------------------------------------------
+
+    def _send_json(self, handler, status, payload=None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        handler.send_response(status)
+        if payload is not None:
+            handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _dispatch(self, handler, body):
+        parts = urlsplit(handler.path)
+        nsid = parts.path.rsplit('/', 1)[-1]
+        params = {key: values if key == 'reasons' else values[0] for key, values in parse_qs(parts.query).items()}
+
+        with self._lock:
+            self.requests_seen += 1
+
+        is_chat = nsid.startswith('chat.bsky.')
+        latency = self.chat_latency if is_chat else self.latency
+        error_rate = self.chat_error_rate if is_chat else self.error_rate
+
+        if latency:
+            time.sleep(latency())
+        if error_rate and not nsid.startswith('com.atproto.server.') and error_rate():
+            with self._lock:
+                self.errors_injected += 1
+            self._send_json(handler, 502, {'error': 'UpstreamFailure', 'message': 'Injected failure (fake)'})
+            return
+
+        method = getattr(self, '_xrpc_' + nsid.replace('.', '_'), None)
+        if method is None:
+            self._send_json(handler, 501, {'error': 'MethodNotImplemented', 'message': nsid})
+            return
+
+        try:
+            with self._lock:
+                status, payload = method(params, body or {})
+        except KeyError as e:
+            status, payload = 400, {'error': 'NotFound', 'message': f"Not found: {e}"}
+
+        self._send_json(handler, status, payload)
+
+    # --- Endpunkte (laufen unter dem Lock) -----------------------------------
+
+    def _session(self):
+        return {
+            'accessJwt': _fake_jwt(self.did),
+            'refreshJwt': _fake_jwt(self.did, lifetime=90 * 24 * 3600),
+            'handle': self.handle,
+            'did': self.did,
+            'active': True
+        }
+
+    def _xrpc_com_atproto_server_createSession(self, params, body):
+        return 200, self._session()
+
+    def _xrpc_com_atproto_server_refreshSession(self, params, body):
+        return 200, self._session()
+
+    def _xrpc_com_atproto_server_getSession(self, params, body):
+        return 200, {'handle': self.handle, 'did': self.did, 'active': True}
+
+    def _xrpc_app_bsky_actor_getProfile(self, params, body):
+        actor = params['actor']
+        handle = self.handle if actor in (self.handle, self.did) else actor
+        return 200, dict(self._profile(handle), did=self.did if handle == self.handle else _did_for(handle),
+                         followersCount=42, followsCount=7, postsCount=len(self.replies))
+
+    def _xrpc_app_bsky_notification_listNotifications(self, params, body):
+        limit = int(params.get('limit', 50))
+        cursor = params.get('cursor')
+
+        page = []
+        for notification in reversed(self.notifications):
+            if cursor and notification['indexedAt'] >= cursor:
+                continue
+            page.append(dict(notification, isRead=notification['indexedAt'] <= self.seen_at))
+            if len(page) >= limit:
+                break
+
+        response = {'notifications': page}
+        if len(page) >= limit:
+            response['cursor'] = page[-1]['indexedAt']
+        return 200, response
+
+    def _xrpc_app_bsky_notification_updateSeen(self, params, body):
+        self.seen_at = max(self.seen_at, body.get('seenAt', ''))
+        return 200, None
+
+    def _xrpc_app_bsky_feed_getPostThread(self, params, body):
+        uri = params['uri']
+        thread = self._thread_view(uri, int(params.get('depth', 6)), int(params.get('parentHeight', 80)))
+        return 200, {'thread': thread}
+
+    def _xrpc_com_atproto_repo_createRecord(self, params, body):
+        record = body['record']
+        parent_uri = ((record.get('reply') or {}).get('parent') or {}).get('uri')
+        post = self._create_post(self.handle, record, parent_uri)
+
+        self.replies.append((parent_uri, record.get('text', ''), time.time()))
+        if self.on_reply and parent_uri:
+            self.on_reply('mention', parent_uri, record.get('text', ''))
+        return 200, {'uri': post['uri'], 'cid': post['cid']}
+
+    def _xrpc_chat_bsky_convo_getLog(self, params, body):
+        cursor = params.get('cursor') or ''
+        logs = [event for rev, event in self.chat_log if rev > cursor][:100]
+        return 200, {'logs': logs, 'cursor': logs[-1]['rev'] if logs else (cursor or None)}
+
+    def _xrpc_chat_bsky_convo_listConvos(self, params, body):
+        return 200, {'convos': [self._convo_view(convo_id) for convo_id in self.convos]}
+
+    def _xrpc_chat_bsky_convo_getMessages(self, params, body):
+        convo = self.convos[params['convoId']]
+        return 200, {'messages': list(reversed(convo['messages']))}
+
+    def _xrpc_chat_bsky_convo_sendMessage(self, params, body):
+        convo_id = body['convoId']
+        convo = self.convos[convo_id]
+        text = body['message']['text']
+        message = self._message_view(self.did, text)
+        convo['messages'].append(message)
+        convo['rev'] = message['rev']
+        self._log(convo_id, message, convo['member'])
+
+        self.dm_replies.append((convo_id, text, time.time()))
+        if self.on_reply:
+            self.on_reply('dm', convo_id, text)
+        return 200, message
+
+    def _xrpc_chat_bsky_convo_deleteMessageForSelf(self, params, body):
+        convo = self.convos[body['convoId']]
+        for message in convo['messages']:
+            if message['id'] == body['messageId']:
+                convo['messages'].remove(message)
+                return 200, {
+                    '$type': 'chat.bsky.convo.defs#deletedMessageView',
+                    'id': message['id'],
+                    'rev': message['rev'],
+                    'sender': message['sender'],
+                    'sentAt': message['sentAt']
+                }
+        raise KeyError(body['messageId'])
+
+    def _xrpc_chat_bsky_convo_updateRead(self, params, body):
+        self.convos[body['convoId']]['unread'] = 0
+        return 200, {'convo': self._convo_view(body['convoId'])}
+
+
+class FakeWebServer:
+    """
+    Lokaler Webserver für URL-Abrufe
+
+    Liefert unter /page/<n> HTML-Seiten aus (reihum aus `pages`), damit der
+    Bot Links in Mentions ohne Internet abrufen und extrahieren kann.
+
+    Args:
+        pages: Liste von HTML-Dokumenten (Bytes)
+        port: Port (0 = beliebiger freier Port)
+        latency: Funktion () -> Sekunden Verzögerung pro Request
+        error_rate: Funktion () -> True wenn der Request mit 500 scheitern soll
+    """
+
+    def __init__(self, pages, port=0, latency=None, error_rate=None):
+        if not pages:
+            raise ValueError("FakeWebServer braucht mindestens eine Seite")
+        self.pages = pages
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests_seen = 0
+        self.errors_injected = 0
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server._handle_get(self)
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def url(self, n):
+        return f"{self.base_url}/page/{n}"
+
+    def _handle_get(self, handler):
+        with self._lock:
+            self.requests_seen += 1
+
+        if self.latency:
+            time.sleep(self.latency())
+
+        match = re.match(r'^/page/(\d+)', handler.path)
+        if not match or (self.error_rate and self.error_rate()):
+            if match:
+                with self._lock:
+                    self.errors_injected += 1
+            handler.send_response(500 if match else 404)
+            handler.send_header('Content-Length', '0')
+            handler.end_headers()
+            return
+
+        data = self.pages[int(match.group(1)) % len(self.pages)]
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/html; charset=utf-8')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def main():
+    """Startet einen Stand-in als eigenständigen Prozess"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lokale Stand-ins für externe Dienste")
+    parser.add_argument('service', choices=['anthropic', 'jetstream'])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--batch-delay', type=float, default=5.0)
+    parser.add_argument('--bot-did', help="Jetstream: alle 10s eine Mention dieser DID erzeugen")
+    args = parser.parse_args()
+
+    if args.service == 'jetstream':
+        server = FakeJetstreamServer(port=args.port).start()
+        print(f"🧪 Fake-Jetstream läuft auf {server.url} (Ctrl+C zum Beenden)")
+        print(f"   JETSTREAM_URL={server.url}")
+        try:
+            count = 0
+            while True:
+                time.sleep(10)
+                if args.bot_did:
+                    count += 1
+                    server.push(jetstream_post_event(
+                        'did:plc:fakeuser', f"fake{count}", f"@bot Testfrage Nr. {count}",
+                        mention_did=args.bot_did
+                    ))
+        except KeyboardInterrupt:
+            server.stop()
+        return
+
+    server = FakeAnthropicServer(port=args.port, batch_delay=args.batch_delay).start()
+    print(f"🧪 Fake-Anthropic läuft auf {server.base_url} (Ctrl+C zum Beenden)")
+    print(f"   ANTHROPIC_BASE_URL={server.base_url}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
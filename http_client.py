@@ -0,0 +1,182 @@
+"""
+Gemeinsamer HTTP-Client für alle Webseiten-Abrufe
+
+Statt für jeden Abruf eine neue Verbindung (TCP + TLS-Handshake) aufzubauen,
+laufen alle Downloads über eine requests.Session mit Connection-Pool pro
+Host. Verbindungen bleiben offen (Keep-Alive) und werden wiederverwendet -
+gerade bei den immer gleichen News-Domains spart das viel Latenz.
+
+Downloads werden gestreamt: Nicht-HTML (PDFs, Videos, Binärdateien) wird
+anhand des Content-Type bzw. der ersten Bytes früh abgebrochen, und es
+wird nur so viel HTML gelesen wie für die Extraktion nötig ist.
+"""
+
+USER_AGENT = 'Mozilla/5.0 (compatible; SagemateBot/1.0)'
+
+# Inhaltstypen die extrahiert werden können
+HTML_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+# Typen bei denen der Header nichts aussagt → erste Bytes prüfen
+GENERIC_TYPES = ('', 'application/octet-stream', 'binary/octet-stream')
+
+CHUNK_SIZE = 16 * 1024
+SNIFF_BYTES = 1024
+
+
+class DownloadRejected(Exception):
+    """Download abgebrochen (kein HTML oder zu gross)"""
+
+
+def looks_like_html(head):
+    """Prüft anhand der ersten Bytes ob ein Dokument HTML ist"""
+    sample = head[:SNIFF_BYTES].lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    return any(marker in sample for marker in (b'<!doctype html', b'<html', b'<head', b'<body'))
+
+
+def _accept_encoding():
+    """gzip/deflate immer, Brotli nur wenn ein Decoder installiert ist"""
+    try:
+        import brotli  # noqa: F401
+        return 'gzip, deflate, br'
+    except ImportError:
+        pass
+    try:
+        import brotlicffi  # noqa: F401
+        return 'gzip, deflate, br'
+    except ImportError:
+        return 'gzip, deflate'
+
+
+class HttpClient:
+    """
+    HTTP-Client mit Keep-Alive und Connection-Pool pro Host
+
+    Args:
+        pool_hosts: Anzahl Hosts deren Pools offen gehalten werden
+        pool_maxsize: Max. offene Verbindungen pro Host
+        connect_timeout: Timeout für den Verbindungsaufbau (Sekunden)
+        read_timeout: Timeout zwischen zwei empfangenen Datenblöcken (Sekunden)
+        max_bytes: Harte Obergrenze - grössere Dokumente (laut Content-Length)
+                   werden gar nicht erst gelesen
+        enough_bytes: Nach so vielen Bytes HTML wird das Lesen beendet, der
+                      Rest der Seite wird für die Extraktion nicht gebraucht
+    """
+
+    def __init__(self, pool_hosts=20, pool_maxsize=4, connect_timeout=3.05, read_timeout=10,
+                 max_bytes=10 * 1024 * 1024, enough_bytes=1024 * 1024):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_bytes = max_bytes
+        self.enough_bytes = min(enough_bytes, max_bytes)
+
+        # requests erst hier importieren - main.py startet ohne HTTP-Stack
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_hosts,
+            pool_maxsize=pool_maxsize,
+            pool_block=False  # Bei vollem Pool lieber kurz eine Extra-Verbindung
+        )
+
+        self.session = requests.Session()
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Encoding': _accept_encoding(),
+            'Connection': 'keep-alive'
+        })
+
+    def get(self, url, headers=None, **kwargs):
+        """GET über den gemeinsamen Pool (getrennte Connect-/Read-Timeouts)"""
+        kwargs.setdefault('timeout', (self.connect_timeout, self.read_timeout))
+        return self.session.get(url, headers=headers, **kwargs)
+
+    def get_limited(self, url, headers=None, allowed_types=HTML_TYPES):
+        """
+        Gestreamter GET mit Byte-Limit und Inhaltstyp-Prüfung
+
+        Raises:
+            DownloadRejected: Kein HTML oder laut Content-Length zu gross
+
+        Returns:
+            (response, body, truncated) - body enthält höchstens
+            enough_bytes Bytes, truncated ist True wenn vorzeitig beendet
+        """
+        response = self.get(url, headers=headers, stream=True)
+
+        try:
+            # 304 und Fehlerseiten: Body wird nicht gebraucht
+            if response.status_code == 304 or response.status_code >= 400:
+                return response, b'', False
+
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            sniff = content_type in GENERIC_TYPES
+
+            if not sniff and content_type not in allowed_types:
+                raise DownloadRejected(f"Kein HTML-Inhalt ({content_type})")
+
+            length = response.headers.get('Content-Length', '')
+            if length.isdigit() and int(length) > self.max_bytes:
+                raise DownloadRejected(
+                    f"Zu gross ({int(length) // 1024} KB, Limit {self.max_bytes // 1024} KB)"
+                )
+
+            chunks = []
+            received = 0
+            truncated = False
+
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                chunks.append(chunk)
+                received += len(chunk)
+
+                # Unklarer Content-Type: nach den ersten Bytes entscheiden
+                if sniff and received >= SNIFF_BYTES:
+                    if not looks_like_html(b''.join(chunks)):
+                        raise DownloadRejected("Kein HTML-Inhalt (erkannt an den ersten Bytes)")
+                    sniff = False
+
+                if received >= self.enough_bytes:
+                    truncated = True
+                    break
+
+            body = b''.join(chunks)[:self.enough_bytes]
+
+            if sniff and not looks_like_html(body):
+                raise DownloadRejected("Kein HTML-Inhalt (erkannt an den ersten Bytes)")
+
+            return response, body, truncated
+
+        finally:
+            # Vollständig gelesene Verbindungen gehen zurück in den Pool,
+            # vorzeitig abgebrochene werden geschlossen
+            response.close()
+
+    def stats(self):
+        """
+        Statistik der Connection-Pools
+
+        Returns:
+            Dict mit Summen und pro Host: Requests, aufgebaute Verbindungen,
+            wiederverwendete Verbindungen
+        """
+        pools = self._adapter.poolmanager.pools
+        hosts = {}
+
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            hosts[pool.host] = {
+                'requests': pool.num_requests,
+                'connections': pool.num_connections,
+                'reused': max(0, pool.num_requests - pool.num_connections)
+            }
+
+        return {
+            'hosts': hosts,
+            'requests': sum(h['requests'] for h in hosts.values()),
+            'connections': sum(h['connections'] for h in hosts.values()),
+            'reused': sum(h['reused'] for h in hosts.values())
+        }
@@ -0,0 +1,137 @@
+"""
+Langlebiger Claude-Client und System-Prompt im Speicher
+
+- ClaudeClient: ein Anthropic-Client pro Prozess. Er hält den warmen
+  HTTP-Connection-Pool, Timeouts und Retry-Policy - statt bei jedem
+  Aufruf einen neuen Client (und neue TLS-Handshakes) zu bauen.
+- SystemPrompt: hält system_prompt.txt im Speicher und liest die Datei
+  nur neu, wenn sich ihre mtime ändert. Persona-Änderungen greifen so
+  ohne Neustart und ohne Datei-I/O pro Aufruf.
+
+Das anthropic-SDK wird erst beim ersten ClaudeClient importiert (kurzer
+Start, solange noch kein Claude-Call nötig ist).
+"""
+
+import os
+import threading
+import time
+
+from rate_limit import anthropic_rate_limit
+
+DEFAULT_SYSTEM_PROMPT = "Du bist ein hilfreicher Assistent auf Bluesky. Antworte kurz und prägnant."
+
+
+class SystemPrompt:
+    """
+    System-Prompt aus Datei mit Hot-Reload über die mtime
+
+    Args:
+        path: Pfad zur Prompt-Datei
+        default: Prompt falls die Datei fehlt
+    """
+
+    def __init__(self, path='system_prompt.txt', default=DEFAULT_SYSTEM_PROMPT):
+        self.path = path
+        self.default = default
+        self._text = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Liefert den aktuellen Prompt (liest die Datei nur nach Änderung neu)"""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        with self._lock:
+            if self._text is not None and mtime == self._mtime:
+                return self._text
+
+            if mtime is None:
+                print(f"⚠️ {self.path} nicht gefunden, nutze Standard-Prompt")
+                self._text = self.default
+            else:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._text = f.read().strip()
+                if self._mtime is not None:
+                    print(f"🔄 System-Prompt neu geladen ({self.path} geändert)")
+
+            self._mtime = mtime
+            return self._text
+
+
+class ClaudeClient:
+    """
+    Prozessweiter Claude-Client mit festem Modell, Timeouts und Retries
+
+    Args:
+        api_key: Anthropic API Key
+        model: Modell-ID für alle Aufrufe
+        timeout: Gesamt-Timeout pro Request (Sekunden)
+        connect_timeout: Timeout für den Verbindungsaufbau (Sekunden)
+        max_retries: Automatische Wiederholungen bei 429/5xx/Netzwerkfehlern
+            (mit limiter: nur 5xx/Netzwerkfehler, 429 regelt der Limiter)
+        limiter: Optional RateLimiter (wartet vor jedem Call, lernt aus den Headern)
+        rate_limit_retries: Zusätzliche Versuche nach einem 429 (nach Wartezeit)
+    """
+
+    def __init__(self, api_key, model, timeout=60, connect_timeout=5, max_retries=3,
+                 limiter=None, rate_limit_retries=3):
+        self.model = model
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.rate_limit_retries = rate_limit_retries
+
+        import anthropic
+        self._rate_limit_error = anthropic.RateLimitError
+        # Was das SDK selbst wiederholen würde (ausser 429)
+        self._transient_errors = (anthropic.APIConnectionError, anthropic.APIStatusError)
+        self.client = anthropic.Anthropic(
+            api_key=api_key,
+            timeout=anthropic.Timeout(timeout, connect=connect_timeout),
+            max_retries=max_retries
+        )
+        # Mit Limiter wiederholt create() selbst - sonst würden SDK-Retries
+        # in jedem 429-Versuch nochmals wiederholen (bis 16 Requests)
+        self._single_try = self.client.with_options(max_retries=0)
+
+    def create(self, **kwargs):
+        """
+        messages.create mit dem konfigurierten Modell
+
+        Mit limiter: wartet auf ein freies Token und übernimmt die
+        Rate-Limit-Header. Das SDK wiederholt dann nichts selbst: ein 429
+        wird nach der Wartezeit des Limiters erneut versucht (höchstens
+        rate_limit_retries mal), 5xx/Netzwerkfehler mit Backoff (höchstens
+        max_retries mal).
+        """
+        kwargs.setdefault('model', self.model)
+
+        if self.limiter is None:
+            return self.client.messages.create(**kwargs)
+
+        attempt = 0
+        failures = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                raw = self._single_try.messages.with_raw_response.create(**kwargs)
+            except self._rate_limit_error as e:
+                self.limiter.observe(**anthropic_rate_limit(e.response.headers), status=429)
+                if attempt >= self.rate_limit_retries:
+                    raise
+                attempt += 1
+                print(f"🚦 {self.limiter.name}: Rate-Limit erreicht - warte und versuche erneut ({attempt}/{self.rate_limit_retries})")
+                continue
+            except self._transient_errors as e:
+                status = getattr(e, 'status_code', None)
+                if failures >= self.max_retries or (status is not None and status < 500 and status not in (408, 409)):
+                    raise
+                failures += 1
+                print(f"🔄 Claude-Fehler ({status or type(e).__name__}) - neuer Versuch ({failures}/{self.max_retries})")
+                time.sleep(min(8.0, 0.5 * 2 ** (failures - 1)))
+                continue
+
+            self.limiter.observe(**anthropic_rate_limit(raw.headers))
+            return raw.parse()
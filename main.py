@@ -3,14 +3,30 @@ warnings.filterwarnings('ignore', category=UserWarning, module='pydantic')
 
 import os
 import re
+import threading
 import time
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import OrderedDict
+from datetime import datetime, timezone
+from urllib.parse import urlparse
 from dotenv import load_dotenv
-import anthropic
-from atproto import Client
-import trafilatura
+
+from batch_mode import STORE_KEY as PENDING_BATCHES_KEY, BatchRunner
+from capture import Recorder, capture_client, capture_http, capture_llm
+from content_cache import ContentCache
+from dm_housekeeping import DmHousekeeping
+from extract_pool import ExtractPool, extract_html, extract_with_beautifulsoup, extract_with_trafilatura
+from http_client import DownloadRejected, HttpClient
+from llm_client import ClaudeClient, SystemPrompt
+from metrics import MetricsServer, Registry
+from pipeline import Pipeline, Stage
+from prompt_builder import PromptBuilder, describe_packing, request_chars
+from rate_limit import RateLimiter, limit_client
+from scheduler import AdaptiveSchedule
+from state_store import StateStore
+from stream import JETSTREAM_URL, JetstreamSubscriber
+from thread_cache import ThreadCache
+from work_queue import DONE_STATES, STATES, WorkQueue
 
 # .env laden
 load_dotenv()
@@ -20,7 +36,189 @@ http_proxy = os.getenv('HTTP_PROXY')
 if http_proxy:
     os.environ['HTTP_PROXY'] = http_proxy
     os.environ['HTTPS_PROXY'] = os.getenv('HTTPS_PROXY', http_proxy)
-    print(f"🌐 Proxy aktiviert: {http_proxy}\n")
+    # Nicht nochmal in den Extraktions-Workern (laden main.py als __mp_main__)
+    if __name__ != '__mp_main__':
+        print(f"🌐 Proxy aktiviert: {http_proxy}\n")
+
+# Claude: Modell, Timeouts und Retry-Policy des prozessweiten Clients
+CLAUDE_MODEL = os.getenv('CLAUDE_MODEL', 'claude-sonnet-4-5-20250929')
+CLAUDE_TIMEOUT = float(os.getenv('CLAUDE_TIMEOUT', '60'))
+CLAUDE_CONNECT_TIMEOUT = float(os.getenv('CLAUDE_CONNECT_TIMEOUT', '5'))
+CLAUDE_MAX_RETRIES = int(os.getenv('CLAUDE_MAX_RETRIES', '3'))
+_claude_client = None
+_claude_client_lock = threading.Lock()
+
+# Schnellstart: Health-Checks überspringen wenn sie so lange (Sekunden) her und erfolgreich waren
+HEALTH_CHECK_MAX_AGE = int(os.getenv('HEALTH_CHECK_MAX_AGE', str(6 * 3600)))
+
+# System-Prompt bleibt im Speicher, neu geladen nur wenn die Datei sich ändert
+_system_prompt = SystemPrompt('system_prompt.txt')
+
+# Prompt: Input-Token-Budget pro Request (inkl. System-Prompt), Vorrang der
+# nächsten Vorgänger-Posts vor den Webseiten und Obergrenze pro Webseite
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '3000'))
+PROMPT_NEAREST_POSTS = int(os.getenv('PROMPT_NEAREST_POSTS', '3'))
+PROMPT_URL_MAX_TOKENS = int(os.getenv('PROMPT_URL_MAX_TOKENS', '600'))
+_prompt_builder = PromptBuilder(
+    budget=PROMPT_TOKEN_BUDGET,
+    nearest_posts=PROMPT_NEAREST_POSTS,
+    url_max_tokens=PROMPT_URL_MAX_TOKENS
+)
+
+# Backlog-Modus: ab so vielen wartenden Items über die Message Batches API
+BATCH_THRESHOLD = int(os.getenv('BATCH_THRESHOLD', '25'))
+BATCH_CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '50'))
+BATCH_POLL_INTERVAL = float(os.getenv('BATCH_POLL_INTERVAL', '30'))
+_batch_runner = None
+_batch_runner_lock = threading.Lock()
+
+# Thread-Snapshots: jeder Thread wird pro Zyklus nur einmal geladen
+THREAD_CACHE_TTL = int(os.getenv('THREAD_CACHE_TTL', '300'))
+_thread_cache = ThreadCache(ttl=THREAD_CACHE_TTL)
+
+# Worker-Threads pro Pipeline-Stufe (Thread laden → URLs → Claude → Posten)
+PIPELINE_WORKERS = {
+    'hydrate': int(os.getenv('PIPELINE_WORKERS_HYDRATE', '4')),
+    'enrich': int(os.getenv('PIPELINE_WORKERS_ENRICH', '4')),
+    'generate': int(os.getenv('PIPELINE_WORKERS_GENERATE', '2')),
+    'post': int(os.getenv('PIPELINE_WORKERS_POST', '1'))
+}
+
+# Max. wartende Jobs zwischen zwei Stufen (Backpressure)
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '8'))
+
+# URL-Abruf: Gesamt-Deadline pro Thread und max. gleichzeitige Verbindungen pro Host
+URL_FETCH_DEADLINE = float(os.getenv('URL_FETCH_DEADLINE', '15'))
+URL_FETCH_PER_HOST = int(os.getenv('URL_FETCH_PER_HOST', '2'))
+
+# Gemeinsamer Thread-Pool für alle URL-Abrufe (über alle Jobs hinweg)
+_url_fetch_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('URL_FETCH_WORKERS', '8')),
+    thread_name_prefix='url-fetch'
+)
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+# Lokaler Speicherort für persistente Daten (auf Railway ein Volume mounten)
+DATA_DIR = os.getenv('DATA_DIR', 'data')
+
+# Cache für extrahierte Webseiten-Inhalte (TTL in Sekunden, Grösse in MB)
+CONTENT_CACHE_TTL = int(os.getenv('CONTENT_CACHE_TTL', str(24 * 3600)))
+CONTENT_CACHE_MAX_MB = int(os.getenv('CONTENT_CACHE_MAX_MB', '50'))
+_content_cache = None
+_content_cache_lock = threading.Lock()
+
+# Persistenter Bot-Zustand (Cursor, High-Water-Marks, ...)
+_state_store = None
+_state_store_lock = threading.Lock()
+
+# Persistente Arbeitswarteschlange (Anläufe pro Job, Aufbewahrung fertiger Jobs in Tagen)
+WORK_QUEUE_MAX_ATTEMPTS = int(os.getenv('WORK_QUEUE_MAX_ATTEMPTS', '3'))
+WORK_QUEUE_RETENTION_DAYS = float(os.getenv('WORK_QUEUE_RETENTION_DAYS', '7'))
+_work_queue = None
+_work_queue_lock = threading.Lock()
+
+# Notifications: Seitengrösse und max. Seiten pro Poll (Schutz bei riesigem Rückstau)
+NOTIFICATION_PAGE_SIZE = int(os.getenv('NOTIFICATION_PAGE_SIZE', '25'))
+NOTIFICATION_MAX_PAGES = int(os.getenv('NOTIFICATION_MAX_PAGES', '20'))
+
+# DMs: Seiten Chat-Log pro Poll und parallele Abrufe beim Erststart
+DM_LOG_MAX_PAGES = int(os.getenv('DM_LOG_MAX_PAGES', '20'))
+DM_FETCH_WORKERS = int(os.getenv('DM_FETCH_WORKERS', '4'))
+_dm_housekeeping = DmHousekeeping(workers=DM_FETCH_WORKERS)
+_chat_client_lock = threading.Lock()
+
+# Dauerbetrieb: adaptive Poll-Intervalle (Sekunden) - kurz bei Traffic, lang bei Leerlauf
+MENTION_POLL_MIN = float(os.getenv('MENTION_POLL_MIN', '10'))
+MENTION_POLL_MAX = float(os.getenv('MENTION_POLL_MAX', '300'))
+DM_POLL_MIN = float(os.getenv('DM_POLL_MIN', '30'))
+DM_POLL_MAX = float(os.getenv('DM_POLL_MAX', '900'))
+POLL_BACKOFF = float(os.getenv('POLL_BACKOFF', '2'))
+
+# Rate-Limits pro Dienst (Calls pro Minute) - Calls warten statt zu scheitern
+RATE_LIMIT_BLUESKY = float(os.getenv('RATE_LIMIT_BLUESKY', '300'))
+RATE_LIMIT_CHAT = float(os.getenv('RATE_LIMIT_CHAT', '120'))
+RATE_LIMIT_CLAUDE = float(os.getenv('RATE_LIMIT_CLAUDE', '50'))
+_bluesky_limiter = RateLimiter('Bluesky', RATE_LIMIT_BLUESKY, burst=10)
+_chat_limiter = RateLimiter('Chat', RATE_LIMIT_CHAT, burst=5)
+_claude_limiter = RateLimiter('Claude', RATE_LIMIT_CLAUDE, burst=5)
+
+# Metriken: Prometheus-Endpunkt im Dauer-/Stream-Betrieb (METRICS_PORT=0 → aus)
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+_metrics = Registry()
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+_stage_seconds = _metrics.histogram(
+    'sagemate_stage_duration_seconds', 'Dauer pro Job und Pipeline-Stufe', ('stage',))
+_stage_jobs = _metrics.counter(
+    'sagemate_stage_jobs_total', 'Jobs pro Pipeline-Stufe und Ergebnis', ('stage', 'outcome'))
+_call_seconds = _metrics.histogram(
+    'sagemate_call_duration_seconds', 'Dauer einzelner Aufrufe (Thread, URL, Claude, Posten)', ('call',))
+_replies_total = _metrics.counter(
+    'sagemate_replies_total', 'Beantwortete, fehlgeschlagene bzw. als Duplikat übersprungene Jobs', ('kind', 'result'))
+_prompt_tokens = _metrics.histogram(
+    'sagemate_prompt_input_tokens', 'Geschätzte Input-Tokens pro Claude-Request',
+    buckets=(500, 1000, 1500, 2000, 3000, 4000, 6000, 8000))
+_prompt_trimmed = _metrics.counter(
+    'sagemate_prompt_trimmed_total', 'Wegen des Token-Budgets ausgelassene/gekürzte Prompt-Teile', ('part', 'action'))
+_extract_documents = _metrics.counter(
+    'sagemate_extract_documents_total', 'HTML-Extraktionen nach Ergebnis', ('result',))
+
+# Beim Abruf aus Caches, Warteschlangen und Rate-Limitern übernommen (collect_metrics)
+_cache_lookups = _metrics.counter(
+    'sagemate_cache_lookups_total', 'Cache-Zugriffe nach Ergebnis', ('cache', 'result'))
+_cache_hit_ratio = _metrics.gauge('sagemate_cache_hit_ratio', 'Trefferquote seit Start', ('cache',))
+_work_queue_jobs = _metrics.gauge(
+    'sagemate_work_queue_jobs', 'Jobs in der Warteschlange pro Zustand', ('state',))
+_queue_depth = _metrics.gauge('sagemate_queue_depth', 'Ausstehende Aufträge', ('queue',))
+_rate_limit_remaining = _metrics.gauge(
+    'sagemate_rate_limit_remaining', 'Vom Server gemeldete verbleibende Calls', ('service',))
+_rate_limit_tokens = _metrics.gauge(
+    'sagemate_rate_limit_tokens', 'Freie Tokens im Token-Bucket', ('service',))
+_rate_limit_blocked = _metrics.gauge(
+    'sagemate_rate_limit_blocked_seconds', 'Sekunden bis Calls wieder erlaubt sind', ('service',))
+_rate_limit_calls = _metrics.counter(
+    'sagemate_rate_limit_calls_total', 'Calls durch den Rate-Limiter', ('service',))
+_rate_limit_throttled = _metrics.counter(
+    'sagemate_rate_limit_throttled_total', 'Erhaltene 429-Antworten', ('service',))
+_rate_limit_waited = _metrics.counter(
+    'sagemate_rate_limit_wait_seconds_total', 'Wartezeit vor Calls in Sekunden', ('service',))
+_extract_cpu_seconds = _metrics.counter(
+    'sagemate_extract_cpu_seconds_total', 'CPU-Zeit der Extraktions-Worker')
+
+# Stream-Modus: Jetstream-Endpunkt und ob auch Replies auf Bot-Posts verarbeitet werden
+STREAM_URL = os.getenv('JETSTREAM_URL', JETSTREAM_URL)
+STREAM_INCLUDE_REPLIES = os.getenv('STREAM_INCLUDE_REPLIES', 'false').lower() == 'true'
+
+# Stream-Modus: DID → Handle der Autoren (LRU, älteste fallen zuerst raus)
+HANDLE_CACHE_SIZE = 5000
+_handle_cache = OrderedDict()
+_handle_cache_lock = threading.Lock()
+
+# Mitschnitt aller ausgehenden Aufrufe (--capture PATH bzw. CAPTURE_FILE), Wiedergabe mit capture.py
+CAPTURE_FILE = os.getenv('CAPTURE_FILE')
+_recorder = None
+
+# HTTP-Pool für Webseiten-Abrufe (Keep-Alive, Pool pro Host)
+HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', '20'))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '4'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '10'))
+
+# Download-Limits: harte Obergrenze und "genug HTML" für 4000 Zeichen Extraktion
+HTTP_MAX_BYTES = int(os.getenv('HTTP_MAX_BYTES', str(10 * 1024 * 1024)))
+HTML_ENOUGH_BYTES = int(os.getenv('HTML_ENOUGH_BYTES', str(1024 * 1024)))
+_http_client = None
+_http_client_lock = threading.Lock()
+
+# HTML-Extraktion in eigenen Prozessen (hält sonst den GIL), 0 Worker → im Thread
+EXTRACT_WORKERS = int(os.getenv('EXTRACT_WORKERS', '2'))
+EXTRACT_MAX_TASKS = int(os.getenv('EXTRACT_MAX_TASKS', '100'))
+EXTRACT_CPU_LIMIT = float(os.getenv('EXTRACT_CPU_LIMIT', '5'))
+_extract_pool = None
+_extract_pool_lock = threading.Lock()
 
 
 def debug_env_vars():
@@ -48,28 +246,111 @@ def debug_env_vars():
 
 
 def load_system_prompt():
-    """Lädt den System-Prompt aus Datei"""
-    try:
-        with open('system_prompt.txt', 'r', encoding='utf-8') as f:
-            return f.read().strip()
-    except FileNotFoundError:
-        print("⚠️ system_prompt.txt nicht gefunden, nutze Standard-Prompt")
-        return "Du bist ein hilfreicher Assistent auf Bluesky. Antworte kurz und prägnant."
+    """Liefert den System-Prompt (im Speicher, Datei nur nach Änderung neu gelesen)"""
+    return _system_prompt.get()
+
+
+def get_claude_client():
+    """Liefert den prozessweiten Claude-Client (warmer Connection-Pool)"""
+    global _claude_client
+    with _claude_client_lock:
+        if _claude_client is None:
+            _claude_client = ClaudeClient(
+                api_key=os.getenv('ANTHROPIC_API_KEY'),
+                model=CLAUDE_MODEL,
+                timeout=CLAUDE_TIMEOUT,
+                connect_timeout=CLAUDE_CONNECT_TIMEOUT,
+                max_retries=CLAUDE_MAX_RETRIES,
+                limiter=_claude_limiter
+            )
+            if _recorder is not None:
+                capture_llm(_claude_client, _recorder)
+        return _claude_client
+
+
+def login_with_saved_session(client, handle, password):
+    """
+    Meldet den Client an - bevorzugt mit der gespeicherten Session
+    
+    createSession (Login mit Passwort) ist stark rate-limitiert (30 pro
+    5 Minuten, 300 pro Tag). Deshalb wird die Session im Zustandsspeicher
+    gesichert und beim Start wiederverwendet; abgelaufene Access-Tokens
+    erneuert atproto selbst über das Refresh-Token. Jede neue oder erneuerte
+    Session wird sofort wieder gespeichert.
+    Nur wenn die gespeicherte Session nicht mehr gültig ist, wird per
+    Passwort eingeloggt.
+    """
+    from atproto import exceptions
+    
+    state = get_state_store()
+    key = f"bluesky_session:{handle}"
+    
+    def save_session(event, session):
+        state.set(key, session.encode())
+    
+    client.on_session_change(save_session)
+    
+    session_string = state.get(key)
+    if session_string:
+        try:
+            client.login(session_string=session_string)
+            print("♻️  Gespeicherte Session wiederverwendet (kein neuer Login)")
+            return client
+        except exceptions.NetworkError:
+            # Netzwerkproblem ≠ ungültige Session → nicht unnötig createSession verbrauchen
+            raise
+        except Exception as e:
+            print(f"ℹ️  Gespeicherte Session ungültig ({e}) - logge neu ein")
+            state.delete(key)
+    
+    client.login(handle, password)
+    return client
+
+
+def instrument_client(client, limiter):
+    """Hängt Mitschnitt (falls aktiv) und Rate-Limiter an einen atproto-Client"""
+    if _recorder is not None:
+        # Innen: gemessen wird der Call selbst, nicht die Wartezeit im Limiter
+        capture_client(client, _recorder)
+    return limit_client(client, limiter)
+
+
+def start_capture(path):
+    """
+    Schneidet ab jetzt alle ausgehenden Aufrufe mit (atproto, Webseiten, Claude)
+    
+    Tokens, Passwörter und E-Mail-Adressen werden geschwärzt. Abspielen:
+    python capture.py PATH [--fast]
+    """
+    global _recorder
+    import atexit
+    
+    _recorder = Recorder(path, handle=os.getenv('BLUESKY_HANDLE'))
+    atexit.register(_recorder.close)
+    print(f"🎙️  Mitschnitt aktiv: {path} (Tokens und Passwörter werden geschwärzt)\n")
+
+
+def capture_mark(event, **fields):
+    """Merkt im Mitschnitt den Poll-Zeitpunkt vor (Takt für die Wiedergabe)"""
+    if _recorder is not None:
+        _recorder.mark(event, **fields)
 
 
 def test_bluesky_connection():
     """Testet die Verbindung zu Bluesky"""
     print("🔄 Verbinde mit Bluesky...")
+    from atproto import Client
     
-    client = Client()
+    # Alle Bluesky-Calls laufen durch den Rate-Limiter
+    client = instrument_client(Client(), _bluesky_limiter)
     handle = os.getenv('BLUESKY_HANDLE')
     password = os.getenv('BLUESKY_PASSWORD')
     
     try:
-        client.login(handle, password)
+        login_with_saved_session(client, handle, password)
         print(f"✅ Erfolgreich eingeloggt als: {handle}")
         
-        profile = client.get_profile(handle)
+        profile = client.me or client.get_profile(handle)
         print(f"📊 Display Name: {profile.display_name}")
         print(f"👥 Followers: {profile.followers_count}\n")
         
@@ -89,10 +370,7 @@ def test_claude_api():
         return False
     
     try:
-        client = anthropic.Anthropic(api_key=api_key)
-        
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
+        message = get_claude_client().create(
             max_tokens=50,
             messages=[{
                 "role": "user",
@@ -102,6 +380,7 @@ def test_claude_api():
         
         response = message.content[0].text
         print(f"✅ Claude antwortet: {response}\n")
+        record_health_check('claude')
         return True
         
     except Exception as e:
@@ -109,6 +388,41 @@ def test_claude_api():
         return False
 
 
+def record_health_check(name):
+    """Merkt sich den Zeitpunkt des letzten erfolgreichen Health-Checks"""
+    get_state_store().set(f"health_ok_at:{name}", time.time())
+
+
+def last_health_check_age(name):
+    """Sekunden seit dem letzten erfolgreichen Health-Check (None wenn unbekannt)"""
+    checked_at = get_state_store().get(f"health_ok_at:{name}")
+    if checked_at is None:
+        return None
+    return max(0.0, time.time() - checked_at)
+
+
+def check_claude_api_fast():
+    """
+    Claude-Check für den Schnellstart
+    
+    Der Test-Call kostet Geld und lädt das anthropic-SDK (der grösste Teil
+    der Startzeit). War der letzte Check vor weniger als
+    HEALTH_CHECK_MAX_AGE Sekunden erfolgreich, wird er übersprungen -
+    sonst läuft er im Hintergrund, während der Bot schon arbeitet.
+    """
+    age = last_health_check_age('claude')
+    if age is not None and age < HEALTH_CHECK_MAX_AGE:
+        print(f"⏩ Claude-Check übersprungen (zuletzt erfolgreich vor {age / 60:.0f} min)\n")
+        return
+    
+    def run():
+        if not test_claude_api():
+            print("⚠️ Claude-Check im Hintergrund fehlgeschlagen - Antworten scheitern bis die API wieder erreichbar ist")
+    
+    print("🔄 Claude-Check läuft im Hintergrund\n")
+    threading.Thread(target=run, name='claude-health-check', daemon=True).start()
+
+
 def extract_urls(text):
     """Extrahiert URLs aus einem Text"""
     url_pattern = r'https?://[^\s]+'
@@ -161,88 +475,262 @@ def extract_urls_from_post(post):
     return list(set(urls))
 
 
-def fetch_url_content_trafilatura(url):
-    """Holt den Inhalt einer Webseite mit Trafilatura (bessere Extraktion)"""
-    print(f"🔗 Lade Webseite mit Trafilatura: {url}")
+def download_page(url, validators=None):
+    """
+    Lädt eine Webseite genau einmal herunter
+    
+    Die Bytes werden von allen Extraktoren gemeinsam genutzt (Trafilatura
+    und BeautifulSoup-Fallback), es gibt keinen zweiten Download mehr.
+    Der Download wird gestreamt: Nicht-HTML wird früh abgebrochen und
+    nach HTML_ENOUGH_BYTES ist Schluss (reicht für die Extraktion).
+    
+    Args:
+        url: Die URL
+        validators: Optional Dict mit 'etag' / 'last_modified' eines
+                    Cache-Eintrags → bedingter GET (304 statt ganzem Body)
+    
+    Returns:
+        Dict mit status, content (Bytes), encoding, etag, last_modified
+        oder None bei Fehler
+    """
+    headers = {}
+    
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
     
     try:
-        # Download der Webseite
-        headers = {'User-Agent': 'Mozilla/5.0 (compatible; SagemateBot/1.0)'}
-        response = requests.get(url, timeout=10, headers=headers)
+        response, body, truncated = get_http_client().get_limited(url, headers=headers)
+        
+        # 304: Seite unverändert, kein Body übertragen
+        if response.status_code == 304 and validators:
+            return {
+                'status': 304,
+                'content': b'',
+                'encoding': None,
+                'etag': response.headers.get('ETag') or validators.get('etag'),
+                'last_modified': response.headers.get('Last-Modified') or validators.get('last_modified')
+            }
+        
         response.raise_for_status()
         
-        # Trafilatura extrahiert den Hauptinhalt (Artikel, Blog-Posts, etc.)
-        # Entfernt automatisch Menüs, Werbung, Footer, etc.
-        content = trafilatura.extract(
-            response.content,
-            include_comments=False,  # Keine Kommentare
-            include_tables=True,     # Tabellen beibehalten
-            no_fallback=False,       # Fallback-Methoden nutzen
-            favor_precision=True,    # Höhere Qualität, weniger Rauschen
-            with_metadata=False      # Keine Meta-Infos (Autor, Datum, etc.)
-        )
+        if truncated:
+            print(f"✂️ Download nach {len(body) // 1024} KB beendet (genug für Extraktion)")
         
-        if content:
-            # Begrenze auf 4000 Zeichen (Kosten sparen!)
-            content = content[:4000]
-            print(f"✅ Webseite geladen: {len(content)} Zeichen")
-            return content
-        else:
-            print(f"⚠️ Kein Inhalt extrahiert von {url}")
-            return None
+        return {
+            'status': response.status_code,
+            'content': body,
+            'encoding': response.encoding,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
         
+    except DownloadRejected as e:
+        print(f"⏭️ Download abgebrochen: {e}")
+        return None
     except Exception as e:
         print(f"⚠️ Fehler beim Laden der URL: {e}")
         return None
 
 
+def extract_page_content(url, page):
+    """
+    Trafilatura auf den geladenen Bytes, bei Fehlschlag BeautifulSoup auf denselben Bytes
+    
+    Läuft im Extraktions-Pool (eigene Prozesse, CPU-Limit pro Dokument),
+    mit EXTRACT_WORKERS=0 direkt im aufrufenden Thread.
+    """
+    pool = get_extract_pool()
+    if pool is None:
+        content, method = extract_html(page['content'], page['encoding'])
+    else:
+        content, method = pool.extract(page['content'], page['encoding'])
+    
+    # Leeres Ergebnis nur wenn die Extraktion durchlief (sonst cpu_limit/timeout/error)
+    extracted = method in ('trafilatura', 'beautifulsoup')
+    _extract_documents.inc(result='empty' if extracted and not content else method)
+    
+    if method == 'beautifulsoup':
+        # Trafilatura fand nichts - Fallback lief schon auf denselben Bytes
+        print(f"🔄 Fallback: BeautifulSoup für {url}")
+    
+    if content:
+        print(f"✅ Webseite geladen{' (Fallback)' if method == 'beautifulsoup' else ''}: {len(content)} Zeichen")
+    else:
+        print(f"⚠️ Kein Inhalt extrahiert von {url}")
+    return content
+
+
+def get_extract_pool():
+    """Liefert den Prozess-Pool für die HTML-Extraktion (None bei EXTRACT_WORKERS=0)"""
+    global _extract_pool
+    if EXTRACT_WORKERS <= 0:
+        return None
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            import atexit
+            
+            _extract_pool = ExtractPool(
+                workers=EXTRACT_WORKERS,
+                max_tasks_per_child=EXTRACT_MAX_TASKS,
+                cpu_limit=EXTRACT_CPU_LIMIT
+            )
+            atexit.register(_extract_pool.close)
+            print(f"🧩 Extraktions-Pool: {EXTRACT_WORKERS} Prozesse, "
+                  f"{EXTRACT_CPU_LIMIT:g}s CPU pro Seite, Neustart nach {EXTRACT_MAX_TASKS or '∞'} Seiten")
+        return _extract_pool
+
+
+def get_http_client():
+    """Liefert den gemeinsamen HTTP-Client (Keep-Alive, Pool pro Host)"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient(
+                pool_hosts=HTTP_POOL_HOSTS,
+                pool_maxsize=HTTP_POOL_MAXSIZE,
+                connect_timeout=HTTP_CONNECT_TIMEOUT,
+                read_timeout=HTTP_READ_TIMEOUT,
+                max_bytes=HTTP_MAX_BYTES,
+                enough_bytes=HTML_ENOUGH_BYTES
+            )
+            if _recorder is not None:
+                capture_http(_http_client, _recorder)
+        return _http_client
+
+
+def get_content_cache():
+    """Liefert den (einmalig geöffneten) persistenten Inhalts-Cache"""
+    global _content_cache
+    with _content_cache_lock:
+        if _content_cache is None:
+            _content_cache = ContentCache(
+                os.path.join(DATA_DIR, 'content_cache.sqlite3'),
+                ttl=CONTENT_CACHE_TTL,
+                max_bytes=CONTENT_CACHE_MAX_MB * 1024 * 1024
+            )
+        return _content_cache
+
+
+@_call_seconds.time(call='fetch_url_content')
 def fetch_url_content(url):
-    """Wrapper-Funktion für URL-Abruf (Fallback auf BeautifulSoup falls Trafilatura fehlschlägt)"""
-    # Versuche zuerst Trafilatura (bessere Artikel-Extraktion)
-    content = fetch_url_content_trafilatura(url)
+    """
+    Wrapper-Funktion für URL-Abruf mit Cache
+    
+    - Frischer Cache-Treffer: kein Download, keine Extraktion
+    - Abgelaufener Eintrag mit ETag/Last-Modified: bedingter GET,
+      bei 304 wird der gecachte Inhalt weiterverwendet
+    - Sonst: ein Download, Trafilatura mit BeautifulSoup-Fallback
+    """
+    cache = get_content_cache()
+    content = cache.get(url)
     
     if content:
+        print(f"💾 Cache-Treffer: {url} ({len(content)} Zeichen)")
         return content
     
-    # Fallback auf alte BeautifulSoup-Methode wenn Trafilatura fehlschlägt
-    print(f"🔄 Fallback: Verwende BeautifulSoup für {url}")
+    stale = cache.get_stale(url)
     
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (compatible; SagemateBot/1.0)'}
-        response = requests.get(url, timeout=10, headers=headers)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Entferne Scripts, Styles, Navigation, etc.
-        for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-            tag.decompose()
-        
-        # Hole und bereinige Text
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        text = '\n'.join(line for line in lines if line)
-        
-        # Begrenze auf 3000 Zeichen (Kosten sparen!)
-        content = text[:3000]
-        print(f"✅ Webseite geladen (Fallback): {len(content)} Zeichen")
-        return content
-        
-    except Exception as e:
-        print(f"⚠️ Auch Fallback fehlgeschlagen: {e}")
+    print(f"🔗 Lade Webseite{' (Revalidierung)' if stale else ''}: {url}")
+    page = download_page(url, validators=stale)
+    
+    if not page:
         return None
+    
+    if page['status'] == 304:
+        cache.refresh(url)
+        print(f"💾 Unverändert (304): {url} ({len(stale['content'])} Zeichen)")
+        return stale['content']
+    
+    content = extract_page_content(url, page)
+    
+    if content:
+        cache.put(url, content, etag=page['etag'], last_modified=page['last_modified'])
+    
+    return content
+
+
+def _host_semaphore(url):
+    """Liefert die Semaphore die gleichzeitige Verbindungen zu einem Host begrenzt"""
+    host = urlparse(url).netloc.lower()
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(URL_FETCH_PER_HOST)
+        return _host_semaphores[host]
+
+
+def _fetch_url_limited(url):
+    """Lädt eine URL, hält dabei das Verbindungs-Limit pro Host ein"""
+    with _host_semaphore(url):
+        return fetch_url_content(url)
+
+
+def fetch_url_contents(urls, deadline=None):
+    """
+    Lädt mehrere URLs parallel mit gemeinsamer Deadline
+    
+    Pro Host laufen höchstens URL_FETCH_PER_HOST Downloads gleichzeitig
+    (auch über mehrere Jobs hinweg). Was bis zur Deadline nicht fertig ist,
+    wird ignoriert - die Latenz entspricht so dem langsamsten Abruf statt
+    der Summe aller Abrufe.
+    
+    Args:
+        urls: Liste von URLs
+        deadline: Max. Sekunden für alle Abrufe zusammen (Default: URL_FETCH_DEADLINE)
+    
+    Returns:
+        Dict mit URL -> Inhalt (nur erfolgreich geladene URLs)
+    """
+    if deadline is None:
+        deadline = URL_FETCH_DEADLINE
+    
+    futures = {_url_fetch_executor.submit(_fetch_url_limited, url): url for url in urls}
+    done, not_done = wait(futures, timeout=deadline)
+    
+    if not_done:
+        print(f"⏱️ Deadline ({deadline}s) erreicht - {len(not_done)} URL(s) nicht rechtzeitig geladen")
+        for future in not_done:
+            # Noch nicht gestartete Abrufe abbrechen, laufende werden ignoriert
+            future.cancel()
+    
+    url_contents = {}
+    for future in done:
+        try:
+            content = future.result()
+        except Exception as e:
+            print(f"⚠️ Fehler beim Laden von {futures[future]}: {e}")
+            continue
+        if content:
+            url_contents[futures[future]] = content
+    
+    # Reihenfolge der Eingabe beibehalten
+    return {url: url_contents[url] for url in urls if url in url_contents}
+
+
+def reply_parent_uri(record):
+    """URI des Parent-Posts aus einem Post-Record (None wenn keine Reply)"""
+    reply = getattr(record, 'reply', None)
+    parent = getattr(reply, 'parent', None)
+    return getattr(parent, 'uri', None)
 
 
-def get_thread_context(client, post_uri):
+@_call_seconds.time(call='get_thread_context')
+def get_thread_context(client, post_uri, cid=None, parent_uri=None):
     """
     Holt den kompletten Thread-Context eines Posts (alle vorherigen Antworten)
     Gibt Post-Objekte mit allen Metadaten zurück
+    
+    Nutzt den Thread-Snapshot-Cache: Ein Thread der in diesem Zyklus schon
+    geladen wurde (z.B. von get_parent_post) wird nicht erneut geholt.
+    Ist der Parent gecacht, wird nur der Post selbst nachgeladen.
     """
     print(f"📜 Lade Thread-Context...")
     
     try:
-        # Hole Thread über AT Protocol API
-        thread = client.get_post_thread(uri=post_uri)
+        # Hole Thread über AT Protocol API (bzw. aus dem Snapshot-Cache)
+        thread_node = _thread_cache.get_thread(client, post_uri, cid=cid, parent_uri=parent_uri)
         
         # Sammle alle Posts im Thread
         context_posts = []
@@ -267,7 +755,7 @@ def get_thread_context(client, post_uri):
                 collect_posts(post_obj.parent, depth + 1)
         
         # Starte Sammlung beim aktuellen Post
-        collect_posts(thread.thread)
+        collect_posts(thread_node)
         
         # Sortiere chronologisch (älteste zuerst = Thread-Reihenfolge)
         context_posts.reverse()
@@ -280,10 +768,151 @@ def get_thread_context(client, post_uri):
         return []
 
 
+# Feste Teile des User-Prompts (zählen gegen das Token-Budget)
+PROMPT_INSTRUCTIONS = "\n".join([
+    "WICHTIG: Deine Antwort darf maximal 280 Zeichen lang sein!",
+    "Berücksichtige den Konversationsverlauf und die Webseiten-Inhalte.",
+    "Schreibe eine hilfreiche, kontextbezogene Antwort."
+])
+PROMPT_HEADINGS = (
+    "KONVERSATIONS-VERLAUF (chronologisch):\n---\n"
+    "VERLINKTE WEBSEITEN-INHALTE:\n"
+    "AKTUELLE MENTION (an dich gerichtet):\n---\n"
+)
+
+
+def build_prompt_content(packed):
+    """
+    Baut den User-Prompt aus dem gepackten Inhalt (PromptBuilder.pack) als
+    Liste von Content-Blöcken für Prompt Caching
+    
+    Reihenfolge: erst der stabile Teil (ältere Thread-Posts, Webseiten-Inhalte),
+    der sich wiederholt wenn derselbe Thread mehrere Antworten auslöst, dann
+    der variable Teil (neuester Post, aktuelle Mention, Anweisungen).
+    
+    Cache-Breakpoints (zusammen mit dem System-Prompt 3 von max. 4):
+    - nach dem letzten älteren Post: gecacht ist System-Prompt + ältere
+      Posts. Jeder Post ist ein eigener Block und die Cache-Suche prüft auch
+      frühere Blockgrenzen - eine spätere Mention tiefer im selben Thread
+      liest so den gemeinsamen Anfang, egal welche URLs danach folgen
+    - nach den Webseiten-Inhalten: trifft nur, wenn auch die URLs gleich
+      sind (z.B. erneuter Versuch derselben Mention)
+    
+    Ein Cache-Eintrag entsteht nur, wenn der Präfix bis zum Breakpoint das
+    Minimum des Modells erreicht (1024 Tokens bei Sonnet) - bei kurzen
+    Threads ohne Webseiten wird also nichts gecacht.
+    Posts behalten ihre Position im Thread, auch wenn ältere ausgelassen sind.
+    """
+    stable_blocks = []
+    variable_parts = []
+    
+    # 1. Thread-Context: ältere Posts stabil, neuester Post variabel
+    posts = packed['posts']
+    if posts:
+        heading = "KONVERSATIONS-VERLAUF (chronologisch):"
+        if packed['omitted_posts']:
+            heading = f"KONVERSATIONS-VERLAUF (chronologisch, {packed['omitted_posts']} ältere Posts ausgelassen):"
+        
+        older_posts = posts[:-1]
+        newest_position, newest_post = posts[-1]
+        
+        for i, (position, post) in enumerate(older_posts):
+            line = f"{position}. @{post['author']}: {post['text']}"
+            if i == 0:
+                line = heading + "\n" + line
+            stable_blocks.append(line)
+        
+        newest_line = f"{newest_position}. @{newest_post['author']}: {newest_post['text']}"
+        if not older_posts:
+            newest_line = heading + "\n" + newest_line
+        variable_parts.append(newest_line)
+        variable_parts.append("\n---\n")
+    
+    # 2. URL-Auszüge (sortiert, damit der Block bei gleichen URLs identisch ist)
+    if packed['url_contents']:
+        url_parts = ["VERLINKTE WEBSEITEN-INHALTE:"]
+        for i, (url, excerpt) in enumerate(packed['url_contents'].items(), 1):
+            url_parts.append(f"\nURL {i}: {url}\n{excerpt}")
+        stable_blocks.append("\n".join(url_parts))
+    
+    # 3. Aktuelle Mention
+    variable_parts.append(f"AKTUELLE MENTION (an dich gerichtet):\n{packed['mention']}")
+    
+    # 4. Anweisungen für Claude
+    variable_parts.append("\n---\n")
+    variable_parts.append(PROMPT_INSTRUCTIONS)
+    
+    content = [{"type": "text", "text": text} for text in stable_blocks]
+    breakpoints = [len(posts) - 2] if len(posts) > 1 else []
+    if content:
+        breakpoints.append(len(content) - 1)
+    for index in set(breakpoints):
+        content[index]["cache_control"] = {"type": "ephemeral"}
+    content.append({"type": "text", "text": "\n".join(variable_parts)})
+    
+    return content
+
+
+def build_claude_request(mention_text, thread_context=None, url_contents=None, report=False):
+    """
+    Baut die Parameter für messages.create (ohne Modell)
+    
+    Wird vom synchronen Pfad und vom Batch-Backlog-Modus gemeinsam genutzt.
+    Mention, Thread und Webseiten werden nach Priorität ins Token-Budget
+    (PROMPT_TOKEN_BUDGET) gepackt.
+    
+    Args:
+        report: True = loggen und zählen, was ausgelassen/gekürzt wurde
+    """
+    # System-Prompt (ändert sich selten zwischen Aufrufen). Allein liegt er unter
+    # dem Cache-Minimum - der Breakpoint greift erst, wenn der Prompt wächst;
+    # sonst wird er als Anfang der Thread-Präfixe mitgecacht
+    system_prompt = load_system_prompt()
+    system_blocks = [{
+        "type": "text",
+        "text": system_prompt,
+        "cache_control": {"type": "ephemeral"}
+    }]
+    
+    # User-Prompt zusammenstellen
+    reserved = _prompt_builder.estimator.count(system_prompt + PROMPT_HEADINGS + PROMPT_INSTRUCTIONS)
+    packed = _prompt_builder.pack(mention_text, thread_context, url_contents, reserved_tokens=reserved)
+    if report:
+        log_prompt_packing(packed)
+    user_content = build_prompt_content(packed)
+    
+    return {
+        "max_tokens": 200,
+        "system": system_blocks,
+        "messages": [{
+            "role": "user",
+            "content": user_content
+        }]
+    }
+
+
+def log_prompt_packing(packed):
+    """Loggt und zählt, was wegen des Token-Budgets ausgelassen oder gekürzt wurde"""
+    _prompt_tokens.observe(packed['tokens'])
+    for item in packed['dropped']:
+        _prompt_trimmed.inc(part=item['part'], action='dropped')
+    for item in packed['truncated']:
+        _prompt_trimmed.inc(part=item['part'], action='truncated')
+    
+    summary = describe_packing(packed)
+    if summary:
+        print(f"✂️ Prompt ~{packed['tokens']}/{packed['budget']} Tokens: {summary}")
+
+
+@_call_seconds.time(call='generate_response_with_claude')
 def generate_response_with_claude(mention_text, thread_context=None, url_contents=None):
     """
     Generiert Antwort mit Claude Sonnet 4.5 unter Berücksichtigung des Thread-Contexts
     
+    System-Prompt mit älteren Thread-Posts (und Webseiten-Inhalten) werden
+    per Prompt Caching gecacht, siehe build_prompt_content (Cache-Lese-/
+    Schreib-Tokens werden pro Aufruf geloggt).
+    
     Args:
         mention_text: Der Text der aktuellen Mention
         thread_context: Liste von Posts im Thread (chronologisch)
@@ -291,51 +920,13 @@ def generate_response_with_claude(mention_text, thread_context=None, url_content
     """
     print("🤖 Generiere Antwort mit Claude Sonnet 4.5...")
     
-    api_key = os.getenv('ANTHROPIC_API_KEY')
-    client = anthropic.Anthropic(api_key=api_key)
-    
-    # System-Prompt laden
-    system_prompt = load_system_prompt()
-    
-    # User-Prompt zusammenstellen
-    user_prompt_parts = []
-    
-    # 1. Thread-Context hinzufügen (falls vorhanden)
-    if thread_context and len(thread_context) > 0:
-        user_prompt_parts.append("KONVERSATIONS-VERLAUF (chronologisch):")
-        for i, post in enumerate(thread_context, 1):
-            user_prompt_parts.append(f"{i}. @{post['author']}: {post['text']}")
-        user_prompt_parts.append("\n---\n")
-    
-    # 2. Aktuelle Mention
-    user_prompt_parts.append(f"AKTUELLE MENTION (an dich gerichtet):\n{mention_text}")
-    
-    # 3. URL-Inhalte hinzufügen (falls vorhanden)
-    if url_contents:
-        user_prompt_parts.append("\n---\n")
-        user_prompt_parts.append("VERLINKTE WEBSEITEN-INHALTE:")
-        for i, (url, content) in enumerate(url_contents.items(), 1):
-            # Max 2000 Zeichen pro URL (Kosten sparen)
-            user_prompt_parts.append(f"\nURL {i}: {url}\n{content[:2000]}")
-    
-    # 4. Anweisungen für Claude
-    user_prompt_parts.append("\n---\n")
-    user_prompt_parts.append("WICHTIG: Deine Antwort darf maximal 280 Zeichen lang sein!")
-    user_prompt_parts.append("Berücksichtige den Konversationsverlauf und die Webseiten-Inhalte.")
-    user_prompt_parts.append("Schreibe eine hilfreiche, kontextbezogene Antwort.")
-    
-    user_prompt = "\n".join(user_prompt_parts)
+    request = build_claude_request(mention_text, thread_context, url_contents, report=True)
     
     try:
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=200,
-            system=system_prompt,
-            messages=[{
-                "role": "user",
-                "content": user_prompt
-            }]
-        )
+        message = get_claude_client().create(**request)
+        
+        log_token_usage(message.usage)
+        calibrate_token_estimate(request, message.usage)
         
         response = message.content[0].text
         print(f"✅ Antwort generiert: {response[:80]}...")
@@ -346,6 +937,27 @@ def generate_response_with_claude(mention_text, thread_context=None, url_content
         return None
 
 
+def calibrate_token_estimate(request, usage):
+    """Gleicht die Token-Schätzung des Prompt-Builders mit den echten Input-Tokens ab"""
+    input_tokens = (
+        (getattr(usage, 'input_tokens', None) or 0) +
+        (getattr(usage, 'cache_read_input_tokens', None) or 0) +
+        (getattr(usage, 'cache_creation_input_tokens', None) or 0)
+    )
+    _prompt_builder.estimator.observe(request_chars(request), input_tokens)
+
+
+def log_token_usage(usage):
+    """Loggt Input-/Output-Tokens inkl. Prompt-Cache-Lese- und Schreib-Tokens"""
+    cache_read = getattr(usage, 'cache_read_input_tokens', None) or 0
+    cache_write = getattr(usage, 'cache_creation_input_tokens', None) or 0
+    
+    print(
+        f"📊 Tokens: {usage.input_tokens} Input, {cache_read} aus Cache gelesen, "
+        f"{cache_write} in Cache geschrieben, {usage.output_tokens} Output"
+    )
+
+
 def truncate_for_bluesky(text, max_length=280):
     """Kürzt Text auf Bluesky-sichere Länge (280 Zeichen)"""
     if len(text) <= max_length:
@@ -356,24 +968,198 @@ def truncate_for_bluesky(text, max_length=280):
     return truncated + "..."
 
 
-def get_recent_mentions(client):
-    """Holt alle ungelesenen Mentions mit vollständigen Post-Daten"""
-    print("📬 Prüfe auf neue Mentions...")
+def get_state_store():
+    """Liefert den persistenten Zustandsspeicher (SQLite in DATA_DIR)"""
+    global _state_store
+    with _state_store_lock:
+        if _state_store is None:
+            _state_store = StateStore(os.path.join(DATA_DIR, 'state.sqlite3'))
+        return _state_store
+
+
+def encode_model(obj):
+    """JSON-Fallback für API-Modelle (Records, Embeds) beim Speichern von Jobs"""
+    from atproto import models
+    from atproto_client.models.dot_dict import DotDict
+    
+    if isinstance(obj, DotDict):
+        return obj.to_dict()
+    if hasattr(obj, 'model_dump'):
+        return models.get_model_as_dict(obj)
+    raise TypeError(f"{type(obj).__name__} ist nicht JSON-serialisierbar")
+
+
+def decode_models(value):
+    """Macht aus gespeicherten Records/Embeds wieder Modelle (rekursiv)"""
+    from atproto import models
+    from atproto_client.models.dot_dict import DotDict
+    
+    if isinstance(value, list):
+        return [decode_models(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    
+    decoded = {}
+    for key, item in value.items():
+        if key in ('record', 'embed') and isinstance(item, dict) and '$type' in item:
+            decoded[key] = models.get_or_create(item, strict=False) or DotDict(item)
+        else:
+            decoded[key] = decode_models(item)
+    return decoded
+
+
+def get_work_queue():
+    """Liefert die persistente Arbeitswarteschlange (SQLite in DATA_DIR)"""
+    global _work_queue
+    with _work_queue_lock:
+        if _work_queue is None:
+            _work_queue = WorkQueue(
+                os.path.join(DATA_DIR, 'work_queue.sqlite3'),
+                max_attempts=WORK_QUEUE_MAX_ATTEMPTS,
+                encode=encode_model,
+                decode=decode_models
+            )
+            _work_queue.purge(WORK_QUEUE_RETENTION_DAYS * 24 * 3600)
+        return _work_queue
+
+
+def parse_timestamp(value):
+    """Parst einen ATProto-Zeitstempel (z.B. '2024-01-01T12:00:00.000Z')"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def read_mention_pages(client, cursor, hwm, hwm_uris):
+    """
+    Liest Mention-Notifications ab einem Cursor (None = neueste) rückwärts
+    bis zur High-Water-Mark (ohne Marke: bis zur ersten gelesenen)
     
-    try:
-        notifications = client.app.bsky.notification.list_notifications()
+    Returns:
+        (mentions neueste zuerst, Cursor für den Rest oder None wenn die
+        Marke erreicht wurde, gelesene Seiten)
+    """
+    hwm_time = parse_timestamp(hwm) if hwm else None
+    hwm_uris = set(hwm_uris)
+    mentions = []
+    pages = 0
+    
+    while True:
+        params = {'limit': NOTIFICATION_PAGE_SIZE, 'reasons': ['mention']}
+        if cursor:
+            params['cursor'] = cursor
+        
+        notifications = client.app.bsky.notification.list_notifications(params)
+        pages += 1
+        reached_known = False
         
-        mentions = []
         for notif in notifications.notifications:
-            if notif.reason == 'mention' and not notif.is_read:
+            indexed_time = parse_timestamp(notif.indexed_at)
+            
+            # Ältere Notifications sind schon verarbeitet → fertig
+            if hwm_time and indexed_time < hwm_time:
+                reached_known = True
+                break
+            if not hwm_time and notif.is_read:
+                reached_known = True
+                break
+            
+            # Gleicher Zeitstempel wie die High-Water-Mark: nur wenn noch nicht verarbeitet
+            if hwm_time and indexed_time == hwm_time and notif.uri in hwm_uris:
+                continue
+            
+            if notif.reason == 'mention':
                 mentions.append({
                     'author': notif.author.handle,
                     'text': notif.record.text if hasattr(notif.record, 'text') else "",
                     'uri': notif.uri,
                     'cid': notif.cid,
+                    'indexed_at': notif.indexed_at,
                     'record': notif.record  # Vollständiges record für URL-Extraktion
                 })
         
+        cursor = notifications.cursor
+        if reached_known or not cursor or not notifications.notifications:
+            return mentions, None, pages
+        if pages >= NOTIFICATION_MAX_PAGES:
+            return mentions, cursor, pages
+
+
+def newest_mention_mark(mentions, previous=None, previous_uris=()):
+    """indexedAt der neuesten Mention und alle URIs mit genau diesem Zeitstempel"""
+    newest = max(mentions, key=lambda mention: parse_timestamp(mention['indexed_at']))
+    newest_time = parse_timestamp(newest['indexed_at'])
+    uris = {mention['uri'] for mention in mentions if parse_timestamp(mention['indexed_at']) == newest_time}
+    
+    # Gleicher Zeitstempel wie die bisherige Marke → URIs zusammenführen
+    if previous and parse_timestamp(previous) == newest_time:
+        uris |= set(previous_uris)
+    return newest['indexed_at'], sorted(uris)
+
+
+def get_recent_mentions(client):
+    """
+    Holt alle neuen Mentions mit vollständigen Post-Daten
+    
+    Inkrementell über eine persistierte High-Water-Mark (indexedAt der
+    neuesten verarbeiteten Mention): Es wird seitenweise über den Cursor
+    gelesen bis eine bereits bekannte Notification erreicht ist. Im
+    Normalfall kostet ein Poll so genau einen kleinen Request.
+    
+    Bursts: Reichen NOTIFICATION_MAX_PAGES Seiten nicht bis zur Marke,
+    wird der Cursor gespeichert und die Marke bleibt stehen. Die folgenden
+    Zyklen lesen zuerst ab diesem Cursor weiter (ältere Seiten), bis die
+    Marke erreicht ist - erst dann rückt sie auf die neueste gelesene
+    Mention vor und es wird wieder oben begonnen. So geht nichts verloren.
+    
+    Ohne High-Water-Mark (erster Start) gilt wie früher is_read.
+    
+    Die neue Marke wird erst nach der Verarbeitung persistiert
+    (advance_notification_hwm).
+    """
+    print("📬 Prüfe auf neue Mentions...")
+    client._notification_mark = None
+    
+    try:
+        state = get_state_store()
+        hwm = state.get('notifications_hwm')
+        hwm_uris = state.get('notifications_hwm_uris', [])
+        backfill = state.get('notifications_backfill')
+        
+        if backfill:
+            print("📄 Lese ältere Notifications ab gespeichertem Cursor weiter")
+        
+        mentions, cursor, pages = read_mention_pages(
+            client, backfill['cursor'] if backfill else None, hwm, hwm_uris)
+        
+        if cursor:
+            # Seitenlimit erreicht: Marke bleibt unter den ungelesenen Seiten
+            if backfill:
+                top, top_uris = backfill['top'], backfill['top_uris']
+            elif mentions:
+                top, top_uris = newest_mention_mark(mentions, hwm, hwm_uris)
+            else:
+                top, top_uris = hwm, hwm_uris
+            client._notification_mark = {
+                'hwm': hwm, 'hwm_uris': hwm_uris,
+                'backfill': {'cursor': cursor, 'top': top, 'top_uris': top_uris}
+            }
+            print(f"⚠️ Mehr als {pages} Seiten neue Notifications - Rest folgt im nächsten Zyklus")
+        elif backfill:
+            # Rest des Bursts gelesen → Marke auf die neueste damals gelesene Mention
+            client._notification_mark = {
+                'hwm': backfill['top'], 'hwm_uris': backfill['top_uris'], 'backfill': None
+            }
+        elif mentions:
+            top, top_uris = newest_mention_mark(mentions, hwm, hwm_uris)
+            client._notification_mark = {'hwm': top, 'hwm_uris': top_uris, 'backfill': None}
+        else:
+            client._notification_mark = None
+        
+        # Älteste zuerst verarbeiten
+        mentions.reverse()
+        
+        if pages > 1:
+            print(f"📄 {pages} Seiten Notifications gelesen")
+        
         if mentions:
             print(f"✅ {len(mentions)} neue Mention(s) gefunden!")
         else:
@@ -386,61 +1172,175 @@ def get_recent_mentions(client):
         return []
 
 
-def get_direct_messages(client):
+def dm_from_message(convo_id, msg, handles):
     """
-    Holt alle ungelesenen Direktnachrichten
+    Baut ein DM-Objekt aus einer Chat-Nachricht
     
-    NEU: Diese Funktion sucht nach Direktnachrichten die mit "Per Direktnachricht senden"
-    gesendet wurden und auf einen Post verweisen
+    Returns:
+        DM-Dict oder None wenn die Nachricht keine Post-Referenz hat
+    """
+    # Gelöschte Nachrichten haben keinen Text/Embed
+    if not hasattr(msg, 'sender') or not (hasattr(msg, 'embed') and msg.embed):
+        return None
     
-    WICHTIG: 
-    - App-Passwort muss DM-Berechtigung haben!
-    - Nutzt Chat-Proxy für DM-API-Zugriff
-    - Verarbeitete Nachrichten werden gelöscht (kein Cache nötig!)
+    # Diese haben normalerweise ein embed mit dem referenzierten Post
+    return {
+        'convo_id': convo_id,
+        'message_id': msg.id,
+        'sender': handles.get(msg.sender.did, 'unknown'),
+        'text': msg.text if hasattr(msg, 'text') else "",
+        'embed': msg.embed,
+        'sent_at': msg.sent_at
+    }
+
+
+def scan_unread_convos(client, dm):
     """
-    print("💌 Prüfe auf neue Direktnachrichten...")
+    Erststart ohne Log-Cursor: sucht DMs in allen Chats mit ungelesenen Nachrichten
     
-    try:
-        # Erstelle Chat-Proxy-Client für DM-API-Zugriff
-        # Dies ist notwendig weil DM-API über einen separaten Service läuft
-        dm_client = client.with_bsky_chat_proxy()
-        
-        # Shortcut zu Convo-Methoden
-        dm = dm_client.chat.bsky.convo
-        
-        # Hole Chat-Liste
-        convos = dm.list_convos()
-        
-        dms = []
-        
-        for convo in convos.convos:
-            # Prüfe ob es ungelesene Nachrichten gibt
-            if convo.unread_count > 0:
-                # Hole Nachrichten dieser Konversation
-                messages = dm.get_messages({
-                    'convo_id': convo.id
-                })
-                
-                for msg in messages.messages:
-                    # Überspringe Bot's eigene Nachrichten
-                    if msg.sender.did == client.me.did:
-                        continue
-                    
-                    # Prüfe ob es eine "Per Direktnachricht senden" Nachricht ist
-                    # Diese haben normalerweise ein embed mit dem referenzierten Post
-                    if hasattr(msg, 'embed') and msg.embed:
-                        dms.append({
-                            'convo_id': convo.id,
-                            'message_id': msg.id,
-                            'sender': msg.sender.handle if hasattr(msg.sender, 'handle') else 'unknown',
-                            'text': msg.text if hasattr(msg, 'text') else "",
-                            'embed': msg.embed,
-                            'sent_at': msg.sent_at
-                        })
-        
-        if dms:
-            print(f"✅ {len(dms)} neue DM(s) mit Post-Referenz gefunden!")
-        else:
+    Die Nachrichten der einzelnen Chats werden parallel geholt.
+    """
+    convos = dm.list_convos()
+    unread = [convo for convo in convos.convos if convo.unread_count > 0]
+    
+    if not unread:
+        return []
+    
+    def fetch(convo):
+        return convo, dm.get_messages({'convo_id': convo.id})
+    
+    dms = []
+    with ThreadPoolExecutor(max_workers=min(DM_FETCH_WORKERS, len(unread))) as executor:
+        for convo, messages in executor.map(fetch, unread):
+            handles = {member.did: member.handle for member in convo.members}
+            
+            for msg in messages.messages:
+                # Überspringe Bot's eigene Nachrichten
+                if not hasattr(msg, 'sender') or msg.sender.did == client.me.did:
+                    continue
+                
+                parsed = dm_from_message(convo.id, msg, handles)
+                if parsed:
+                    dms.append(parsed)
+    
+    # Älteste zuerst verarbeiten
+    dms.sort(key=lambda parsed: parsed['sent_at'])
+    return dms
+
+
+def read_dm_log(client, dm, cursor, max_pages=None, collect=True):
+    """
+    Liest das Chat-Event-Log (getLog) ab einem Cursor
+    
+    Args:
+        collect: False → nur bis zum Log-Ende blättern, Nachrichten nicht
+            sammeln (erster Start, es wird nur der Cursor gebraucht)
+    
+    Returns:
+        (dms, neuer_cursor) - neue DMs mit Post-Referenz, älteste zuerst
+    """
+    messages = {}
+    handles = {}
+    pages = 0
+    
+    while True:
+        response = dm.get_log({'cursor': cursor} if cursor else None)
+        pages += 1
+        
+        for log in response.logs if collect else []:
+            log_type = getattr(log, 'py_type', '')
+            
+            if log_type == 'chat.bsky.convo.defs#logCreateMessage':
+                for profile in log.related_profiles or []:
+                    handles[profile.did] = profile.handle
+                
+                msg = log.message
+                if not hasattr(msg, 'sender') or msg.sender.did == client.me.did:
+                    continue
+                
+                messages[msg.id] = (log.convo_id, msg)
+            
+            elif log_type == 'chat.bsky.convo.defs#logDeleteMessage':
+                # Im selben Fenster wieder gelöscht → nicht mehr beantworten
+                messages.pop(log.message.id, None)
+        
+        if not response.logs or not response.cursor or response.cursor == cursor:
+            break
+        
+        cursor = response.cursor
+        
+        if max_pages and pages >= max_pages:
+            print(f"⚠️ Mehr als {pages} Seiten Chat-Log - Rest folgt im nächsten Zyklus")
+            break
+    
+    if pages > 1:
+        print(f"📄 {pages} Seiten Chat-Log gelesen")
+    
+    dms = []
+    for convo_id, msg in messages.values():
+        parsed = dm_from_message(convo_id, msg, handles)
+        if parsed:
+            dms.append(parsed)
+    
+    return dms, cursor
+
+
+def get_chat_client(client):
+    """
+    Liefert den Chat-Proxy-Client der Session (einmal erzeugt, dann wiederverwendet)
+    
+    with_bsky_chat_proxy() klont den Client inkl. eigenem Connection-Pool -
+    pro Aufruf neu erzeugt kostet das jedes Mal einen neuen Verbindungsaufbau.
+    Die Session (Tokens) teilt sich der Klon mit dem Haupt-Client.
+    """
+    with _chat_client_lock:
+        if getattr(client, '_chat_client', None) is None:
+            client._chat_client = instrument_client(client.with_bsky_chat_proxy(), _chat_limiter)
+        return client._chat_client
+
+
+def get_direct_messages(client):
+    """
+    Holt alle neuen Direktnachrichten
+    
+    NEU: Diese Funktion sucht nach Direktnachrichten die mit "Per Direktnachricht senden"
+    gesendet wurden und auf einen Post verweisen
+    
+    Inkrementell über das Chat-Event-Log (getLog) mit persistiertem Cursor:
+    Ein Poll kostet so viel wie es neue Events gibt, nicht wie es Chats gibt.
+    Beim ersten Start (noch kein Cursor) werden einmalig die ungelesenen
+    Chats durchsucht und der Cursor auf das Log-Ende gesetzt.
+    Der neue Cursor wird erst nach der Verarbeitung persistiert
+    (advance_dm_log_cursor).
+    
+    WICHTIG: 
+    - App-Passwort muss DM-Berechtigung haben!
+    - Nutzt Chat-Proxy für DM-API-Zugriff
+    - Verarbeitete Nachrichten werden gelöscht (kein Cache nötig!)
+    """
+    print("💌 Prüfe auf neue Direktnachrichten...")
+    
+    try:
+        # Chat-Proxy-Client für DM-API-Zugriff
+        # Dies ist notwendig weil DM-API über einen separaten Service läuft
+        dm_client = get_chat_client(client)
+        
+        # Shortcut zu Convo-Methoden
+        dm = dm_client.chat.bsky.convo
+        
+        cursor = get_state_store().get('chat_log_cursor')
+        
+        if cursor:
+            dms, client._dm_log_cursor = read_dm_log(client, dm, cursor, max_pages=DM_LOG_MAX_PAGES)
+        else:
+            # Erst Log-Ende merken, dann scannen → keine Lücke zwischen Scan und Log
+            print("ℹ️  Noch kein Chat-Log-Cursor - durchsuche ungelesene Chats")
+            _, client._dm_log_cursor = read_dm_log(client, dm, None, collect=False)
+            dms = scan_unread_convos(client, dm)
+        
+        if dms:
+            print(f"✅ {len(dms)} neue DM(s) mit Post-Referenz gefunden!")
+        else:
             print("📭 Keine neuen DMs mit Post-Referenz")
         
         return dms
@@ -498,11 +1398,11 @@ def get_post_from_dm_embed(client, dm):
                 post_uri = record.uri
                 print(f"🔗 Post-Referenz in DM gefunden: {post_uri}")
                 
-                # Hole den vollständigen Post
-                thread = client.get_post_thread(uri=post_uri)
+                # Hole den vollständigen Post (Snapshot wird für Thread-Context wiederverwendet)
+                thread_node = _thread_cache.get_thread(client, post_uri, cid=getattr(record, 'cid', None))
                 
-                if hasattr(thread, 'thread') and hasattr(thread.thread, 'post'):
-                    post = thread.thread.post
+                if hasattr(thread_node, 'post'):
+                    post = thread_node.post
                     return {
                         'author': post.author.handle if hasattr(post.author, 'handle') else 'unknown',
                         'text': post.record.text if hasattr(post.record, 'text') else '',
@@ -544,19 +1444,20 @@ def send_dm_reply(client, convo_id, reply_text, dry_run=False):
     
     # Wirklich senden
     try:
-        # Erstelle Chat-Proxy-Client
-        dm_client = client.with_bsky_chat_proxy()
+        # Chat-Proxy-Client der Session
+        dm_client = get_chat_client(client)
         
         # Sende Nachricht
         from atproto import models
-        dm_client.chat.bsky.convo.send_message(
-            models.ChatBskyConvoSendMessage.Data(
-                convo_id=convo_id,
-                message=models.ChatBskyConvoDefs.MessageInput(
-                    text=safe_text
+        with _call_seconds.time(call='send_message'):
+            dm_client.chat.bsky.convo.send_message(
+                models.ChatBskyConvoSendMessage.Data(
+                    convo_id=convo_id,
+                    message=models.ChatBskyConvoDefs.MessageInput(
+                        text=safe_text
+                    )
                 )
             )
-        )
         
         print("✅ DM erfolgreich gesendet!")
         return True
@@ -566,137 +1467,6 @@ def send_dm_reply(client, convo_id, reply_text, dry_run=False):
         return False
 
 
-def process_dm(client, dm, dry_run=False):
-    """
-    Verarbeitet eine einzelne Direktnachricht
-    
-    WICHTIG: Bot antwortet ÖFFENTLICH auf den referenzierten Post, nicht per DM!
-    
-    Workflow:
-    1. Extrahiere referenzierten Post aus DM
-    2. Lade Thread-Context des Posts
-    3. Extrahiere URLs aus Post und Thread
-    4. Lade Webseiten-Inhalte
-    5. Generiere Antwort mit Claude (basierend auf referenziertem Post)
-    6. Poste Antwort ÖFFENTLICH auf Bluesky (als Reply auf den Post)
-    7. Lösche DM (kein Cache nötig!)
-    
-    Args:
-        dry_run: Wenn True, wird nichts wirklich gepostet oder gelöscht
-    """
-    print(f"\n{'='*60}")
-    print(f"💌 Neue DM von @{dm['sender']}")
-    print(f"🆔 Message-ID: {dm['message_id']}")
-    if dm['text']:
-        print(f"📝 Nachricht: {dm['text']}")
-    print(f"{'='*60}")
-    
-    # 1. Hole referenzierten Post aus DM
-    referenced_post = get_post_from_dm_embed(client, dm)
-    
-    if not referenced_post:
-        print("⚠️ Kein Post in DM referenziert - überspringe")
-        # Lösche trotzdem um nicht erneut zu verarbeiten
-        if not dry_run:
-            delete_dm_message(client, dm['convo_id'], dm['message_id'])
-        return False
-    
-    print(f"✅ Referenzierter Post von @{referenced_post['author']}:")
-    print(f"   {referenced_post['text'][:150]}...")
-    print(f"🎯 Bot wird ÖFFENTLICH auf diesen Post antworten!")
-    
-    # 2. Hole Thread-Context des referenzierten Posts
-    thread_context = get_thread_context(client, referenced_post['uri'])
-    
-    # LOGGING: Thread-Context anzeigen
-    if thread_context and len(thread_context) > 0:
-        print(f"\n📜 THREAD-CONTEXT ({len(thread_context)} Posts):")
-        print("="*60)
-        for i, post in enumerate(thread_context, 1):
-            print(f"{i}. @{post['author']}:")
-            print(f"   {post['text'][:150]}{'...' if len(post['text']) > 150 else ''}")
-            print()
-        print("="*60)
-    
-    # 3. Sammle URLs aus dem Post und Thread
-    all_urls = []
-    
-    # URLs aus dem referenzierten Post
-    if 'record' in referenced_post and referenced_post['record']:
-        post_urls = extract_urls_from_post(referenced_post['record'])
-        all_urls.extend(post_urls)
-        print(f"\n🔍 {len(post_urls)} URL(s) im referenzierten Post gefunden")
-    
-    # URLs aus Thread
-    if thread_context:
-        for post in thread_context:
-            if 'record' in post and post['record']:
-                post_urls = extract_urls_from_post(post['record'])
-                all_urls.extend(post_urls)
-        print(f"🔍 Insgesamt {len(all_urls)} URL(s) in Thread")
-    
-    # Duplikate entfernen
-    urls = list(set(all_urls))
-    url_contents = {}
-    
-    if urls:
-        print(f"\n🔗 {len(urls)} eindeutige URL(s) gefunden:")
-        # Lade max. 3 URLs
-        for idx, url in enumerate(urls[:3], 1):
-            print(f"\n  [{idx}] {url}")
-            content = fetch_url_content(url)
-            if content:
-                url_contents[url] = content
-                print(f"  ✅ Inhalt: {content[:200]}...")
-            else:
-                print(f"  ❌ Konnte nicht geladen werden")
-        
-        if len(urls) > 3:
-            print(f"\n  ℹ️ {len(urls) - 3} weitere URL(s) ignoriert (Limit: 3)")
-    
-    # 4. Generiere Antwort mit Claude
-    # Nutze den Text des referenzierten Posts als Basis
-    print("\n🤖 Frage Claude nach Antwort zum referenzierten Post...")
-    
-    # Erstelle Kontext-Text für Claude
-    context_text = f"Frage/Post von @{referenced_post['author']}:\n{referenced_post['text']}"
-    
-    # Optional: Füge DM-Text hinzu wenn vorhanden
-    if dm['text']:
-        context_text += f"\n\nZusätzliche Notiz vom Nutzer:\n{dm['text']}"
-    
-    response = generate_response_with_claude(
-        context_text,
-        thread_context=thread_context,
-        url_contents=url_contents if url_contents else None
-    )
-    
-    if not response:
-        print("❌ Keine Antwort generiert - überspringe")
-        # Lösche trotzdem um nicht erneut zu verarbeiten
-        if not dry_run:
-            delete_dm_message(client, dm['convo_id'], dm['message_id'])
-        return False
-    
-    # 5. Poste Antwort ÖFFENTLICH auf Bluesky (als Reply auf den Post)
-    print("\n🌐 Poste öffentliche Antwort auf Bluesky...")
-    success = reply_to_mention(client, referenced_post, response, dry_run=dry_run)
-    
-    # 6. Lösche DM (WICHTIG - verhindert Duplikate!)
-    if not dry_run:
-        delete_dm_message(client, dm['convo_id'], dm['message_id'])
-        print(f"✅ DM gelöscht - keine Duplikate mehr möglich!")
-    else:
-        print("🧪 DRY RUN: DM wird NICHT gelöscht")
-    
-    if success:
-        print(f"\n✅ Post erfolgreich öffentlich beantwortet!")
-        print(f"   Für @{dm['sender']}: Aktivierung per DM erfolgreich!")
-        print(f"   Für andere: Bot hat von sich aus geantwortet")
-    
-    return success
-
-
 def is_mention_empty(mention_text, bot_handle):
     """
     Prüft ob eine Mention "leer" ist (nur Bot-Mention, kein substantieller Text)
@@ -733,11 +1503,13 @@ def get_parent_post(client, mention):
             
             print(f"🔗 Mention ist Reply auf anderen Post: {parent_uri}")
             
-            # Hole den vollständigen Parent-Post
-            thread = client.get_post_thread(uri=parent_uri)
+            # Hole den vollständigen Parent-Post (Snapshot wird für Thread-Context wiederverwendet)
+            thread_node = _thread_cache.get_thread(
+                client, parent_uri, cid=getattr(reply_info.parent, 'cid', None)
+            )
             
-            if hasattr(thread, 'thread') and hasattr(thread.thread, 'post'):
-                parent_post = thread.thread.post
+            if hasattr(thread_node, 'post'):
+                parent_post = thread_node.post
                 return {
                     'author': parent_post.author.handle if hasattr(parent_post.author, 'handle') else 'unknown',
                     'text': parent_post.record.text if hasattr(parent_post.record, 'text') else '',
@@ -782,13 +1554,14 @@ def reply_to_mention(client, mention, reply_text, dry_run=False):
     
     # Wirklich auf Bluesky posten
     try:
-        client.send_post(
-            text=safe_text,
-            reply_to={
-                'root': {'uri': mention['uri'], 'cid': mention['cid']},
-                'parent': {'uri': mention['uri'], 'cid': mention['cid']}
-            }
-        )
+        with _call_seconds.time(call='send_post'):
+            client.send_post(
+                text=safe_text,
+                reply_to={
+                    'root': {'uri': mention['uri'], 'cid': mention['cid']},
+                    'parent': {'uri': mention['uri'], 'cid': mention['cid']}
+                }
+            )
         
         print("✅ Antwort erfolgreich gepostet!")
         return True
@@ -798,65 +1571,151 @@ def reply_to_mention(client, mention, reply_text, dry_run=False):
         return False
 
 
-def delete_dm_message(client, convo_id, message_id):
+def queue_dm_cleanup(dm):
     """
-    Löscht eine DM-Nachricht
+    Merkt eine verarbeitete DM zum Löschen und ihren Chat als gelesen vor
+    
+    Ausgeführt wird gesammelt am Ende des Zyklus (flush_dm_housekeeping).
     
     Args:
-        client: Bluesky Client
-        convo_id: Konversations-ID
-        message_id: ID der zu löschenden Nachricht
+        dm: DM-Objekt (convo_id, message_id, sent_at)
     """
+    _dm_housekeeping.queue_delete(dm['convo_id'], dm['message_id'])
+    _dm_housekeeping.queue_read(dm['convo_id'], dm['message_id'], dm.get('sent_at', ''))
+
+
+def flush_dm_housekeeping(client):
+    """Führt gesammelte DM-Löschungen und Gelesen-Markierungen aus"""
+    if _dm_housekeeping.pending() == 0:
+        return 0
+    
     try:
-        # Erstelle Chat-Proxy-Client
-        dm_client = client.with_bsky_chat_proxy()
-        
-        # Lösche Nachricht
-        dm_client.chat.bsky.convo.delete_message_for_self({
-            'convo_id': convo_id,
-            'message_id': message_id
-        })
-        
-        print(f"🗑️  Nachricht {message_id} gelöscht")
-        return True
-        
+        return _dm_housekeeping.flush(get_chat_client(client))
     except Exception as e:
-        print(f"⚠️ Konnte Nachricht nicht löschen: {e}")
-        return False
+        print(f"⚠️ Fehler beim Aufräumen der DMs: {e}")
+        return 0
 
 
-def mark_notification_as_read(client):
-    """Markiert alle Notifications als gelesen"""
+def mark_notification_as_read(client, seen_at=None):
+    """
+    Markiert Notifications als gelesen
+    
+    Args:
+        seen_at: Zeitstempel bis zu dem gelesen wurde (Default: jetzt).
+                 Nur bis zur neuesten verarbeiteten Notification markieren,
+                 damit Mentions die während der Verarbeitung ankamen nicht
+                 als gelesen gelten.
+    """
     try:
         client.app.bsky.notification.update_seen({
-            'seen_at': datetime.now().isoformat() + 'Z'
+            'seen_at': seen_at or datetime.now().isoformat() + 'Z'
         })
-        print("✅ Notifications als gelesen markiert")
+        print(f"✅ Notifications als gelesen markiert{f' (bis {seen_at})' if seen_at else ''}")
     except Exception as e:
         print(f"⚠️ Konnte Notifications nicht als gelesen markieren: {e}")
 
 
-def process_mention(client, mention, dry_run=False):
+def new_job(kind, item):
     """
-    Verarbeitet eine einzelne Mention mit vollem Kontext
+    Erstellt einen Pipeline-Job für eine Mention oder DM
+
+    Args:
+        kind: 'mention' oder 'dm'
+        item: Mention- bzw. DM-Objekt (Dict)
+    """
+    job = {
+        'kind': kind,
+        'item': item,
+        'state': 'fetched',       # Zustand in der Arbeitswarteschlange
+        'queued': False,          # True = Zustand wird persistiert
+        'reply_target': None,     # Post auf den geantwortet wird
+        'prompt_text': None,      # Text den Claude als "Mention" bekommt
+        'thread_context': [],
+        'url_contents': {},
+        'response': None,
+        'success': False
+    }
+    job['key'] = job_key(job)
+    return job
+
+
+def checkpoint_job(job, state):
+    """Sichert den Job nach einer abgeschlossenen Stufe (nur wenn er in der Queue ist)"""
+    job['state'] = state
+    if not job['queued']:
+        return
+    
+    target = job['reply_target']
+    get_work_queue().save(job['key'], state, job, target_uri=target['uri'] if target else None)
+
+
+def drop_job(job):
+    """Markiert einen Job als erledigt ohne Antwort"""
+    job['state'] = 'dropped'
+    if job['queued']:
+        get_work_queue().set_state(job['key'], 'dropped')
+
+
+def queue_jobs(kind, jobs, dry_run=False):
+    """
+    Nimmt neue Jobs in die persistente Warteschlange auf und liefert alle offenen
     
-    Workflow:
-    1. Prüfe ob Mention leer ist & ob sie Reply auf anderen Post ist
-    2. Thread-Context laden (alle vorherigen Posts)
-    3. URLs aus Mention UND Thread extrahieren (aus facets/embeds!)
-    4. Webseiten-Inhalte laden
-    5. Claude um Antwort bitten (mit Kontext + URLs)
-    6. Antwort auf Bluesky posten (entweder auf Mention oder auf Original-Post)
+    Offen sind auch Jobs aus früheren Läufen die nicht fertig wurden
+    (z.B. Absturz) - sie machen ab der letzten abgeschlossenen Stufe weiter.
+    Jobs die schon in einem laufenden Batch stecken, werden nicht erneut geliefert.
+    Im Dry-Run bleibt die Warteschlange unberührt.
+    """
+    if dry_run:
+        return without_batched_jobs(jobs)
     
-    Args:
-        dry_run: Wenn True, wird nicht wirklich auf Bluesky gepostet
+    work_queue = get_work_queue()
+    
+    for job in jobs:
+        state = work_queue.enqueue(job['key'], kind, job)
+        
+        # Schon beantwortet, DM aber noch nicht gelöscht (Absturz vor dem Aufräumen)
+        if state in DONE_STATES and kind == 'dm':
+            queue_dm_cleanup(job['item'])
+    
+    # Jobs in laufenden Batches nicht doppelt verarbeiten
+    batched = _batch_runner.pending_keys() if _batch_runner else set()
+    
+    resumed = []
+    for key, state, job in work_queue.claim_pending(kind, skip=batched):
+        job['state'] = state
+        job['queued'] = True
+        if state != 'fetched':
+            print(f"♻️  Setze {kind} {key} fort (Zustand: {state})")
+        resumed.append(job)
+    
+    return resumed
+
+
+def log_thread_context(thread_context):
+    """Zeigt den Thread-Context im Log an"""
+    print(f"\n📜 THREAD-CONTEXT ({len(thread_context)} Posts):")
+    print("="*60)
+    for i, post in enumerate(thread_context, 1):
+        print(f"{i}. @{post['author']}:")
+        print(f"   {post['text'][:150]}{'...' if len(post['text']) > 150 else ''}")
+        print()
+    print("="*60)
+
+
+def hydrate_mention(client, job):
+    """
+    Stufe 1 (Mention): Ziel-Post bestimmen und Thread-Context laden
+
+    SPECIAL CASE: Leere Mention die auf anderen Post antwortet
+    → Bot antwortet auf den Original-Post statt auf die Mention
     """
+    mention = job['item']
+
     print(f"\n{'='*60}")
     print(f"📬 Neue Mention von @{mention['author']}")
     print(f"📝 Text: {mention['text']}")
     print(f"{'='*60}")
     
-    # SPECIAL CASE: Leere Mention die auf anderen Post antwortet
     bot_handle = os.getenv('BLUESKY_HANDLE')
     reply_target = mention  # Default: Antworte auf Mention selbst
     
@@ -873,34 +1732,114 @@ def process_mention(client, mention, dry_run=False):
             reply_target = parent_post
             
             # Nutze Text des Original-Posts als "Mention-Text" für Kontext
-            mention_text_for_claude = parent_post['text']
+            job['prompt_text'] = parent_post['text']
         else:
             print("⚠️ Kein Parent-Post gefunden, antworte auf Mention")
-            mention_text_for_claude = mention['text']
+            job['prompt_text'] = mention['text']
     else:
-        mention_text_for_claude = mention['text']
+        job['prompt_text'] = mention['text']
     
-    # 1. Hole Thread-Context (alle Posts die zu dieser Konversation gehören)
+    job['reply_target'] = reply_target
+    
+    # Hole Thread-Context (alle Posts die zu dieser Konversation gehören)
     # Nutze den reply_target URI (entweder Mention oder Parent)
-    thread_context = get_thread_context(client, reply_target['uri'])
+    job['thread_context'] = get_thread_context(
+        client,
+        reply_target['uri'],
+        cid=reply_target.get('cid'),
+        parent_uri=reply_parent_uri(reply_target.get('record'))
+    )
     
-    # LOGGING: Thread-Context anzeigen
-    if thread_context and len(thread_context) > 0:
-        print(f"\n📜 THREAD-CONTEXT ({len(thread_context)} Posts):")
-        print("="*60)
-        for i, post in enumerate(thread_context, 1):
-            print(f"{i}. @{post['author']}:")
-            print(f"   {post['text'][:150]}{'...' if len(post['text']) > 150 else ''}")
-            print()
-        print("="*60)
+    if job['thread_context']:
+        log_thread_context(job['thread_context'])
     else:
         print("\n📭 Kein Thread-Context (direkte Mention ohne Vorgänger)")
     
-    # 2. Sammle URLs aus der Mention/Parent UND aus dem gesamten Thread
-    # WICHTIG: Nutze extract_urls_from_post() um URLs aus facets/embeds zu finden!
+    return job
+
+
+def hydrate_dm(client, job, dry_run=False):
+    """
+    Stufe 1 (DM): Referenzierten Post aus der DM holen und Thread-Context laden
+
+    WICHTIG: Bot antwortet ÖFFENTLICH auf den referenzierten Post, nicht per DM!
+    """
+    dm = job['item']
+
+    print(f"\n{'='*60}")
+    print(f"💌 Neue DM von @{dm['sender']}")
+    print(f"🆔 Message-ID: {dm['message_id']}")
+    if dm['text']:
+        print(f"📝 Nachricht: {dm['text']}")
+    print(f"{'='*60}")
+    
+    referenced_post = get_post_from_dm_embed(client, dm)
+    
+    if not referenced_post:
+        print("⚠️ Kein Post in DM referenziert - überspringe")
+        # Lösche trotzdem um nicht erneut zu verarbeiten
+        if not dry_run:
+            queue_dm_cleanup(dm)
+        return None
+    
+    print(f"✅ Referenzierter Post von @{referenced_post['author']}:")
+    print(f"   {referenced_post['text'][:150]}...")
+    print(f"🎯 Bot wird ÖFFENTLICH auf diesen Post antworten!")
+    
+    job['reply_target'] = referenced_post
+    
+    # Erstelle Kontext-Text für Claude (Basis: referenzierter Post)
+    context_text = f"Frage/Post von @{referenced_post['author']}:\n{referenced_post['text']}"
+    
+    # Optional: Füge DM-Text hinzu wenn vorhanden
+    if dm['text']:
+        context_text += f"\n\nZusätzliche Notiz vom Nutzer:\n{dm['text']}"
+    
+    job['prompt_text'] = context_text
+    
+    job['thread_context'] = get_thread_context(
+        client,
+        referenced_post['uri'],
+        cid=referenced_post.get('cid'),
+        parent_uri=reply_parent_uri(referenced_post.get('record'))
+    )
+    
+    if job['thread_context']:
+        log_thread_context(job['thread_context'])
+    
+    return job
+
+
+def hydrate_job(client, job, dry_run=False):
+    """Stufe 1: Thread laden (verteilt nach Mention/DM)"""
+    # Fortgesetzter Job: Kontext ist schon gesichert
+    if job['state'] != 'fetched':
+        return job
+    
+    if job['kind'] == 'dm':
+        hydrated = hydrate_dm(client, job, dry_run=dry_run)
+    else:
+        hydrated = hydrate_mention(client, job)
+    
+    if hydrated is None:
+        drop_job(job)
+    return hydrated
+
+
+def enrich_job(job):
+    """
+    Stufe 2: URLs aus Ziel-Post UND Thread extrahieren und Inhalte laden
+
+    WICHTIG: Nutzt extract_urls_from_post() um URLs aus facets/embeds zu finden!
+    """
+    if job['state'] != 'fetched':
+        return job
+    
+    reply_target = job['reply_target']
+    thread_context = job['thread_context']
     all_urls = []
     
-    # URLs aus dem Reply-Target (Mention oder Parent)
+    # URLs aus dem Reply-Target (Mention, Parent oder referenzierter Post)
     if 'record' in reply_target and reply_target['record']:
         target_urls = extract_urls_from_post(reply_target['record'])
         all_urls.extend(target_urls)
@@ -921,11 +1860,13 @@ def process_mention(client, mention, dry_run=False):
     if urls:
         print(f"\n🔗 {len(urls)} eindeutige URL(s) im Thread gefunden:")
         # Lade max. 3 URLs um Kosten/Zeit zu sparen
+        # Parallel laden, Ergebnis enthält was bis zur Deadline ankam
+        url_contents = fetch_url_contents(urls[:3])
+        
         for idx, url in enumerate(urls[:3], 1):
             print(f"\n  [{idx}] {url}")
-            content = fetch_url_content(url)
+            content = url_contents.get(url)
             if content:
-                url_contents[url] = content
                 # LOGGING: Zeige Anfang des extrahierten Inhalts
                 print(f"  ✅ Inhalt: {content[:200]}...")
             else:
@@ -936,25 +1877,415 @@ def process_mention(client, mention, dry_run=False):
     else:
         print("\n📭 Keine URLs im Thread gefunden")
     
-    # 3. Generiere Antwort mit Claude (mit vollem Kontext)
+    job['url_contents'] = url_contents
+    checkpoint_job(job, 'enriched')
+    return job
+
+
+def generate_job(client, job, dry_run=False):
+    """Stufe 3: Antwort mit Claude generieren (mit vollem Kontext)"""
+    # Fortgesetzter Job: Antwort ist schon generiert (und bezahlt)
+    if job['state'] in ('generated', 'posting'):
+        return job
+    
     print("\n🤖 Frage Claude Sonnet nach Antwort (mit Kontext)...")
     response = generate_response_with_claude(
-        mention_text_for_claude, 
-        thread_context=thread_context,
-        url_contents=url_contents if url_contents else None
+        job['prompt_text'],
+        thread_context=job['thread_context'],
+        url_contents=job['url_contents'] if job['url_contents'] else None
     )
     
+    return complete_generation(client, job, response, dry_run=dry_run)
+
+
+def complete_generation(client, job, response, dry_run=False):
+    """Übernimmt eine generierte Antwort in den Job (None → Job wird verworfen)"""
     if not response:
         print("❌ Keine Antwort generiert - überspringe")
-        return False
+        # DMs trotzdem löschen um sie nicht erneut zu verarbeiten
+        if job['kind'] == 'dm' and not dry_run:
+            queue_dm_cleanup(job['item'])
+        drop_job(job)
+        return None
     
-    # 4. Poste Antwort auf Bluesky (auf reply_target - entweder Mention oder Parent)
-    success = reply_to_mention(client, reply_target, response, dry_run=dry_run)
+    job['response'] = response
+    checkpoint_job(job, 'generated')
+    return job
+
+
+def post_job(client, job, dry_run=False):
+    """Stufe 4: Antwort ÖFFENTLICH auf Bluesky posten (als Reply auf reply_target)"""
+    if job['kind'] == 'dm':
+        print("\n🌐 Poste öffentliche Antwort auf Bluesky...")
+    
+    target_uri = job['reply_target']['uri']
+    
+    if job['queued'] and already_answered(client, job):
+        print(f"⏭️  Auf {target_uri} wurde schon geantwortet - poste nicht nochmal")
+        # Kein Fehler: die Warteschlange hat ein Duplikat korrekt unterdrückt
+        success = False
+        result = 'skipped'
+        if job['state'] != 'posted':
+            drop_job(job)
+    else:
+        # 'posting' vor dem Senden sichern: Absturz danach → beim Fortsetzen erst nachsehen
+        checkpoint_job(job, 'posting')
+        success = reply_to_mention(client, job['reply_target'], job['response'], dry_run=dry_run)
+        result = 'answered' if success else 'failed'
+        
+        if job['queued']:
+            if success:
+                job['state'] = 'posted'
+                get_work_queue().set_state(job['key'], 'posted')
+            else:
+                # Nochmal versuchen im nächsten Zyklus (begrenzt durch WORK_QUEUE_MAX_ATTEMPTS)
+                checkpoint_job(job, 'generated')
+    
+    job['success'] = success
+    _replies_total.inc(kind=job['kind'], result=result)
     
-    if success:
+    if job['kind'] == 'dm':
+        dm = job['item']
+        
+        # Lösche DM (WICHTIG - verhindert Duplikate!) - gesammelt am Zyklusende
+        if not dry_run:
+            queue_dm_cleanup(dm)
+            print(f"🗑️  DM zum Löschen vorgemerkt - keine Duplikate mehr möglich!")
+        else:
+            print("🧪 DRY RUN: DM wird NICHT gelöscht")
+        
+        if success:
+            print(f"\n✅ Post erfolgreich öffentlich beantwortet!")
+            print(f"   Für @{dm['sender']}: Aktivierung per DM erfolgreich!")
+            print(f"   Für andere: Bot hat von sich aus geantwortet")
+    elif success:
         print(f"\n✅ Mention erfolgreich verarbeitet!")
     
-    return success
+    return job
+
+
+def already_answered(client, job):
+    """
+    Idempotenz-Prüfung vor dem Posten (Schlüssel: URI des Ziel-Posts)
+    
+    Bereits als gepostet vermerkt → True. War der Job beim letzten Lauf
+    mitten im Posten ('posting', z.B. Absturz), wird im Thread nachgesehen
+    ob die Antwort des Bots schon da ist.
+    """
+    target_uri = job['reply_target']['uri']
+    
+    if get_work_queue().is_posted(target_uri):
+        return True
+    
+    if job['state'] != 'posting':
+        return False
+    
+    try:
+        thread = client.get_post_thread(uri=target_uri, depth=1, parent_height=0).thread
+        for reply in getattr(thread, 'replies', None) or []:
+            author = getattr(getattr(reply, 'post', None), 'author', None)
+            if author is not None and author.did == client.me.did:
+                job['state'] = 'posted'
+                get_work_queue().set_state(job['key'], 'posted')
+                return True
+    except Exception as e:
+        print(f"⚠️ Konnte nicht prüfen ob schon geantwortet wurde: {e}")
+    
+    return False
+
+
+def build_stages(client, dry_run=False):
+    """
+    Baut die Pipeline-Stufen: Thread laden → URLs anreichern → generieren → posten
+
+    Die Anzahl Worker pro Stufe kommt aus PIPELINE_WORKERS.
+    """
+    return [
+        Stage('hydrate', lambda job: hydrate_job(client, job, dry_run=dry_run),
+              workers=PIPELINE_WORKERS['hydrate']),
+        Stage('enrich', enrich_job,
+              workers=PIPELINE_WORKERS['enrich']),
+        Stage('generate', lambda job: generate_job(client, job, dry_run=dry_run),
+              workers=PIPELINE_WORKERS['generate']),
+        Stage('post', lambda job: post_job(client, job, dry_run=dry_run),
+              workers=PIPELINE_WORKERS['post']),
+    ]
+
+
+def job_key(job):
+    """Eindeutiger Schlüssel eines Jobs (DM: Message-ID, Mention: URI)"""
+    if job['kind'] == 'dm':
+        return job['item']['message_id']
+    return job['item']['uri']
+
+
+def get_batch_runner(client, dry_run=False):
+    """Liefert den BatchRunner für den Backlog-Modus (postet Ergebnisse selbst)"""
+    global _batch_runner
+    
+    def on_result(job, response):
+        job = complete_generation(client, job, response, dry_run=dry_run)
+        if job:
+            post_job(client, job, dry_run=dry_run)
+    
+    def build_params(job):
+        return build_claude_request(
+            job['prompt_text'],
+            thread_context=job['thread_context'],
+            url_contents=job['url_contents'] if job['url_contents'] else None,
+            report=True
+        )
+    
+    with _batch_runner_lock:
+        if _batch_runner is None:
+            _batch_runner = BatchRunner(
+                get_claude_client(),
+                build_params=build_params,
+                on_result=on_result,
+                job_key=job_key,
+                poll_interval=BATCH_POLL_INTERVAL,
+                chunk_size=BATCH_CHUNK_SIZE,
+                # Im Dry-Run nichts persistieren (Jobs sind nicht in der Warteschlange)
+                store=None if dry_run else get_state_store(),
+                load_job=load_batched_job
+            )
+            _batch_runner.resume()
+        return _batch_runner
+
+
+def load_batched_job(key):
+    """Job aus der Warteschlange für einen wieder aufgenommenen Batch (None wenn schon fertig)"""
+    stored = get_work_queue().load(key)
+    if stored is None or stored[0] in DONE_STATES:
+        return None
+    state, job = stored
+    job['state'] = state
+    job['queued'] = True
+    return job
+
+
+def resume_pending_batches(client, dry_run=False):
+    """
+    Nach einem Neustart: noch laufende Batches wieder aufnehmen, bevor die
+    Warteschlange ihre Jobs als unfertig ausliefert (sonst doppelt generiert)
+    """
+    if _batch_runner is None and not dry_run and get_state_store().get(PENDING_BATCHES_KEY):
+        get_batch_runner(client, dry_run=dry_run)
+
+
+def without_batched_jobs(jobs):
+    """Filtert Jobs heraus, die schon in einem laufenden Batch stecken"""
+    if _batch_runner is None:
+        return jobs
+    return [job for job in jobs if not _batch_runner.is_pending(job)]
+
+
+def process_backlog_with_batches(client, jobs, dry_run=False):
+    """
+    Backlog-Modus für grosse Warteschlangen
+    
+    Thread laden und URLs anreichern laufen wie gewohnt in der Pipeline,
+    die Generierung geht aber günstig über die Message Batches API.
+    Die Antworten werden im Hintergrund gepostet, sobald ein Batch fertig ist.
+    
+    Returns:
+        Anzahl eingereichter Jobs
+    """
+    print(f"\n📦 BACKLOG-MODUS: {len(jobs)} Items → Message Batches API")
+    
+    # Nur Thread laden + URLs anreichern
+    stages = build_stages(client, dry_run=dry_run)[:2]
+    pipeline = Pipeline(stages, queue_size=PIPELINE_QUEUE_SIZE)
+    enriched = pipeline.run(jobs)
+    pipeline.print_stats()
+    
+    submitted = get_batch_runner(client, dry_run=dry_run).submit(enriched)
+    print(f"📦 {submitted} Generierung(en) eingereicht - Antworten folgen im Hintergrund")
+    return submitted
+
+
+def run_pipeline(client, jobs, dry_run=False):
+    """
+    Verarbeitet Jobs (Mentions und/oder DMs) nebenläufig durch alle Stufen
+    
+    Fertige Jobs werden nur gezählt, nicht gesammelt - `jobs` darf auch ein
+    endloser Stream sein (--stream).
+
+    Returns:
+        Anzahl erfolgreich beantworteter Jobs
+    """
+    pipeline = Pipeline(build_stages(client, dry_run=dry_run), queue_size=PIPELINE_QUEUE_SIZE,
+                        observer=observe_stage)
+    answered = 0
+    answered_lock = threading.Lock()
+    
+    def count_answered(job):
+        nonlocal answered
+        if job['success']:
+            with answered_lock:
+                answered += 1
+    
+    pipeline.run(jobs, on_result=count_answered)
+    pipeline.print_stats()
+    
+    cache_stats = get_content_cache().stats()
+    print(
+        f"💾 Inhalts-Cache: {cache_stats['hits']} Treffer, {cache_stats['misses']} Fehlgriffe "
+        f"({cache_stats['hit_rate']:.0%}), {cache_stats['revalidated']} per 304 revalidiert, "
+        f"{cache_stats['entries']} Einträge, "
+        f"{cache_stats['bytes'] / 1024:.0f} KB"
+    )
+    
+    thread_stats = _thread_cache.stats()
+    print(
+        f"🧵 Thread-Cache: {thread_stats['hits']} Treffer, {thread_stats['misses']} geladen "
+        f"({thread_stats['spliced']}x nur neuer Post an gecachte Vorfahren angehängt)"
+    )
+    
+    http_stats = get_http_client().stats()
+    print(
+        f"🌐 HTTP-Pool: {http_stats['requests']} Requests über {http_stats['connections']} "
+        f"Verbindung(en), {http_stats['reused']}x wiederverwendet ({len(http_stats['hosts'])} Hosts)"
+    )
+    
+    print_rate_limit_headroom()
+    
+    if _work_queue is not None:
+        queue_stats = _work_queue.stats()
+        print("📋 Warteschlange: " + ", ".join(f"{count} {state}" for state, count in sorted(queue_stats.items())))
+    return answered
+
+
+def observe_stage(stage, outcome, seconds):
+    """Pipeline-Observer: Latenz und Ergebnis pro Stufe in die Metriken"""
+    _stage_seconds.observe(seconds, stage=stage)
+    _stage_jobs.inc(stage=stage, outcome=outcome)
+
+
+def collect_metrics():
+    """
+    Übernimmt beim Abruf von /metrics die Zähler der Caches, Warteschlangen
+    und Rate-Limiter (die dort ohnehin gezählt werden)
+    """
+    caches = [('thread', _thread_cache)]
+    if _content_cache is not None:
+        caches.append(('content', _content_cache))
+    for name, cache in caches:
+        stats = cache.stats()
+        _cache_lookups.set_total(stats['hits'], cache=name, result='hit')
+        _cache_lookups.set_total(stats['misses'], cache=name, result='miss')
+        _cache_hit_ratio.set(stats['hit_rate'], cache=name)
+    
+    if _work_queue is not None:
+        queue_stats = _work_queue.stats()
+        for state in STATES:
+            _work_queue_jobs.set(queue_stats.get(state, 0), state=state)
+    
+    _queue_depth.set(_batch_runner.pending_count() if _batch_runner else 0, queue='batch')
+    _queue_depth.set(_dm_housekeeping.pending(), queue='dm_housekeeping')
+    
+    if _extract_pool is not None:
+        _extract_cpu_seconds.set_total(_extract_pool.stats()['cpu_seconds'])
+    
+    for limiter in (_bluesky_limiter, _chat_limiter, _claude_limiter):
+        headroom = limiter.headroom()
+        service = headroom['name'].lower()
+        if headroom['remaining'] is not None:
+            _rate_limit_remaining.set(headroom['remaining'], service=service)
+        _rate_limit_tokens.set(headroom['tokens'], service=service)
+        _rate_limit_blocked.set(headroom['blocked_for'], service=service)
+        _rate_limit_calls.set_total(headroom['calls'], service=service)
+        _rate_limit_throttled.set_total(headroom['throttled'], service=service)
+        _rate_limit_waited.set_total(headroom['waited_seconds'], service=service)
+
+
+_metrics.add_collector(collect_metrics)
+
+
+def start_metrics_server():
+    """Startet den Prometheus-Endpunkt (einmal pro Prozess, METRICS_PORT=0 → aus)"""
+    global _metrics_server
+    with _metrics_server_lock:
+        if _metrics_server is not None or not METRICS_PORT:
+            return _metrics_server
+        try:
+            _metrics_server = MetricsServer(_metrics, host=METRICS_HOST, port=METRICS_PORT).start()
+        except OSError as e:
+            print(f"⚠️ Metrik-Endpunkt auf {METRICS_HOST}:{METRICS_PORT} nicht verfügbar: {e}")
+            return None
+        print(f"📈 Metriken unter {_metrics_server.url}")
+        return _metrics_server
+
+
+def print_rate_limit_headroom():
+    """Zeigt den verbleibenden Spielraum aller Rate-Limiter"""
+    parts = []
+    for limiter in (_bluesky_limiter, _chat_limiter, _claude_limiter):
+        headroom = limiter.headroom()
+        if not headroom['calls']:
+            continue
+        
+        text = f"{headroom['name']} {headroom['calls']} Calls"
+        if headroom['limit']:
+            text += f", {headroom['remaining']}/{headroom['limit']} übrig"
+            if headroom['reset_in'] is not None:
+                text += f" (Reset in {headroom['reset_in']:.0f}s)"
+        if headroom['waited_seconds'] >= 1:
+            text += f", {headroom['waited_seconds']:.0f}s gewartet"
+        if headroom['throttled']:
+            text += f", {headroom['throttled']}x 429"
+        parts.append(text)
+    
+    if parts:
+        print("🚦 Rate-Limits: " + " | ".join(parts))
+
+
+def process_job(client, job, dry_run=False):
+    """Verarbeitet einen einzelnen Job sequentiell durch alle Stufen"""
+    for stage in build_stages(client, dry_run=dry_run):
+        job = stage.func(job)
+        if job is None:
+            return False
+    return job['success']
+
+
+def process_mention(client, mention, dry_run=False):
+    """
+    Verarbeitet eine einzelne Mention mit vollem Kontext
+    
+    Workflow:
+    1. Prüfe ob Mention leer ist & ob sie Reply auf anderen Post ist
+    2. Thread-Context laden (alle vorherigen Posts)
+    3. URLs aus Mention UND Thread extrahieren (aus facets/embeds!)
+    4. Webseiten-Inhalte laden
+    5. Claude um Antwort bitten (mit Kontext + URLs)
+    6. Antwort auf Bluesky posten (entweder auf Mention oder auf Original-Post)
+    
+    Args:
+        dry_run: Wenn True, wird nicht wirklich auf Bluesky gepostet
+    """
+    return process_job(client, new_job('mention', mention), dry_run=dry_run)
+
+
+def process_dm(client, dm, dry_run=False):
+    """
+    Verarbeitet eine einzelne Direktnachricht
+    
+    WICHTIG: Bot antwortet ÖFFENTLICH auf den referenzierten Post, nicht per DM!
+    
+    Workflow:
+    1. Extrahiere referenzierten Post aus DM
+    2. Lade Thread-Context des Posts
+    3. Extrahiere URLs aus Post und Thread
+    4. Lade Webseiten-Inhalte
+    5. Generiere Antwort mit Claude (basierend auf referenziertem Post)
+    6. Poste Antwort ÖFFENTLICH auf Bluesky (als Reply auf den Post)
+    7. Lösche DM (kein Cache nötig!)
+    
+    Args:
+        dry_run: Wenn True, wird nichts wirklich gepostet oder gelöscht
+    """
+    return process_job(client, new_job('dm', dm), dry_run=dry_run)
 
 
 def process_all_mentions(client, dry_run=False):
@@ -963,6 +2294,11 @@ def process_all_mentions(client, dry_run=False):
     
     Args:
         dry_run: Wenn True, werden keine Antworten wirklich gepostet
+    
+    Returns:
+        (erfolgreich beantwortet, gefunden) - gefunden zählt alle Mentions
+        die in diesem Durchlauf aufgenommen wurden, auch die asynchron per
+        Batch beantworteten und die fehlgeschlagenen
     """
     print("\n" + "="*60)
     print("🔍 SUCHE NACH NEUEN MENTIONS")
@@ -970,31 +2306,66 @@ def process_all_mentions(client, dry_run=False):
         print("🧪 DRY RUN MODUS AKTIV - Keine Posts werden veröffentlicht!")
     print("="*60)
     
+    resume_pending_batches(client, dry_run=dry_run)
+    
     # Hole Mentions
     mentions = get_recent_mentions(client)
     
-    if not mentions:
+    # Neue Mentions + unfertige aus früheren Läufen
+    jobs = queue_jobs('mention', [new_job('mention', mention) for mention in mentions], dry_run=dry_run)
+    
+    if not jobs:
+        if not dry_run:
+            advance_notification_hwm(client)
         print("📭 Keine neuen Mentions gefunden")
-        return 0
+        return 0, 0
     
-    # Verarbeite jede Mention
-    successful = 0
-    for i, mention in enumerate(mentions, 1):
-        print(f"\n[{i}/{len(mentions)}]")
-        if process_mention(client, mention, dry_run=dry_run):
-            successful += 1
+    if len(jobs) >= BATCH_THRESHOLD:
+        # Grosser Rückstau → günstiger Batch-Pfad, Antworten kommen asynchron
+        process_backlog_with_batches(client, jobs, dry_run=dry_run)
+        successful = 0
+    else:
+        # Verarbeite alle Mentions nebenläufig in der Pipeline
+        successful = run_pipeline(client, jobs, dry_run=dry_run)
     
-    # Markiere als gelesen
+    # High-Water-Mark fortschreiben und nur bis zur neuesten verarbeiteten Mention als gelesen markieren
     if not dry_run:
-        mark_notification_as_read(client)
+        advance_notification_hwm(client)
     else:
         print("\n🧪 DRY RUN: Notifications werden NICHT als gelesen markiert")
     
     print(f"\n{'='*60}")
-    print(f"✅ {successful}/{len(mentions)} Mentions erfolgreich verarbeitet")
+    print(f"✅ {successful}/{len(jobs)} Mentions erfolgreich verarbeitet")
     print(f"{'='*60}\n")
     
-    return successful
+    return successful, len(jobs)
+
+
+def advance_notification_hwm(client):
+    """
+    Persistiert die in get_recent_mentions ermittelte Marke (nach der Verarbeitung)
+    
+    update_seen folgt der High-Water-Mark - solange ein Burst-Rest offen ist,
+    bleibt beides unter den noch ungelesenen Seiten.
+    """
+    mark = getattr(client, '_notification_mark', None)
+    if not mark:
+        return
+    client._notification_mark = None
+    
+    state = get_state_store()
+    previous = state.get('notifications_hwm')
+    
+    if mark['backfill']:
+        state.set('notifications_backfill', mark['backfill'])
+    else:
+        state.delete('notifications_backfill')
+    
+    if mark['hwm']:
+        state.set('notifications_hwm', mark['hwm'])
+        state.set('notifications_hwm_uris', mark['hwm_uris'])
+        if mark['hwm'] != previous:
+            mark_notification_as_read(client, seen_at=mark['hwm'])
 
 
 def process_all_dms(client, dry_run=False):
@@ -1003,11 +2374,14 @@ def process_all_dms(client, dry_run=False):
     
     Args:
         dry_run: Wenn True, werden keine Antworten wirklich gesendet
+    
+    Returns:
+        (erfolgreich beantwortet, gefunden) wie process_all_mentions
     """
     # Prüfe ob DMs bereits als nicht verfügbar markiert wurden
     if hasattr(client, '_dm_not_available') and client._dm_not_available:
         # Stille Rückkehr - keine Log-Nachricht bei jedem Check
-        return 0
+        return 0, 0
     
     print("\n" + "="*60)
     print("🔍 SUCHE NACH NEUEN DIREKTNACHRICHTEN")
@@ -1015,25 +2389,49 @@ def process_all_dms(client, dry_run=False):
         print("🧪 DRY RUN MODUS AKTIV - Keine DMs werden gesendet!")
     print("="*60)
     
+    resume_pending_batches(client, dry_run=dry_run)
+    
     # Hole DMs
     dms = get_direct_messages(client)
     
-    if not dms:
+    # Neue DMs + unfertige aus früheren Läufen (laufende Batch-Jobs werden übersprungen)
+    jobs = queue_jobs('dm', [new_job('dm', dm) for dm in dms], dry_run=dry_run)
+    
+    if not jobs:
         print("📭 Keine neuen DMs mit Post-Referenz gefunden")
-        return 0
+        if not dry_run:
+            advance_dm_log_cursor(client)
+        # Löschungen aus inzwischen fertigen Batches
+        flush_dm_housekeeping(client)
+        return 0, 0
+    
+    if len(jobs) >= BATCH_THRESHOLD:
+        # Grosser Rückstau → günstiger Batch-Pfad, Antworten kommen asynchron
+        process_backlog_with_batches(client, jobs, dry_run=dry_run)
+        successful = 0
+    else:
+        # Verarbeite alle DMs nebenläufig in der Pipeline
+        successful = run_pipeline(client, jobs, dry_run=dry_run)
+    
+    # Chat-Log-Cursor erst nach der Verarbeitung fortschreiben
+    if not dry_run:
+        advance_dm_log_cursor(client)
     
-    # Verarbeite jede DM
-    successful = 0
-    for i, dm in enumerate(dms, 1):
-        print(f"\n[{i}/{len(dms)}]")
-        if process_dm(client, dm, dry_run=dry_run):
-            successful += 1
+    # Gesammelte Löschungen/Gelesen-Markierungen in einem Rutsch
+    flush_dm_housekeeping(client)
     
     print(f"\n{'='*60}")
-    print(f"✅ {successful}/{len(dms)} DMs erfolgreich verarbeitet")
+    print(f"✅ {successful}/{len(jobs)} DMs erfolgreich verarbeitet")
     print(f"{'='*60}\n")
     
-    return successful
+    return successful, len(jobs)
+
+
+def advance_dm_log_cursor(client):
+    """Persistiert den Chat-Log-Cursor des letzten get_direct_messages-Aufrufs"""
+    cursor = getattr(client, '_dm_log_cursor', None)
+    if cursor:
+        get_state_store().set('chat_log_cursor', cursor)
 
 
 def run_bot_continuously(client, check_interval=60, dry_run=False):
@@ -1041,25 +2439,31 @@ def run_bot_continuously(client, check_interval=60, dry_run=False):
     Lässt den Bot dauerhaft laufen und prüft regelmäßig auf Mentions und DMs
     
     Der Bot läuft in einer Endlosschleife und:
-    - Prüft alle X Sekunden auf neue Mentions und DMs (falls verfügbar)
+    - Pollt Mentions und DMs in getrennten, adaptiven Intervallen:
+      solange etwas kommt im kürzesten Intervall, bei Leerlauf mit
+      exponentiellem Backoff bis zum Maximum (MENTION_POLL_*, DM_POLL_*)
+    - Bremst automatisch, wenn die Rate-Limit-Header der API knapp werden
     - Verarbeitet alle gefundenen Nachrichten
     - Behandelt Fehler gracefully und startet neu
     - Kann mit Ctrl+C gestoppt werden
     
     Args:
-        check_interval: Sekunden zwischen Checks
+        check_interval: Sekunden Wartezeit vor einem Neustart nach Fehlern
         dry_run: Wenn True, werden keine Antworten wirklich gepostet/gesendet
     """
     print("\n" + "="*60)
     print(f"🤖 BOT LÄUFT DAUERHAFT")
-    print(f"⏰ Prüft alle {check_interval} Sekunden auf neue Nachrichten")
+    print(f"⏰ Mentions alle {MENTION_POLL_MIN:.0f}-{MENTION_POLL_MAX:.0f}s, DMs alle {DM_POLL_MIN:.0f}-{DM_POLL_MAX:.0f}s (adaptiv)")
     if dry_run:
         print("🧪 DRY RUN MODUS - Keine Nachrichten werden veröffentlicht!")
     print("="*60)
     print("💡 Drücke Ctrl+C um zu stoppen\n")
     
+    start_metrics_server()
+    
     # Prüfe einmalig ob DMs verfügbar sind
     print("ℹ️  Teste DM-Verfügbarkeit...")
+    capture_mark('dm_probe', dry_run=dry_run)
     test_dms = get_direct_messages(client)
     dm_available = not (hasattr(client, '_dm_not_available') and client._dm_not_available)
     
@@ -1068,6 +2472,16 @@ def run_bot_continuously(client, check_interval=60, dry_run=False):
     else:
         print("ℹ️  DM-Support nicht verfügbar - Bot verarbeitet nur Mentions\n")
     
+    mention_schedule = AdaptiveSchedule('Mentions', MENTION_POLL_MIN, MENTION_POLL_MAX,
+                                        backoff=POLL_BACKOFF, rate_limit=_bluesky_limiter)
+    schedules = [mention_schedule]
+    
+    if dm_available:
+        # DMs laufen über den Chat-Proxy und dessen Kontingent
+        dm_schedule = AdaptiveSchedule('DMs', DM_POLL_MIN, DM_POLL_MAX,
+                                       backoff=POLL_BACKOFF, rate_limit=_chat_limiter)
+        schedules.append(dm_schedule)
+    
     iteration = 0
     
     try:
@@ -1077,13 +2491,20 @@ def run_bot_continuously(client, check_interval=60, dry_run=False):
             
             print(f"\n⏰ [{timestamp}] Check #{iteration}")
             
-            # Verarbeite Mentions
-            mention_count = process_all_mentions(client, dry_run=dry_run)
+            # Verarbeite Mentions (wenn fällig)
+            mention_count = 0
+            if mention_schedule.due():
+                capture_mark('mentions', dry_run=dry_run)
+                mention_count, mentions_found = process_all_mentions(client, dry_run=dry_run)
+                # Gefunden statt beantwortet: Batch-Rückstau und Claude-Ausfall sind kein Leerlauf
+                mention_schedule.record(mentions_found)
             
-            # Verarbeite DMs (nur wenn verfügbar)
+            # Verarbeite DMs (nur wenn verfügbar und fällig)
             dm_count = 0
-            if dm_available:
-                dm_count = process_all_dms(client, dry_run=dry_run)
+            if dm_available and dm_schedule.due():
+                capture_mark('dms', dry_run=dry_run)
+                dm_count, dms_found = process_all_dms(client, dry_run=dry_run)
+                dm_schedule.record(dms_found)
             
             if mention_count > 0 or dm_count > 0:
                 if dm_available:
@@ -1091,9 +2512,12 @@ def run_bot_continuously(client, check_interval=60, dry_run=False):
                 else:
                     print(f"✅ {mention_count} Mention(s) bearbeitet")
             
-            # Warte bis zum nächsten Check
-            print(f"😴 Schlafe {check_interval} Sekunden...")
-            time.sleep(check_interval)
+            # Warte bis die nächste Quelle fällig ist
+            sleep_seconds = min(schedule.seconds_until_due() for schedule in schedules)
+            if _bluesky_limiter.min_delay() > 1:
+                print(f"🐢 Rate-Limit fast erreicht (noch {_bluesky_limiter.remaining} Requests) - bremse")
+            print(f"😴 Schlafe {sleep_seconds:.0f} Sekunden...")
+            time.sleep(sleep_seconds)
             
     except KeyboardInterrupt:
         # Manuelles Stoppen mit Ctrl+C
@@ -1101,12 +2525,155 @@ def run_bot_continuously(client, check_interval=60, dry_run=False):
     except Exception as e:
         # Bei unerwartetem Fehler: Warte und versuche neu zu starten
         print(f"\n❌ Unerwarteter Fehler: {e}")
-        print("⏳ Warte 60 Sekunden und versuche es erneut...")
-        time.sleep(60)
+        print(f"⏳ Warte {check_interval} Sekunden und versuche es erneut...")
+        time.sleep(check_interval)
         # Rekursiver Aufruf um Bot am Laufen zu halten
         run_bot_continuously(client, check_interval, dry_run=dry_run)
 
 
+def resolve_handle(client, did):
+    """Löst eine DID in einen Handle auf (gecacht, Fallback: DID)"""
+    with _handle_cache_lock:
+        if did in _handle_cache:
+            _handle_cache.move_to_end(did)
+            return _handle_cache[did]
+    
+    # Profil-Abruf ausserhalb des Locks (Netzwerk)
+    try:
+        handle = client.get_profile(did).handle
+    except Exception:
+        return did
+    
+    with _handle_cache_lock:
+        _handle_cache[did] = handle
+        _handle_cache.move_to_end(did)
+        while len(_handle_cache) > HANDLE_CACHE_SIZE:
+            _handle_cache.popitem(last=False)
+    return handle
+
+
+def mention_from_stream_event(client, event):
+    """Baut aus einem Jetstream-Event ein Mention-Objekt wie get_recent_mentions"""
+    from atproto import models
+    
+    record = models.get_or_create(event['record'], strict=False)
+    indexed_at = datetime.fromtimestamp(event['time_us'] / 1_000_000, tz=timezone.utc)
+    
+    return {
+        'author': resolve_handle(client, event['did']),
+        'text': record.text if hasattr(record, 'text') else "",
+        'uri': event['uri'],
+        'cid': event['cid'],
+        'indexed_at': indexed_at.isoformat().replace('+00:00', 'Z'),
+        'record': record
+    }
+
+
+def stream_jobs(client, subscriber, dry_run=False):
+    """
+    Liefert Pipeline-Jobs aus dem Event-Stream (Generator, läuft endlos)
+    
+    Beim Reconnect wird ein paar Sekunden zurückgespult - bereits gesehene
+    Posts werden anhand ihrer URI übersprungen.
+    Unfertige Mentions aus früheren Läufen kommen zuerst.
+    """
+    yield from queue_jobs('mention', [], dry_run=dry_run)
+    
+    recent_uris = OrderedDict()
+    
+    for event in subscriber.events():
+        if event['uri'] in recent_uris:
+            continue
+        
+        recent_uris[event['uri']] = True
+        while len(recent_uris) > 1000:
+            recent_uris.popitem(last=False)
+        
+        try:
+            mention = mention_from_stream_event(client, event)
+        except Exception as e:
+            print(f"⚠️ Konnte Stream-Event nicht verarbeiten: {e}")
+            continue
+        
+        job = new_job('mention', mention)
+        
+        if not dry_run:
+            # Schon aus einem früheren Lauf bekannt → nicht nochmal
+            if get_work_queue().enqueue(job['key'], 'mention', job) in DONE_STATES:
+                continue
+            job['queued'] = True
+        
+        print(f"\n⚡ {'Mention' if event['reason'] == 'mention' else 'Reply'} per Stream von @{mention['author']}")
+        yield job
+
+
+def poll_dms_forever(client, dry_run=False):
+    """Pollt DMs im Hintergrund (DMs kommen nicht über Jetstream)"""
+    schedule = AdaptiveSchedule('DMs', DM_POLL_MIN, DM_POLL_MAX,
+                                backoff=POLL_BACKOFF, rate_limit=_chat_limiter)
+    while True:
+        time.sleep(schedule.seconds_until_due())
+        try:
+            _, found = process_all_dms(client, dry_run=dry_run)
+            schedule.record(found)
+        except Exception as e:
+            print(f"⚠️ Fehler beim DM-Poll: {e}")
+            schedule.record(0)
+
+
+def run_bot_streaming(client, dry_run=False):
+    """
+    Lässt den Bot im Push-Modus laufen (--stream)
+    
+    Mentions kommen über einen Jetstream-Websocket sobald sie gepostet
+    werden und laufen direkt in die Pipeline - kein Polling-Intervall mehr.
+    Der Stream-Cursor wird in DATA_DIR gesichert; nach Neustart oder
+    Verbindungsabbruch geht es dort weiter.
+    DMs werden weiterhin gepollt (adaptiv wie im Dauerbetrieb).
+    """
+    print("\n" + "="*60)
+    print(f"⚡ BOT LÄUFT IM STREAM-MODUS")
+    print(f"🔌 Event-Stream: {STREAM_URL}")
+    if dry_run:
+        print("🧪 DRY RUN MODUS - Keine Nachrichten werden veröffentlicht!")
+    print("="*60)
+    print("💡 Drücke Ctrl+C um zu stoppen\n")
+    
+    start_metrics_server()
+    state = get_state_store()
+    
+    subscriber = JetstreamSubscriber(
+        client.me.did,
+        url=STREAM_URL,
+        cursor=state.get('jetstream_cursor'),
+        include_replies=STREAM_INCLUDE_REPLIES,
+        checkpoint=lambda cursor: state.set('jetstream_cursor', cursor)
+    )
+    
+    # DMs laufen nicht über Jetstream → weiter pollen (im Hintergrund)
+    print("ℹ️  Teste DM-Verfügbarkeit...")
+    get_direct_messages(client)
+    if not (hasattr(client, '_dm_not_available') and client._dm_not_available):
+        print(f"✅ DM-Support aktiv - DMs werden alle {DM_POLL_MIN:.0f}-{DM_POLL_MAX:.0f}s gepollt\n")
+        threading.Thread(
+            target=poll_dms_forever,
+            args=(client,),
+            kwargs={'dry_run': dry_run},
+            name='dm-poll',
+            daemon=True
+        ).start()
+    
+    resume_pending_batches(client, dry_run=dry_run)
+    
+    try:
+        run_pipeline(client, stream_jobs(client, subscriber, dry_run=dry_run), dry_run=dry_run)
+    except KeyboardInterrupt:
+        print("\n\n🛑 Bot wurde manuell gestoppt (Ctrl+C)")
+    finally:
+        if subscriber.cursor:
+            state.set('jetstream_cursor', subscriber.cursor)
+
+
 def main():
     """Hauptfunktion"""
     import sys
@@ -1117,16 +2684,37 @@ def main():
         print("⚠️ Bitte .env Datei prüfen!")
         exit(1)
     
+    # Schnellstart: Claude-Check im Hintergrund bzw. übersprungen
+    fast_start = (
+        "--fast-start" in sys.argv or
+        os.getenv('FAST_START', 'false').lower() == 'true'
+    )
+    
+    # Mitschnitt: vor dem Login starten, damit auch Session und Profil drin sind
+    capture_path = CAPTURE_FILE
+    if "--capture" in sys.argv:
+        index = sys.argv.index("--capture")
+        has_path = index + 1 < len(sys.argv) and not sys.argv[index + 1].startswith("--")
+        capture_path = sys.argv[index + 1] if has_path else 'capture.jsonl.gz'
+    if capture_path:
+        if "--stream" in sys.argv or os.getenv('BOT_MODE') == 'stream':
+            print("⚠️ Mitschnitt im Stream-Modus nicht unterstützt (nur --continuous) - ignoriert\n")
+        else:
+            start_capture(capture_path)
+    
     client = test_bluesky_connection()
     if not client:
         print("❌ Konnte nicht bei Bluesky einloggen")
         exit(1)
     
-    if not test_claude_api():
-        print("❌ Claude API funktioniert nicht")
-        exit(1)
-    
-    print("✅ Alle Verbindungen erfolgreich!\n")
+    if fast_start:
+        check_claude_api_fast()
+    else:
+        if not test_claude_api():
+            print("❌ Claude API funktioniert nicht")
+            exit(1)
+        
+        print("✅ Alle Verbindungen erfolgreich!\n")
     
     # Prüfe ob Dry-Run-Modus aktiviert ist
     dry_run = (
@@ -1142,25 +2730,36 @@ def main():
         print("="*60)
         print()
     
-    # Entscheide: Einmal oder Dauerbetrieb?
-    if "--continuous" in sys.argv or os.getenv('BOT_MODE') == 'continuous':
+    # Entscheide: Einmal, Stream oder Dauerbetrieb?
+    if "--stream" in sys.argv or os.getenv('BOT_MODE') == 'stream':
+        run_bot_streaming(client, dry_run=dry_run)
+    elif "--continuous" in sys.argv or os.getenv('BOT_MODE') == 'continuous':
         check_interval = int(os.getenv('CHECK_INTERVAL', '60'))
         run_bot_continuously(client, check_interval=check_interval, dry_run=dry_run)
     else:
         print("📋 TEST-MODUS (einmalig)")
         if not dry_run:
             print("💡 Für Dry-Run: python main.py --dry-run")
-        print("💡 Für Dauerbetrieb: python main.py --continuous\n")
+        print("💡 Für Dauerbetrieb: python main.py --continuous")
+        print("💡 Für Push-Modus: python main.py --stream")
+        print("💡 Für Schnellstart: python main.py --fast-start")
+        print("💡 Für Mitschnitt: python main.py --continuous --capture capture.jsonl.gz\n")
         
         # Verarbeite Mentions
-        mention_count = process_all_mentions(client, dry_run=dry_run)
+        mention_count, _ = process_all_mentions(client, dry_run=dry_run)
         
         # Teste DM-Verfügbarkeit und verarbeite falls verfügbar
         print("\nℹ️  Teste DM-Verfügbarkeit...")
-        dm_count = process_all_dms(client, dry_run=dry_run)
+        dm_count, _ = process_all_dms(client, dry_run=dry_run)
         
         dm_available = not (hasattr(client, '_dm_not_available') and client._dm_not_available)
         
+        # Backlog-Modus: auf ausstehende Batch-Antworten warten
+        if _batch_runner is not None and _batch_runner.pending_count() > 0:
+            print(f"\n⏳ Warte auf {_batch_runner.pending_count()} Batch-Antwort(en)...")
+            _batch_runner.wait()
+            flush_dm_housekeeping(client)
+        
         if dm_available:
             print(f"\n✅ Test abgeschlossen! ({mention_count} Mentions + {dm_count} DMs)")
         else:
@@ -0,0 +1,297 @@
+"""
+Metriken im Prometheus-Textformat
+
+Bisher gab es nur print-Ausgaben - ob langsame Antworten vom Thread-Laden,
+vom URL-Abruf, von Claude oder vom Posten kommen, war nicht zu sehen.
+
+- Counter: monoton steigende Zähler (verarbeitet, übersprungen, Fehler)
+- Gauge: Momentanwerte (Queue-Tiefe, Cache-Trefferquote, Rate-Limit-Luft)
+- Histogram: Latenzen mit festen Buckets (pro Stufe und pro API-Call)
+
+Werte die anderswo schon gezählt werden (Cache-Statistik, Warteschlange)
+holt ein Collector erst beim Abruf. MetricsServer liefert alles über einen
+kleinen HTTP-Server (nur Standardbibliothek) unter /metrics aus.
+"""
+
+import functools
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latenz-Buckets in Sekunden (von Cache-Treffern bis zu langsamen Claude-Calls)
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Gemeinsame Basis: Name, Hilfetext, Label-Namen und Werte pro Label-Kombination"""
+
+    type = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name}: Labels {sorted(labels)} statt {list(self.labels)}")
+        return tuple((name, str(labels[name])) for name in self.labels)
+
+    def _samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for name, key, value in self._samples():
+            lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monoton steigender Zähler"""
+
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value, **labels):
+        """Übernimmt einen Zählerstand der anderswo gezählt wird (z.B. Cache-Treffer)"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Momentanwert"""
+
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class _Timer:
+    """Misst die Dauer eines Blocks bzw. Funktionsaufrufs (auch bei Exceptions)"""
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.monotonic() - self._started, **self.labels)
+        return False
+
+    def __call__(self, func):
+        # Als Decorator: pro Aufruf ein eigener Timer (Aufrufe laufen parallel)
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Timer(self.histogram, self.labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+class Histogram(_Metric):
+    """
+    Verteilung von Messwerten (z.B. Latenzen) in kumulativen Buckets
+
+    Args:
+        buckets: Obergrenzen der Buckets (aufsteigend, +Inf wird ergänzt)
+    """
+
+    type = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][index] += 1
+                    break
+            state['sum'] += value
+            state['count'] += 1
+
+    def time(self, **labels):
+        """Context-Manager/Decorator der die Dauer in Sekunden beobachtet"""
+        self._key(labels)
+        return _Timer(self, labels)
+
+    def snapshot(self, **labels):
+        """count, sum und kumulative Bucket-Zähler einer Label-Kombination"""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            if state is None:
+                return {'count': 0, 'sum': 0.0, 'buckets': {}}
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets, state['counts']):
+                cumulative += count
+                buckets[bound] = cumulative
+            return {'count': state['count'], 'sum': state['sum'], 'buckets': buckets}
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, dict(state, counts=list(state['counts']))) for key, state in self._values.items())
+
+        samples = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state['counts']):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", key + (('le', _format_value(bound)),), cumulative))
+            samples.append((f"{self.name}_sum", key, state['sum']))
+            samples.append((f"{self.name}_count", key, state['count']))
+        return samples
+
+
+class Registry:
+    """
+    Sammlung aller Metriken eines Prozesses
+
+    Collectors sind Funktionen ohne Argumente, die vor jedem Abruf laufen
+    und Gauges/Zähler aus anderen Objekten aktualisieren.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labels != metric.labels:
+                    raise ValueError(f"Metrik {metric.name} existiert schon mit anderem Typ/Labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def add_collector(self, func):
+        with self._lock:
+            self._collectors.append(func)
+
+    def collect(self):
+        """Führt alle Collectors aus (Fehler eines Collectors brechen den Abruf nicht ab)"""
+        with self._lock:
+            collectors = list(self._collectors)
+        for func in collectors:
+            try:
+                func()
+            except Exception as e:
+                print(f"⚠️ Metrik-Collector {getattr(func, '__name__', func)} fehlgeschlagen: {e}")
+
+    def render(self):
+        """Alle Metriken im Prometheus-Textformat"""
+        self.collect()
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsServer:
+    """
+    HTTP-Endpunkt für Prometheus (GET /metrics) in einem Daemon-Thread
+
+    Args:
+        registry: Registry deren Metriken ausgeliefert werden
+        host: Bind-Adresse (127.0.0.1 = nur lokal erreichbar)
+        port: Port (0 = freien Port wählen)
+    """
+
+    def __init__(self, registry, host='127.0.0.1', port=9108):
+        self.registry = registry
+        registry_ref = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry_ref.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Kein Log pro Scrape
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,179 @@
+"""
+Pipeline-Engine für die Verarbeitung von Mentions und DMs
+
+Eine Pipeline besteht aus mehreren Stufen (z.B. Thread laden → URLs anreichern
+→ Antwort generieren → posten). Die Stufen sind über begrenzte Queues
+verbunden und jede Stufe hat eine eigene Anzahl Worker-Threads.
+
+Backpressure: Ist die Eingangs-Queue einer Stufe voll, blockiert die
+vorherige Stufe beim Weiterreichen. Eine langsame Stufe bremst so den
+Zufluss, statt dass sich unbegrenzt viele Jobs im Speicher ansammeln.
+"""
+
+import queue
+import threading
+import time
+
+# Signalisiert einem Worker, dass keine weiteren Jobs kommen
+_STOP = object()
+
+
+class Stage:
+    """
+    Eine Stufe der Pipeline
+
+    Args:
+        name: Name der Stufe (für Logs und Statistik)
+        func: Funktion job -> job. Gibt sie None zurück, wird der Job
+              verworfen (z.B. übersprungen) und nicht weitergereicht.
+        workers: Anzahl paralleler Worker-Threads für diese Stufe
+    """
+
+    def __init__(self, name, func, workers=1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+
+
+class Pipeline:
+    """
+    Führt Jobs durch eine Folge von Stufen
+
+    Args:
+        stages: Liste von Stage-Objekten (in Ausführungsreihenfolge)
+        queue_size: Maximale Anzahl wartender Jobs zwischen zwei Stufen
+        observer: Optional Funktion (stage_name, outcome, seconds) die nach
+                  jedem Job aufgerufen wird - outcome ist 'processed',
+                  'skipped' oder 'failed' (z.B. für Metriken)
+    """
+
+    def __init__(self, stages, queue_size=8, observer=None):
+        if not stages:
+            raise ValueError("Pipeline braucht mindestens eine Stufe")
+        self.stages = stages
+        self.queue_size = max(1, int(queue_size))
+        self.observer = observer
+        self._lock = threading.Lock()
+
+    def run(self, jobs, on_result=None):
+        """
+        Verarbeitet alle Jobs und wartet bis die Pipeline leer ist
+
+        Args:
+            jobs: Iterable von Jobs (darf endlos sein, z.B. ein Event-Stream)
+            on_result: Optional Funktion job -> None für jeden fertigen Job.
+                       Dann werden keine Ergebnisse gesammelt - bei endloser
+                       Eingabe wächst so der Speicher nicht mit.
+
+        Returns:
+            Liste der Jobs, die alle Stufen durchlaufen haben (leer mit on_result)
+        """
+        # Eine Queue vor jeder Stufe (begrenzt → Backpressure)
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = []
+        threads = []
+
+        # Zählt pro Stufe die noch laufenden Worker. Der letzte Worker einer
+        # Stufe gibt das Stop-Signal an die nächste Stufe weiter.
+        remaining = [stage.workers for stage in self.stages]
+
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(index, queues, results, remaining, on_result),
+                    name=f"{stage.name}-{n + 1}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        # Jobs einspeisen - blockiert wenn die erste Queue voll ist
+        for job in jobs:
+            queues[0].put(job)
+
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_STOP)
+
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def _worker(self, index, queues, results, remaining, on_result):
+        """Worker-Schleife einer Stufe"""
+        stage = self.stages[index]
+        is_last = index == len(self.stages) - 1
+
+        while True:
+            job = queues[index].get()
+
+            if job is _STOP:
+                break
+
+            started = time.monotonic()
+            try:
+                output = stage.func(job)
+            except Exception as e:
+                # Fehler in einem Job dürfen die Pipeline nicht stoppen
+                print(f"❌ Fehler in Stufe '{stage.name}': {e}")
+                output = None
+                outcome = 'failed'
+                with self._lock:
+                    stage.failed += 1
+            else:
+                with self._lock:
+                    if output is None:
+                        outcome = 'skipped'
+                        stage.dropped += 1
+                    else:
+                        outcome = 'processed'
+                        stage.processed += 1
+            finally:
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    stage.busy_seconds += elapsed
+
+            if self.observer:
+                try:
+                    self.observer(stage.name, outcome, elapsed)
+                except Exception as e:
+                    print(f"⚠️ Pipeline-Observer fehlgeschlagen: {e}")
+
+            if output is None:
+                continue
+
+            if is_last and on_result:
+                try:
+                    on_result(output)
+                except Exception as e:
+                    print(f"⚠️ Ergebnis-Callback fehlgeschlagen: {e}")
+            elif is_last:
+                with self._lock:
+                    results.append(output)
+            else:
+                # Blockiert wenn die nächste Stufe nicht nachkommt (Backpressure)
+                queues[index + 1].put(output)
+
+        # Letzter Worker dieser Stufe → nächste Stufe beenden
+        with self._lock:
+            remaining[index] -= 1
+            last_worker = remaining[index] == 0
+
+        if last_worker and not is_last:
+            for _ in range(self.stages[index + 1].workers):
+                queues[index + 1].put(_STOP)
+
+    def print_stats(self):
+        """Gibt eine kurze Statistik pro Stufe aus"""
+        print("📊 Pipeline-Statistik:")
+        for stage in self.stages:
+            print(
+                f"   {stage.name}: {stage.processed} ok, {stage.dropped} übersprungen, "
+                f"{stage.failed} Fehler, {stage.busy_seconds:.1f}s Arbeitszeit "
+                f"({stage.workers} Worker)"
+            )
@@ -0,0 +1,218 @@
+"""
+Token-Budget für den Claude-Prompt
+
+Statt den ganzen Thread und feste 2000 Zeichen pro Webseite mitzuschicken,
+wird der Inhalt nach Priorität in ein Input-Token-Budget gepackt:
+
+1. Aktuelle Mention (immer, notfalls gekürzt)
+2. Die nächsten Vorgänger-Posts (neuester zuerst)
+3. Auszüge der verlinkten Webseiten (Budget gleichmässig verteilt)
+4. Ältere Posts (von neu nach alt, solange Platz ist)
+
+Posts werden nur ganz oder gar nicht aufgenommen und ohne Lücke: sobald
+einer nicht mehr passt, fallen auch alle älteren weg. Was weggelassen oder
+gekürzt wurde, steht im Ergebnis.
+
+Tokens werden geschätzt (Zeichen pro Token) - ein lokaler Claude-Tokenizer
+existiert nicht und count_tokens wäre ein zusätzlicher API-Call pro
+Antwort. Die Schätzung wird mit den echten input_tokens jeder Antwort
+nachkalibriert (observe). Gerechnet und gekürzt wird aber mit einem in
+groben Stufen gerundeten Verhältnis: Gleiche Eingaben ergeben so
+byte-identische Prompts (Prompt-Cache, Wiedergabe von Mitschnitten),
+statt dass sich Schnittstellen nach jeder Antwort leicht verschieben.
+"""
+
+import threading
+
+# Startwert für Deutsch/Englisch mit URLs (eher vorsichtig)
+CHARS_PER_TOKEN = 3.5
+
+# Aufschlag pro Post/URL für Nummerierung, Autor, Zeilenumbrüche
+ITEM_OVERHEAD_TOKENS = 8
+
+# Stufen in denen das kalibrierte Verhältnis übernommen wird
+RATIO_STEP = 0.25
+
+
+class TokenEstimator:
+    """
+    Schätzt Tokens aus der Textlänge und lernt das Verhältnis aus echten Antworten
+
+    `calibrated` folgt jeder Antwort (gleitender Mittelwert), count/truncate
+    nutzen `chars_per_token`: das auf RATIO_STEP gerundete Verhältnis, das
+    erst wechselt wenn der Mittelwert eine ganze Stufe davon abweicht.
+
+    Args:
+        chars_per_token: Startwert
+        smoothing: Gewicht einer neuen Beobachtung (gleitender Mittelwert)
+        step: Stufe für das verwendete Verhältnis
+    """
+
+    def __init__(self, chars_per_token=CHARS_PER_TOKEN, smoothing=0.2, step=RATIO_STEP):
+        self.chars_per_token = chars_per_token
+        self.calibrated = chars_per_token
+        self.smoothing = smoothing
+        self.step = step
+        self._lock = threading.Lock()
+
+    def count(self, text):
+        if not text:
+            return 0
+        return int(len(text) / self.chars_per_token) + 1
+
+    def truncate(self, text, tokens):
+        """Kürzt auf ungefähr `tokens` Tokens (an einer Wortgrenze, mit …)"""
+        max_chars = int(tokens * self.chars_per_token)
+        if len(text) <= max_chars:
+            return text
+        cut = text[:max(0, max_chars - 2)].rsplit(' ', 1)[0]
+        return cut + " …"
+
+    def observe(self, chars, tokens):
+        """Echte Token-Zahl (usage) für `chars` Zeichen Input → Verhältnis nachführen"""
+        if chars <= 0 or tokens <= 0:
+            return
+        ratio = min(6.0, max(2.0, chars / tokens))
+        with self._lock:
+            self.calibrated += self.smoothing * (ratio - self.calibrated)
+            if abs(self.calibrated - self.chars_per_token) >= self.step:
+                self.chars_per_token = round(self.calibrated / self.step) * self.step
+
+
+class PromptBuilder:
+    """
+    Packt Mention, Thread und Webseiten nach Priorität in ein Token-Budget
+
+    Args:
+        budget: Input-Tokens pro Request insgesamt (inkl. System-Prompt)
+        nearest_posts: So viele direkte Vorgänger haben Vorrang vor den Webseiten
+        url_max_tokens: Höchstens so viele Tokens pro Webseite
+        min_excerpt_tokens: Kürzere Auszüge lohnen nicht - Webseite fällt weg
+        estimator: TokenEstimator (Default: neuer Schätzer)
+    """
+
+    def __init__(self, budget=3000, nearest_posts=3, url_max_tokens=700,
+                 min_excerpt_tokens=80, estimator=None):
+        self.budget = budget
+        self.nearest_posts = nearest_posts
+        self.url_max_tokens = url_max_tokens
+        self.min_excerpt_tokens = min_excerpt_tokens
+        self.estimator = estimator or TokenEstimator()
+
+    def pack(self, mention_text, thread_context=None, url_contents=None, reserved_tokens=0):
+        """
+        Wählt aus, was in den Prompt kommt
+
+        Args:
+            mention_text: Text der aktuellen Mention
+            thread_context: Posts (Dicts mit author, text), chronologisch
+            url_contents: Dict URL -> extrahierter Inhalt
+            reserved_tokens: Feste Teile (System-Prompt, Anweisungen, Überschriften)
+
+        Returns:
+            Dict mit mention, posts (Liste (Position ab 1, Post) chronologisch),
+            omitted_posts (ausgelassene ältere Posts), url_contents
+            (URL -> Auszug), tokens (Schätzung gesamt), budget, dropped und
+            truncated (je Liste von Dicts mit part, label, tokens)
+        """
+        thread_context = thread_context or []
+        url_contents = url_contents or {}
+        count = self.estimator.count
+        left = self.budget - reserved_tokens
+        dropped = []
+        truncated = []
+
+        # 1. Mention: immer dabei, notfalls gekürzt
+        mention_tokens = count(mention_text)
+        if mention_tokens > left:
+            kept = max(left, self.min_excerpt_tokens)
+            mention_text = self.estimator.truncate(mention_text, kept)
+            truncated.append({'part': 'mention', 'label': 'Mention', 'tokens': mention_tokens, 'kept': kept})
+            mention_tokens = count(mention_text)
+        left -= mention_tokens
+
+        # 2. + 4. Posts von neu nach alt, ohne Lücke; ältere erst nach den Webseiten
+        posts = list(enumerate(thread_context, 1))
+        newest_first = posts[::-1]
+        nearest = newest_first[:self.nearest_posts]
+        older = newest_first[self.nearest_posts:]
+        included = []
+
+        def take_posts(candidates):
+            nonlocal left
+            for position, post in candidates:
+                tokens = count(f"@{post['author']}: {post['text']}") + ITEM_OVERHEAD_TOKENS
+                if tokens > left:
+                    return False
+                included.append((position, post))
+                left -= tokens
+            return True
+
+        complete = take_posts(nearest)
+
+        # 3. Webseiten: kürzeste zuerst, damit ihr Rest den langen zugute kommt
+        excerpts = {}
+        pending = sorted(url_contents.items(), key=lambda item: len(item[1] or ''))
+        for remaining, (url, content) in zip(range(len(pending), 0, -1), pending):
+            content = content or ''
+            full_tokens = count(content)
+            share = min(self.url_max_tokens, (left // remaining) - ITEM_OVERHEAD_TOKENS)
+            if share < min(self.min_excerpt_tokens, full_tokens):
+                dropped.append({'part': 'url', 'label': url, 'tokens': full_tokens})
+                continue
+
+            excerpt = content
+            if full_tokens > share:
+                excerpt = self.estimator.truncate(content, share)
+                truncated.append({'part': 'url', 'label': url, 'tokens': full_tokens, 'kept': share})
+            excerpts[url] = excerpt
+            left -= count(excerpt) + ITEM_OVERHEAD_TOKENS
+
+        if complete:
+            take_posts(older)
+
+        included_positions = {position for position, _ in included}
+        for position, post in posts:
+            if position not in included_positions:
+                dropped.append({
+                    'part': 'post',
+                    'label': f"#{position} @{post['author']}",
+                    'tokens': count(post['text']) + ITEM_OVERHEAD_TOKENS
+                })
+
+        return {
+            'mention': mention_text,
+            'posts': sorted(included, key=lambda item: item[0]),
+            'omitted_posts': len(posts) - len(included),
+            'url_contents': {url: excerpts[url] for url in sorted(excerpts)},
+            'tokens': self.budget - left,
+            'budget': self.budget,
+            'dropped': dropped,
+            'truncated': truncated
+        }
+
+
+def describe_packing(packed):
+    """Kurzbeschreibung was weggelassen/gekürzt wurde (leer wenn alles passte)"""
+    parts = []
+    posts = [item for item in packed['dropped'] if item['part'] == 'post']
+    if posts:
+        parts.append(f"{len(posts)} Post(s) ausgelassen (~{sum(item['tokens'] for item in posts)} Tokens)")
+    for item in packed['dropped']:
+        if item['part'] != 'post':
+            parts.append(f"{item['label']} ausgelassen (~{item['tokens']} Tokens)")
+    for item in packed['truncated']:
+        parts.append(f"{item['label']} gekürzt ({item['tokens']} → {item['kept']} Tokens)")
+    return ", ".join(parts)
+
+
+def request_chars(request):
+    """Zeichen an Text in einem messages.create-Request (System + Nachrichten)"""
+    def text_length(content):
+        if isinstance(content, str):
+            return len(content)
+        return sum(len(block.get('text', '')) for block in content or [])
+
+    return text_length(request.get('system')) + sum(
+        text_length(message.get('content')) for message in request.get('messages', [])
+    )
@@ -0,0 +1,237 @@
+"""
+Zentrale Rate-Limits für alle ausgehenden API-Calls
+
+Jeder Dienst (Bluesky-PDS, Chat, Anthropic) hat einen RateLimiter:
+
+- Token-Bucket mit konfigurierter Rate und Burst - ein Call wartet bis ein
+  Token frei ist, statt einen 429 zu riskieren
+- Die Rate-Limit-Header der Antworten (ratelimit-remaining/-reset bzw.
+  anthropic-ratelimit-requests-*, retry-after) passen das Tempo an: Ist nur
+  noch die Reserve übrig, werden die restlichen Calls bis zum Reset
+  verteilt; nach einem 429 wird bis zum Reset gewartet
+- Ein 429 lässt den Call nicht scheitern: limit_client() bzw. der
+  ClaudeClient warten und versuchen es erneut
+
+headroom() meldet wie viel Luft noch bleibt.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+
+class RateLimiter:
+    """
+    Token-Bucket plus serverseitig gemeldetes Rate-Limit eines Dienstes
+
+    Args:
+        name: Name des Dienstes (für Logs)
+        per_minute: Erlaubte Calls pro Minute (eigene Obergrenze)
+        burst: Max. Calls direkt hintereinander
+        reserve: Anteil des Server-Limits ab dem gebremst wird (0.1 = letzte 10%)
+    """
+
+    def __init__(self, name, per_minute, burst=5, reserve=0.1):
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.burst = max(1, burst)
+        self.reserve = reserve
+
+        self.tokens = float(self.burst)
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.blocked_until = 0.0
+
+        self.calls = 0
+        self.throttled = 0
+        self.waited_seconds = 0.0
+
+        self._updated = time.time()
+        self._last_call = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _spacing(self, now):
+        """Mindestabstand zwischen Calls wenn nur noch die Reserve übrig ist"""
+        if self.limit and self.remaining is not None and self.reset_at and self.reset_at > now:
+            if self.remaining <= self.limit * self.reserve:
+                return (self.reset_at - now) / max(self.remaining, 1)
+        return 0.0
+
+    def _delay(self, now):
+        delay = max(0.0, self.blocked_until - now)
+        delay = max(delay, self._last_call + self._spacing(now) - now)
+        if self.tokens < 1:
+            delay = max(delay, (1 - self.tokens) / self.rate)
+        return delay
+
+    def acquire(self):
+        """
+        Wartet bis der nächste Call erlaubt ist und verbraucht ein Token
+
+        Returns:
+            Gewartete Sekunden
+        """
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.time()
+                self._refill(now)
+                delay = self._delay(now)
+
+                if delay <= 0:
+                    self.tokens -= 1
+                    self._last_call = now
+                    self.calls += 1
+                    self.waited_seconds += waited
+                    return waited
+
+            # In kurzen Schritten schlafen: neue Header können die Wartezeit verkürzen
+            step = min(delay, 1.0)
+            time.sleep(step)
+            waited += step
+
+    def min_delay(self):
+        """Wartezeit (Sekunden) bis zum nächsten erlaubten Call, ohne Token zu verbrauchen"""
+        with self._lock:
+            now = time.time()
+            self._refill(now)
+            return self._delay(now)
+
+    def observe(self, limit=None, remaining=None, reset_at=None, retry_after=None, status=None):
+        """
+        Übernimmt das vom Server gemeldete Rate-Limit
+
+        Args:
+            limit: Calls pro Fenster
+            remaining: Verbleibende Calls im Fenster
+            reset_at: Unix-Zeitstempel des Fenster-Resets
+            retry_after: Sekunden bis zum nächsten Versuch
+            status: HTTP-Status (429 → bis zum Reset warten)
+        """
+        now = time.time()
+
+        with self._lock:
+            if limit is not None:
+                self.limit = limit
+            if remaining is not None:
+                self.remaining = remaining
+            if reset_at is not None:
+                self.reset_at = reset_at
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+
+            # Limit erreicht → bis zum Reset gar keine Calls mehr
+            if status == 429 or self.remaining == 0:
+                self.throttled += 1 if status == 429 else 0
+                if self.reset_at and self.reset_at > now:
+                    self.blocked_until = max(self.blocked_until, self.reset_at)
+                elif retry_after is None:
+                    self.blocked_until = max(self.blocked_until, now + 60)
+
+    def headroom(self):
+        """Aktueller Spielraum (für Logs und Metriken)"""
+        with self._lock:
+            now = time.time()
+            self._refill(now)
+            return {
+                'name': self.name,
+                'tokens': self.tokens,
+                'burst': self.burst,
+                'limit': self.limit,
+                'remaining': self.remaining,
+                'reset_in': max(0.0, self.reset_at - now) if self.reset_at else None,
+                'blocked_for': max(0.0, self.blocked_until - now),
+                'calls': self.calls,
+                'throttled': self.throttled,
+                'waited_seconds': self.waited_seconds
+            }
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def atproto_rate_limit(headers):
+    """Liest die Rate-Limit-Header einer Bluesky/atproto-Antwort"""
+    headers = {key.lower(): value for key, value in (headers or {}).items()}
+    return {
+        'limit': _int(headers.get('ratelimit-limit')),
+        'remaining': _int(headers.get('ratelimit-remaining')),
+        'reset_at': _float(headers.get('ratelimit-reset')),
+        'retry_after': _float(headers.get('retry-after'))
+    }
+
+
+def anthropic_rate_limit(headers):
+    """Liest die Rate-Limit-Header einer Anthropic-Antwort (Requests-Limit)"""
+    headers = {key.lower(): value for key, value in (headers or {}).items()}
+
+    reset_at = None
+    reset = headers.get('anthropic-ratelimit-requests-reset')
+    if reset:
+        try:
+            reset_at = datetime.fromisoformat(reset.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+
+    return {
+        'limit': _int(headers.get('anthropic-ratelimit-requests-limit')),
+        'remaining': _int(headers.get('anthropic-ratelimit-requests-remaining')),
+        'reset_at': reset_at,
+        'retry_after': _float(headers.get('retry-after'))
+    }
+
+
+def limit_client(client, limiter, retries=3):
+    """
+    Leitet alle XRPC-Calls eines atproto-Clients durch den RateLimiter
+
+    Jede Anfrage läuft über client._invoke: vorher ein Token holen, danach
+    die Rate-Limit-Header übernehmen. Ein 429 wird nicht weitergereicht,
+    sondern nach der Wartezeit bis zu `retries` mal wiederholt.
+    """
+    if getattr(client, '_rate_limiter', None) is limiter:
+        return client
+
+    invoke = client._invoke
+
+    def _invoke(*args, **kwargs):
+        attempt = 0
+        while True:
+            limiter.acquire()
+            try:
+                response = invoke(*args, **kwargs)
+            except Exception as e:
+                response = getattr(e, 'response', None)
+                status = getattr(response, 'status_code', None)
+                if response is not None:
+                    limiter.observe(**atproto_rate_limit(response.headers), status=status)
+
+                if status == 429 and attempt < retries:
+                    attempt += 1
+                    print(f"🚦 {limiter.name}: Rate-Limit erreicht - warte und versuche erneut ({attempt}/{retries})")
+                    continue
+                raise
+
+            limiter.observe(**atproto_rate_limit(getattr(response, 'headers', None)))
+            return response
+
+    client._invoke = _invoke
+    client._rate_limiter = limiter
+    return client
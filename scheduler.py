@@ -0,0 +1,57 @@
+"""
+Adaptiver Poll-Scheduler für den Dauerbetrieb
+
+Statt nach jedem Durchlauf fix CHECK_INTERVAL Sekunden zu schlafen, hat
+jede Quelle (Mentions, DMs) ihren eigenen Takt:
+
+- Hat ein Durchlauf etwas gefunden, wird wieder im kürzesten Intervall
+  gepollt (schnelle Antworten solange Traffic da ist)
+- Findet ein Durchlauf nichts, verdoppelt sich das Intervall bis zum
+  konfigurierten Maximum (wenig unnötige API-Calls in ruhigen Phasen)
+- Der RateLimiter der Bluesky-API (rate_limit.py) bremst alle Quellen
+  gemeinsam, bevor das Limit erreicht ist
+"""
+
+import time
+
+
+class AdaptiveSchedule:
+    """
+    Poll-Takt einer Quelle mit exponentiellem Backoff bei Leerlauf
+
+    Args:
+        name: Name der Quelle (für Logs)
+        min_interval: Kürzestes Intervall in Sekunden (bei Traffic)
+        max_interval: Längstes Intervall in Sekunden (bei Leerlauf)
+        backoff: Faktor pro leerem Durchlauf
+        rate_limit: Optional RateLimiter der den Takt zusätzlich bremst
+    """
+
+    def __init__(self, name, min_interval, max_interval, backoff=2.0, rate_limit=None):
+        self.name = name
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.backoff = backoff
+        self.rate_limit = rate_limit
+        self.interval = min_interval
+        self.next_run = time.monotonic()
+
+    def record(self, found):
+        """Passt das Intervall nach einem Durchlauf an (found = Anzahl Treffer)"""
+        if found:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+        self.next_run = time.monotonic() + self.interval
+
+    def seconds_until_due(self):
+        """Sekunden bis zum nächsten Poll (inkl. Rate-Limit-Bremse)"""
+        wait = max(0.0, self.next_run - time.monotonic())
+        if self.rate_limit:
+            wait = max(wait, self.rate_limit.min_delay())
+        return wait
+
+    def due(self):
+        """True wenn die Quelle jetzt gepollt werden soll"""
+        return self.seconds_until_due() <= 0
@@ -0,0 +1,420 @@
+"""
+Lastsimulator: der Bot gegen lokale Fake-Dienste
+
+Startet im selben Prozess einen Fake-PDS samt Chat-Dienst, einen
+Fake-Anthropic-Server und einen lokalen Webserver (fakes.py) und lässt
+process_all_mentions / process_all_dms in einer Schleife dagegen laufen -
+mit dem echten atproto-Client, Rate-Limitern, Pipeline und Caches, aber
+ohne echte Posts und ohne API-Kosten.
+
+Ein Lastgenerator erzeugt Mentions und DMs mit der gewünschten Rate
+(Poisson-verteilt). Jeder Fake hat eine einstellbare Latenz- und
+Fehlerverteilung. Am Ende gibt es einen Bericht mit Durchsatz,
+p50/p95/p99 der End-to-End-Antwortzeit (Mention erstellt → Antwort
+gepostet) und Spitzen-Speicherverbrauch.
+
+Latenz-Angaben (Sekunden):
+    0.05                 fest
+    uniform:0.02,0.2     gleichverteilt
+    exp:0.1              exponentiell mit Mittelwert
+    lognormal:1.0,0.4    log-normal mit Median und Sigma
+
+Fehlerraten sind Wahrscheinlichkeiten pro Request (0.02 = 2%).
+
+Aufruf:
+    python simulate.py --duration 60 --mention-rate 2 --dm-rate 0.5
+    python simulate.py --llm-latency lognormal:2,0.5 --llm-errors 0.05 --json sim.json
+
+Die Rate-Limits des Bots gelten auch hier (RATE_LIMIT_CLAUDE=50 begrenzt
+z.B. auf 50 Antworten pro Minute) und lassen sich per Umgebungsvariable
+anheben.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import math
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+from fakes import FakeAnthropicServer, FakePdsServer, FakeWebServer
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'corpus')
+BOT_HANDLE = 'sagemate.test'
+
+QUESTIONS = [
+    "Kannst du das kurz zusammenfassen?",
+    "Stimmt das, was hier behauptet wird?",
+    "Was ist deine Meinung dazu?",
+    "Erklär mir das bitte einfach.",
+    "Welche Quellen gibt es dazu?"
+]
+
+
+def parse_latency(spec):
+    """
+    Macht aus einer Latenz-Angabe eine Funktion () -> Sekunden
+
+    Returns:
+        Funktion oder None (keine Verzögerung)
+    """
+    if spec in (None, '', '0'):
+        return None
+
+    kind, _, values = spec.partition(':')
+    if not values:
+        kind, values = 'fixed', kind
+    numbers = [float(value) for value in values.split(',')]
+
+    if kind == 'fixed':
+        return lambda: numbers[0]
+    if kind == 'uniform':
+        return lambda: random.uniform(numbers[0], numbers[1])
+    if kind == 'exp':
+        return lambda: random.expovariate(1 / numbers[0])
+    if kind == 'lognormal':
+        median, sigma = numbers
+        return lambda: random.lognormvariate(math.log(median), sigma)
+
+    raise ValueError(f"Unbekannte Latenz-Verteilung: {spec}")
+
+
+def parse_error_rate(probability):
+    """Fehlerrate → Funktion () -> True wenn der Request scheitern soll"""
+    if not probability:
+        return None
+    return lambda: random.random() < probability
+
+
+def percentile(values, p):
+    """Perzentil nach Nearest-Rank (values sortiert)"""
+    if not values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(values)))
+    return values[rank - 1]
+
+
+def latency_summary(values):
+    values = sorted(values)
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': values[-1],
+        'mean': sum(values) / len(values)
+    }
+
+
+def load_pages():
+    """HTML-Seiten für den Fake-Webserver (Benchmark-Korpus)"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    return pages or [b'<html><body><article><p>Testseite fuer den Simulator.</p></article></body></html>']
+
+
+class LoadTracker:
+    """
+    Merkt sich wann jede Mention/DM erzeugt und wann sie beantwortet wurde
+
+    Schlüssel ist die URI des Posts, auf den der Bot antworten soll: bei
+    Mentions die Mention selbst, bei DMs der referenzierte Post (der Bot
+    antwortet öffentlich, nicht per DM).
+    """
+
+    def __init__(self):
+        self.created = {}
+        self.answered = {}
+        self.duplicates = 0
+        self._lock = threading.Lock()
+
+    def created_item(self, kind, uri):
+        with self._lock:
+            self.created[uri] = (kind, time.time())
+
+    def on_reply(self, kind, target, text):
+        with self._lock:
+            if target in self.answered:
+                self.duplicates += 1
+                return
+            if target in self.created:
+                self.answered[target] = time.time()
+
+    def counts(self):
+        with self._lock:
+            return len(self.created), len(self.answered)
+
+    def created_count(self, kind):
+        with self._lock:
+            return sum(1 for created_kind, _ in self.created.values() if created_kind == kind)
+
+    def first_created(self):
+        with self._lock:
+            return min((created_at for _, created_at in self.created.values()), default=None)
+
+    def latencies(self, kind=None):
+        with self._lock:
+            return [
+                answered_at - self.created[uri][1]
+                for uri, answered_at in self.answered.items()
+                if kind is None or self.created[uri][0] == kind
+            ]
+
+
+def generate_load(pds, web, tracker, args, seed_posts, stop):
+    """Erzeugt Mentions und DMs als Poisson-Prozess bis `stop` gesetzt ist"""
+    total_rate = args.mention_rate + args.dm_rate
+    if total_rate <= 0:
+        return
+
+    count = 0
+    ends_at = time.monotonic() + args.duration
+
+    while not stop.is_set() and time.monotonic() < ends_at:
+        time.sleep(random.expovariate(total_rate))
+        count += 1
+
+        if random.random() < args.mention_rate / total_rate:
+            url = web.url(random.randrange(args.url_pool)) if random.random() < args.url_share else None
+            parent = random.choice(seed_posts) if random.random() < args.reply_share else None
+            uri = pds.add_mention(f"user{count}.test", random.choice(QUESTIONS), url=url, parent_uri=parent)
+            tracker.created_item('mention', uri)
+        else:
+            # Jede DM verweist auf einen eigenen Post, damit die Antwort eindeutig zuordenbar ist
+            post_uri = pds.add_post(f"author{count}.test", f"Post Nr. {count}: {random.choice(QUESTIONS)}")
+            pds.add_dm(f"dm{count}.test", post_uri)
+            tracker.created_item('dm', post_uri)
+
+
+def run_simulation(args, out):
+    """Führt die Simulation aus und liefert den Bericht (Dict)"""
+    random.seed(args.seed)
+    if args.tracemalloc:
+        import tracemalloc
+        tracemalloc.start()
+
+    pds = FakePdsServer(
+        handle=BOT_HANDLE,
+        latency=parse_latency(args.pds_latency),
+        error_rate=parse_error_rate(args.pds_errors),
+        chat_latency=parse_latency(args.chat_latency),
+        chat_error_rate=parse_error_rate(args.chat_errors)
+    ).start()
+    llm = FakeAnthropicServer(
+        batch_delay=args.batch_delay,
+        latency=parse_latency(args.llm_latency),
+        error_rate=parse_error_rate(args.llm_errors),
+        requests_per_minute=args.llm_rpm
+    ).start()
+    web = FakeWebServer(
+        load_pages(),
+        latency=parse_latency(args.web_latency),
+        error_rate=parse_error_rate(args.web_errors)
+    ).start()
+
+    # Vor dem Import von main: alles auf die Fakes zeigen lassen (.env überschreibt das nicht)
+    os.environ.update({
+        'BLUESKY_HANDLE': BOT_HANDLE,
+        'BLUESKY_PASSWORD': 'fake-password',
+        'ANTHROPIC_API_KEY': 'sk-ant-fake',
+        'ANTHROPIC_BASE_URL': llm.base_url,
+        'DATA_DIR': args.data_dir or tempfile.mkdtemp(prefix='sagemate-sim-'),
+        'METRICS_PORT': '0',
+        'NO_PROXY': '127.0.0.1,localhost'
+    })
+    os.environ.setdefault('BATCH_POLL_INTERVAL', '1')
+
+    tracker = LoadTracker()
+    pds.on_reply = tracker.on_reply
+    seed_posts = [pds.add_post(f"author{i}.test", f"Ausgangspost Nr. {i} zu einem aktuellen Thema") for i in range(20)]
+
+    bot_output = io.StringIO() if not args.verbose else out
+
+    with contextlib.redirect_stdout(bot_output):
+        import main
+        from atproto import Client
+
+        client = main.limit_client(Client(base_url=f"{pds.base_url}/xrpc"), main._bluesky_limiter)
+        main.login_with_saved_session(client, BOT_HANDLE, 'fake-password')
+
+        stop = threading.Event()
+        generator = threading.Thread(
+            target=generate_load, args=(pds, web, tracker, args, seed_posts, stop),
+            name='load-generator', daemon=True
+        )
+
+        started = time.time()
+        generator.start()
+        cycles = 0
+        last_progress = time.monotonic()
+        drain_deadline = None
+
+        try:
+            while True:
+                cycle_started = time.monotonic()
+                main.process_all_mentions(client)
+                main.process_all_dms(client)
+                cycles += 1
+
+                created, answered = tracker.counts()
+                if time.monotonic() - last_progress >= 5:
+                    print(f"⏱️  {time.time() - started:.0f}s: {created} erzeugt, {answered} beantwortet", file=out)
+                    last_progress = time.monotonic()
+
+                if not generator.is_alive():
+                    if drain_deadline is None:
+                        drain_deadline = time.monotonic() + args.drain_timeout
+                    if main._batch_runner is not None and main._batch_runner.pending_count():
+                        main._batch_runner.wait(timeout=max(0, drain_deadline - time.monotonic()))
+                        main.flush_dm_housekeeping(client)
+                    if answered >= created or time.monotonic() >= drain_deadline:
+                        break
+
+                time.sleep(max(0.0, args.poll_interval - (time.monotonic() - cycle_started)))
+        except KeyboardInterrupt:
+            print("\n🛑 Simulation abgebrochen", file=out)
+        finally:
+            stop.set()
+
+        finished = time.time()
+
+    peak_traced = None
+    if args.tracemalloc:
+        import tracemalloc
+        peak_traced = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    created, answered = tracker.counts()
+    replies = [t for _, _, t in pds.replies] + [t for _, _, t in pds.dm_replies]
+    first_created = tracker.first_created() or started
+    busy_seconds = (max(replies) - first_created) if replies else 0.0
+
+    report = {
+        'config': {key: value for key, value in vars(args).items() if key not in ('json', 'verbose')},
+        'duration_seconds': finished - started,
+        'cycles': cycles,
+        'created': {
+            'mentions': tracker.created_count('mention'),
+            'dms': tracker.created_count('dm')
+        },
+        'answered': answered,
+        'unanswered': created - answered,
+        'duplicate_replies': tracker.duplicates,
+        'throughput_per_second': answered / busy_seconds if busy_seconds else 0.0,
+        'offered_per_second': created / args.duration if args.duration else 0.0,
+        'latency_seconds': {
+            'all': latency_summary(tracker.latencies()),
+            'mention': latency_summary(tracker.latencies('mention')),
+            'dm': latency_summary(tracker.latencies('dm'))
+        },
+        'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024),
+        'peak_traced_bytes': peak_traced,
+        'fakes': {
+            'pds': {'requests': pds.requests_seen, 'errors_injected': pds.errors_injected},
+            'llm': {'requests': llm.requests_seen, 'rate_limited': llm.rate_limited},
+            'web': {'requests': web.requests_seen, 'errors_injected': web.errors_injected}
+        }
+    }
+
+    for server in (pds, llm, web):
+        server.stop()
+    return report
+
+
+def print_report(report, out):
+    def fmt(seconds):
+        return '-' if seconds is None else f"{seconds:.2f}s"
+
+    print("\n" + "=" * 60, file=out)
+    print("📊 SIMULATION", file=out)
+    print("=" * 60, file=out)
+    print(f"Dauer: {report['duration_seconds']:.0f}s, {report['cycles']} Zyklen", file=out)
+    print(
+        f"Erzeugt: {report['created']['mentions']} Mentions + {report['created']['dms']} DMs "
+        f"({report['offered_per_second']:.2f}/s angeboten)", file=out
+    )
+    print(
+        f"Beantwortet: {report['answered']}, offen: {report['unanswered']}, "
+        f"doppelt: {report['duplicate_replies']}", file=out
+    )
+    print(f"Durchsatz: {report['throughput_per_second']:.2f} Antworten/s", file=out)
+
+    print("\nEnd-to-End-Antwortzeit:", file=out)
+    for name, stats in report['latency_seconds'].items():
+        if not stats['count']:
+            continue
+        print(
+            f"  {name:<8} n={stats['count']:<5} p50={fmt(stats['p50'])}  p95={fmt(stats['p95'])}  "
+            f"p99={fmt(stats['p99'])}  max={fmt(stats['max'])}", file=out
+        )
+
+    memory = f"{report['peak_rss_bytes'] / 1024 / 1024:.0f} MB RSS (ganzer Prozess inkl. Fakes)"
+    if report['peak_traced_bytes'] is not None:
+        memory += f", {report['peak_traced_bytes'] / 1024 / 1024:.1f} MB Python-Heap"
+    print(f"\nSpitzen-Speicher: {memory}", file=out)
+
+    fakes = report['fakes']
+    print(
+        f"Fakes: PDS {fakes['pds']['requests']} Requests ({fakes['pds']['errors_injected']} Fehler), "
+        f"Claude {fakes['llm']['requests']} ({fakes['llm']['rate_limited']}x 429), "
+        f"Web {fakes['web']['requests']} ({fakes['web']['errors_injected']} Fehler)", file=out
+    )
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description='Lastsimulator für Sagemate (lokale Fake-Dienste)')
+    parser.add_argument('--duration', type=float, default=30, help='Sekunden Last erzeugen')
+    parser.add_argument('--mention-rate', type=float, default=1.0, help='Mentions pro Sekunde')
+    parser.add_argument('--dm-rate', type=float, default=0.2, help='DMs pro Sekunde')
+    parser.add_argument('--url-share', type=float, default=0.5, help='Anteil Mentions mit Link')
+    parser.add_argument('--url-pool', type=int, default=20, help='Anzahl verschiedener URLs (Cache-Treffer)')
+    parser.add_argument('--reply-share', type=float, default=0.3, help='Anteil Mentions als Reply in einem Thread')
+    parser.add_argument('--poll-interval', type=float, default=1.0, help='Sekunden zwischen zwei Zyklen')
+    parser.add_argument('--drain-timeout', type=float, default=120, help='Max. Sekunden Nachlauf nach der Last')
+    parser.add_argument('--pds-latency', default='uniform:0.02,0.08')
+    parser.add_argument('--pds-errors', type=float, default=0.0)
+    parser.add_argument('--chat-latency', default='uniform:0.02,0.08')
+    parser.add_argument('--chat-errors', type=float, default=0.0)
+    parser.add_argument('--llm-latency', default='lognormal:0.8,0.3')
+    parser.add_argument('--llm-errors', type=float, default=0.0, help='Anteil 529-Antworten')
+    parser.add_argument('--llm-rpm', type=int, default=None, help='Serverseitiges Rate-Limit (Requests/Minute)')
+    parser.add_argument('--web-latency', default='uniform:0.05,0.3')
+    parser.add_argument('--web-errors', type=float, default=0.0)
+    parser.add_argument('--batch-delay', type=float, default=2.0, help='Sekunden bis ein Fake-Batch fertig ist')
+    parser.add_argument('--data-dir', default=None, help='DATA_DIR (Default: neues Temp-Verzeichnis)')
+    parser.add_argument('--seed', type=int, default=None, help='Zufalls-Seed (reproduzierbare Last)')
+    parser.add_argument('--tracemalloc', action='store_true', help='Python-Heap messen (langsamer)')
+    parser.add_argument('--json', default=None, help='Bericht zusätzlich als JSON speichern')
+    parser.add_argument('--verbose', action='store_true', help='Log-Ausgaben des Bots anzeigen')
+    args = parser.parse_args(argv)
+
+    out = sys.stdout
+    print(
+        f"🧪 Simuliere {args.duration:.0f}s mit {args.mention_rate}/s Mentions und {args.dm_rate}/s DMs...",
+        file=out
+    )
+    report = run_simulation(args, out)
+    print_report(report, out)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Bericht gespeichert: {args.json}", file=out)
+
+    return 0 if report['unanswered'] == 0 and report['duplicate_replies'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
@@ -0,0 +1,60 @@
+"""
+Kleiner persistenter Key-Value-Speicher für Bot-Zustand
+
+Hält Werte wie Cursor und Zeitstempel über Neustarts hinweg (SQLite in
+DATA_DIR). Werte werden als JSON gespeichert.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+
+class StateStore:
+    """
+    SQLite-basierter Key-Value-Speicher
+
+    Args:
+        path: Pfad der SQLite-Datei
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        ''')
+        self._db.commit()
+
+    def get(self, key, default=None):
+        """Liest einen Wert (default wenn nicht vorhanden)"""
+        with self._lock:
+            row = self._db.execute('SELECT value FROM state WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Schreibt einen Wert (sofort persistiert)"""
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)',
+                (key, json.dumps(value))
+            )
+            self._db.commit()
+
+    def delete(self, key):
+        """Entfernt einen Wert"""
+        with self._lock:
+            self._db.execute('DELETE FROM state WHERE key = ?', (key,))
+            self._db.commit()
@@ -0,0 +1,152 @@
+"""
+Push-basierte Ingestion über einen Jetstream-Websocket
+
+Statt alle CHECK_INTERVAL Sekunden Notifications zu pollen, abonniert der
+Bot den Jetstream-Eventstrom für Posts (app.bsky.feed.post) und erkennt
+Mentions direkt an den Facets (app.bsky.richtext.facet#mention mit der DID
+des Bots) sowie optional Replies auf Posts des Bots.
+
+Jetstream kann nicht serverseitig nach erwähnten DIDs filtern (wantedDids
+filtert nach Autor), deshalb wird clientseitig gefiltert.
+
+Bei Verbindungsabbruch wird mit exponentiellem Backoff neu verbunden und
+ab dem letzten Cursor (time_us) fortgesetzt - ein paar Sekunden
+zurückgespult, damit an der Abbruchstelle nichts verloren geht.
+"""
+
+import json
+import time
+from urllib.parse import urlencode
+
+JETSTREAM_URL = 'wss://jetstream2.us-east.bsky.network/subscribe'
+POST_COLLECTION = 'app.bsky.feed.post'
+MENTION_FEATURE = 'app.bsky.richtext.facet#mention'
+
+
+def parse_event(event, bot_did, include_replies=False):
+    """
+    Prüft ein Jetstream-Event auf eine Mention des Bots
+
+    Args:
+        event: Dekodiertes Event (Dict)
+        bot_did: DID des Bots
+        include_replies: Auch Replies auf Posts des Bots liefern
+
+    Returns:
+        Dict mit did, uri, cid, record (JSON), time_us, reason
+        oder None wenn das Event den Bot nicht betrifft
+    """
+    if event.get('kind') != 'commit':
+        return None
+
+    commit = event.get('commit', {})
+    if commit.get('operation') != 'create' or commit.get('collection') != POST_COLLECTION:
+        return None
+
+    # Eigene Posts ignorieren
+    if event.get('did') == bot_did:
+        return None
+
+    record = commit.get('record') or {}
+    reason = None
+
+    for facet in record.get('facets') or []:
+        for feature in facet.get('features') or []:
+            if feature.get('$type') == MENTION_FEATURE and feature.get('did') == bot_did:
+                reason = 'mention'
+
+    if reason is None and include_replies:
+        parent_uri = ((record.get('reply') or {}).get('parent') or {}).get('uri', '')
+        if parent_uri.startswith(f"at://{bot_did}/"):
+            reason = 'reply'
+
+    if reason is None:
+        return None
+
+    return {
+        'did': event['did'],
+        'uri': f"at://{event['did']}/{POST_COLLECTION}/{commit['rkey']}",
+        'cid': commit.get('cid'),
+        'record': record,
+        'time_us': event.get('time_us'),
+        'reason': reason
+    }
+
+
+class JetstreamSubscriber:
+    """
+    Websocket-Abo auf Jetstream mit Reconnect und Cursor-Resume
+
+    Args:
+        bot_did: DID des Bots
+        url: Jetstream-Endpunkt
+        cursor: Startposition (time_us), None = ab jetzt
+        include_replies: Auch Replies auf Posts des Bots liefern
+        rewind_seconds: Wie weit beim Reconnect zurückgespult wird
+        max_backoff: Max. Wartezeit zwischen Reconnect-Versuchen (Sekunden)
+        checkpoint: Optional Funktion cursor -> None zum Persistieren
+        checkpoint_interval: Sekunden zwischen zwei Checkpoints
+    """
+
+    def __init__(self, bot_did, url=JETSTREAM_URL, cursor=None, include_replies=False,
+                 rewind_seconds=5, max_backoff=60, checkpoint=None, checkpoint_interval=5):
+        self.bot_did = bot_did
+        self.url = url
+        self.cursor = cursor
+        self.include_replies = include_replies
+        self.rewind_seconds = rewind_seconds
+        self.max_backoff = max_backoff
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.events_seen = 0
+        self.reconnects = 0
+
+    def _subscribe_url(self):
+        params = [('wantedCollections', POST_COLLECTION)]
+        if self.cursor:
+            params.append(('cursor', str(self.cursor - self.rewind_seconds * 1_000_000)))
+        return f"{self.url}?{urlencode(params)}"
+
+    def events(self):
+        """
+        Liefert passende Events (Generator, läuft bis zum Abbruch)
+
+        self.cursor zeigt danach immer auf das zuletzt gelesene Event.
+        """
+        from websockets.sync.client import connect
+
+        backoff = 1
+        last_checkpoint = time.monotonic()
+
+        while True:
+            try:
+                with connect(self._subscribe_url(), max_size=2 ** 22, open_timeout=10) as websocket:
+                    print(f"🔌 Verbunden mit {self.url}")
+                    backoff = 1
+
+                    for message in websocket:
+                        self.events_seen += 1
+                        event = json.loads(message)
+
+                        if event.get('time_us'):
+                            self.cursor = event['time_us']
+
+                        # Cursor regelmässig sichern (auch wenn nichts für den Bot dabei ist)
+                        if self.checkpoint and time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                            self.checkpoint(self.cursor)
+                            last_checkpoint = time.monotonic()
+
+                        match = parse_event(event, self.bot_did, self.include_replies)
+
+                        if match:
+                            yield match
+
+            except GeneratorExit:
+                raise
+            except Exception as e:
+                print(f"⚠️ Stream-Verbindung unterbrochen: {e}")
+
+            self.reconnects += 1
+            print(f"🔄 Neuer Verbindungsversuch in {backoff}s (Cursor: {self.cursor})")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
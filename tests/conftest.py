@@ -0,0 +1,12 @@
+"""
+Gemeinsame Einstellungen für die Tests
+
+Die Module liegen flach im Projektverzeichnis (kein Paket) - wie in
+benchmarks/run.py wird es deshalb vorne in den Suchpfad gesetzt.
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
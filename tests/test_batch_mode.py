@@ -0,0 +1,129 @@
+"""
+BatchRunner gegen den lokalen Batch-Endpunkt (FakeAnthropicServer)
+"""
+
+import threading
+from types import SimpleNamespace
+
+import anthropic
+import pytest
+
+from batch_mode import STORE_KEY, BatchRunner
+from fakes import FakeAnthropicServer
+from state_store import StateStore
+from work_queue import WorkQueue
+
+
+def make_job(key, text):
+    return {'key': key, 'text': text}
+
+
+def build_params(job):
+    return {'max_tokens': 100, 'messages': [{'role': 'user', 'content': job['text']}]}
+
+
+class Poster:
+    """on_result-Callback: "postet" jede Antwort und merkt sich alle Ergebnisse"""
+
+    def __init__(self):
+        self.results = {}
+        self.posted = []
+        self._lock = threading.Lock()
+
+    def __call__(self, job, text):
+        with self._lock:
+            assert job['key'] not in self.results, f"{job['key']} doppelt geliefert"
+            self.results[job['key']] = text
+            if text:
+                self.posted.append((job['key'], text))
+
+
+def start_server(**kwargs):
+    kwargs.setdefault('batch_delay', 0.3)
+    return FakeAnthropicServer(**kwargs).start()
+
+
+def make_runner(server, on_result, **kwargs):
+    claude = SimpleNamespace(
+        model='claude-test',
+        client=anthropic.Anthropic(api_key='test', base_url=server.base_url, max_retries=0)
+    )
+    kwargs.setdefault('poll_interval', 0.05)
+    return BatchRunner(claude, build_params=build_params, on_result=on_result,
+                       job_key=lambda job: job['key'], **kwargs)
+
+
+@pytest.fixture
+def server():
+    server = start_server()
+    yield server
+    server.stop()
+
+
+def test_submit_polls_and_posts_succeeded_results(server):
+    poster = Poster()
+    runner = make_runner(server, poster, chunk_size=2)
+    jobs = [make_job('a', 'Erste Frage'), make_job('b', 'Zweite Frage'), make_job('c', 'Dritte Frage')]
+
+    assert runner.submit(jobs) == 3
+    assert len(server.batches) == 2  # in Batches zu je chunk_size aufgeteilt
+    assert runner.pending_keys() == {'a', 'b', 'c'}
+
+    # Noch laufend → nicht nochmal eingereicht
+    assert runner.submit(jobs[:1]) == 0
+    assert len(server.batches) == 2
+
+    assert runner.wait(timeout=10)
+    assert runner.pending_count() == 0
+    assert sorted(key for key, _ in poster.posted) == ['a', 'b', 'c']
+    assert poster.results['a'].startswith('Danke für deine Nachricht')
+
+
+def test_errored_and_expired_results_are_delivered_as_failed():
+    outcomes = {'job-0': 'succeeded', 'job-1': 'errored', 'job-2': 'expired'}
+    server = start_server(outcome=outcomes.get)
+    try:
+        poster = Poster()
+        runner = make_runner(server, poster)
+        runner.submit([make_job('ok', 'Frage'), make_job('error', 'Frage'), make_job('late', 'Frage')])
+
+        assert runner.wait(timeout=10)
+        assert poster.results['error'] is None
+        assert poster.results['late'] is None
+        assert [key for key, _ in poster.posted] == ['ok']
+    finally:
+        server.stop()
+
+
+def test_restart_resumes_pending_batch_instead_of_reprocessing(server, tmp_path):
+    store = StateStore(str(tmp_path / 'state.sqlite3'))
+    work_queue = WorkQueue(str(tmp_path / 'work_queue.sqlite3'))
+    jobs = [make_job('a', 'Frage A'), make_job('b', 'Frage B'), make_job('c', 'Frage C')]
+    for job in jobs:
+        work_queue.enqueue(job['key'], 'mention', job)
+
+    # Erster Prozess reicht a und b ein und "stürzt ab" bevor der Batch fertig ist
+    # (erster Poll sieht in_progress, danach schläft der Poll-Thread)
+    before = Poster()
+    crashed = make_runner(server, before, store=store, poll_interval=60)
+    crashed.submit(jobs[:2])
+    assert set(store.get(STORE_KEY)[next(iter(server.batches))].values()) == {'a', 'b'}
+
+    # Neuer Prozess: ohne resume wüsste der Runner nichts vom laufenden Batch
+    after = Poster()
+    runner = make_runner(server, after, store=store,
+                         load_job=lambda key: work_queue.load(key)[1])
+    assert runner.pending_keys() == set()
+
+    assert runner.resume() == 2
+    assert runner.pending_keys() == {'a', 'b'}
+
+    # Die Warteschlange liefert nur noch den Job, der in keinem Batch steckt
+    claimed = work_queue.claim_pending('mention', skip=runner.pending_keys())
+    assert [key for key, _, _ in claimed] == ['c']
+
+    assert runner.wait(timeout=10)
+    assert sorted(key for key, _ in after.posted) == ['a', 'b']
+    assert before.results == {}
+    assert len(server.batches) == 1  # nichts neu eingereicht
+    assert store.get(STORE_KEY) is None
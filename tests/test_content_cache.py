@@ -0,0 +1,142 @@
+"""
+ContentCache: kanonische URLs, TTL mit Revalidierung und LRU-Verdrängung
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import content_cache
+from content_cache import ContentCache, canonical_url
+
+
+class Clock:
+    """Ersetzt time.time im Modul - Zeit läuft nur per advance()"""
+
+    def __init__(self):
+        self.now = 1_800_000_000.0
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(content_cache, 'time', SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def make_cache(tmp_path, clock):
+    def make(**kwargs):
+        return ContentCache(str(tmp_path / 'content_cache.sqlite3'), **kwargs)
+    return make
+
+
+# --- canonical_url ------------------------------------------------------------
+
+@pytest.mark.parametrize('url, expected', [
+    ('HTTPS://Example.ORG/Artikel', 'https://example.org/Artikel'),
+    ('https://example.org:443/a', 'https://example.org/a'),
+    ('http://example.org:80/a', 'http://example.org/a'),
+    ('http://example.org:8080/a', 'http://example.org:8080/a'),
+    ('https://example.org', 'https://example.org/'),
+    ('https://example.org/a#abschnitt', 'https://example.org/a'),
+    ('https://example.org/a?utm_source=x&b=2&fbclid=y&a=1', 'https://example.org/a?a=1&b=2'),
+    ('https://example.org/a?UTM_Medium=x&GCLID=y', 'https://example.org/a'),
+    ('  https://example.org/a?leer=  ', 'https://example.org/a?leer='),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_variants_share_one_entry(make_cache):
+    cache = make_cache()
+    cache.put('https://Example.org/a?utm_campaign=x#oben', 'Inhalt')
+
+    assert cache.get('https://example.org/a') == 'Inhalt'
+    assert cache.stats()['entries'] == 1
+
+
+# --- TTL und Revalidierung ----------------------------------------------------
+
+def test_entry_expires_after_ttl(make_cache, clock):
+    cache = make_cache(ttl=100)
+    cache.put('https://example.org/a', 'Inhalt')
+
+    clock.advance(100)
+    assert cache.get('https://example.org/a') == 'Inhalt'
+    clock.advance(1)
+    assert cache.get('https://example.org/a') is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_stale_entry_with_validators_can_be_revalidated(make_cache, clock):
+    cache = make_cache(ttl=100, max_stale=1000)
+    cache.put('https://example.org/a', 'Inhalt', etag='"v1"', last_modified='Mon, 05 Jan 2026 10:00:00 GMT')
+
+    clock.advance(500)
+    assert cache.get('https://example.org/a') is None
+    assert cache.get_stale('https://example.org/a') == {
+        'content': 'Inhalt', 'etag': '"v1"', 'last_modified': 'Mon, 05 Jan 2026 10:00:00 GMT'
+    }
+
+    # 304 → wieder frisch für eine volle TTL
+    cache.refresh('https://example.org/a')
+    clock.advance(100)
+    assert cache.get('https://example.org/a') == 'Inhalt'
+    assert cache.stats()['revalidated'] == 1
+
+
+def test_expired_entries_are_evicted_unless_kept_for_revalidation(make_cache, clock):
+    cache = make_cache(ttl=100, max_stale=1000)
+    cache.put('https://example.org/plain', 'ohne Validator')
+    cache.put('https://example.org/etag', 'mit Validator', etag='"v1"')
+    assert cache.get_stale('https://example.org/plain') is None
+
+    clock.advance(101)
+    cache.put('https://example.org/other', 'x')  # Aufräumen läuft beim Schreiben
+    assert cache.stats()['entries'] == 2
+    assert cache.get_stale('https://example.org/etag')['content'] == 'mit Validator'
+
+    clock.advance(1000)
+    cache.put('https://example.org/other', 'x')
+    assert cache.get_stale('https://example.org/etag') is None
+
+
+# --- LRU ----------------------------------------------------------------------
+
+def test_least_recently_used_entries_are_evicted_first(make_cache, clock):
+    cache = make_cache(max_bytes=30)
+    for name in 'abc':
+        cache.put(f'https://example.org/{name}', name * 10)
+        clock.advance(1)
+
+    # a wird gelesen → b ist jetzt am längsten ungenutzt
+    assert cache.get('https://example.org/a') == 'a' * 10
+    clock.advance(1)
+    cache.put('https://example.org/d', 'd' * 10)
+
+    assert cache.get('https://example.org/b') is None
+    for name in 'acd':
+        assert cache.get(f'https://example.org/{name}') == name * 10
+    assert cache.stats()['bytes'] == 30
+
+
+def test_size_counts_utf8_bytes(make_cache, clock):
+    cache = make_cache(max_bytes=10)
+    cache.put('https://example.org/a', 'ä' * 4)  # 8 Bytes
+    clock.advance(1)
+    cache.put('https://example.org/b', 'ö' * 2)  # 4 Bytes → zusammen zu gross
+
+    assert cache.get('https://example.org/a') is None
+    assert cache.stats()['bytes'] == 4
+
+
+def test_entries_survive_restart(make_cache):
+    make_cache().put('https://example.org/a', 'Inhalt')
+    assert make_cache().get('https://example.org/a') == 'Inhalt'
@@ -0,0 +1,162 @@
+"""
+Mentions über listNotifications: High-Water-Mark, Burst mit gespeichertem Cursor und Neustart
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def timestamp(seconds):
+    return (START + timedelta(seconds=seconds)).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class FakeNotifications:
+    """
+    listNotifications/updateSeen wie app.bsky.notification (neueste zuerst)
+
+    Der Cursor ist die laufende Nummer der letzten gelieferten Notification -
+    neue Notifications oben verschieben ihn nicht.
+    """
+
+    def __init__(self):
+        self.items = []  # älteste zuerst
+        self.seen_at = None
+
+    def add(self, seconds, name):
+        self.items.append(SimpleNamespace(
+            seq=len(self.items),
+            uri=f"at://did:plc:someuser/app.bsky.feed.post/{name}",
+            cid=f"bafyrei{name}",
+            reason='mention',
+            indexed_at=timestamp(seconds),
+            author=SimpleNamespace(handle='someuser.bsky.social'),
+            record=SimpleNamespace(text=f"@sagemate {name}")
+        ))
+
+    def list_notifications(self, params):
+        before = int(params['cursor']) if params.get('cursor') else len(self.items)
+        page = [item for item in reversed(self.items) if item.seq < before][:params['limit']]
+        for item in page:
+            item.is_read = self.seen_at is not None and main.parse_timestamp(item.indexed_at) <= self.seen_at
+        cursor = str(page[-1].seq) if page and page[-1].seq > 0 else None
+        return SimpleNamespace(notifications=page, cursor=cursor)
+
+    def update_seen(self, data):
+        self.seen_at = main.parse_timestamp(data['seen_at'])
+
+    def unseen(self):
+        return [item.uri for item in self.items
+                if self.seen_at is None or main.parse_timestamp(item.indexed_at) > self.seen_at]
+
+
+def client_for(notifications):
+    """Neuer Client pro Lauf (wie nach einem Neustart)"""
+    return SimpleNamespace(app=SimpleNamespace(bsky=SimpleNamespace(notification=notifications)))
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(main, '_state_store', None)
+    monkeypatch.setattr(main, 'NOTIFICATION_PAGE_SIZE', 3)
+    monkeypatch.setattr(main, 'NOTIFICATION_MAX_PAGES', 2)
+    return SimpleNamespace(notifications=FakeNotifications(), processed=[])
+
+
+def poll(bot):
+    """
+    Ein Zyklus wie process_all_mentions: lesen, verarbeiten, Marke fortschreiben
+
+    Jeder Zyklus läuft wie nach einem Neustart (Zustand nur aus der SQLite-Datei).
+    """
+    main._state_store = None
+    client = client_for(bot.notifications)
+    mentions = main.get_recent_mentions(client)
+    bot.processed.extend(mention['uri'] for mention in mentions)
+    main.advance_notification_hwm(client)
+    return [mention['uri'] for mention in mentions]
+
+
+def assert_each_processed_once(bot):
+    uris = [item.uri for item in bot.notifications.items]
+    assert sorted(bot.processed) == sorted(uris)
+    assert len(bot.processed) == len(set(bot.processed))
+
+
+def test_steady_state_reads_only_new_mentions(bot):
+    bot.notifications.add(0, 'first')
+    assert poll(bot) == [bot.notifications.items[0].uri]
+
+    assert poll(bot) == []
+    bot.notifications.add(10, 'second')
+    assert poll(bot) == [bot.notifications.items[1].uri]
+    assert bot.notifications.unseen() == []
+
+
+def test_burst_over_page_limit_is_read_across_restarts(bot):
+    bot.notifications.add(0, 'before')
+    poll(bot)
+
+    # 14 Mentions: mehr als 2 Seiten à 3 pro Zyklus
+    for i in range(1, 15):
+        bot.notifications.add(i, f'burst{i}')
+
+    first = poll(bot)
+    assert len(first) == 6
+    # Marke und "gesehen" bleiben unter den ungelesenen Seiten
+    assert len(bot.notifications.unseen()) == 14
+
+    # Während des Backfills kommen neue Mentions oben dazu
+    bot.notifications.add(20, 'during1')
+    second = poll(bot)
+    bot.notifications.add(21, 'during2')
+
+    for _ in range(5):
+        poll(bot)
+
+    assert_each_processed_once(bot)
+    # Der Backfill liest zuerst die älteren Seiten weiter, die neue Mention danach
+    assert second and bot.notifications.items[-2].uri not in second
+    assert bot.notifications.unseen() == []
+    assert main.get_state_store().get('notifications_backfill') is None
+
+
+def test_same_timestamp_at_page_boundary(bot):
+    bot.notifications.add(0, 'before')
+    poll(bot)
+
+    # Gleicher indexedAt über eine Seitengrenze und an der Marke
+    for i in range(8):
+        bot.notifications.add(5 + i // 4, f'same{i}')
+    for _ in range(4):
+        poll(bot)
+    bot.notifications.add(6, 'late_same')  # gleicher Zeitstempel wie die Marke, aber neu
+    poll(bot)
+    poll(bot)
+
+    assert_each_processed_once(bot)
+
+
+def test_crash_before_advancing_rereads_instead_of_skipping(bot):
+    bot.notifications.add(0, 'before')
+    poll(bot)
+    for i in range(1, 10):
+        bot.notifications.add(i, f'burst{i}')
+
+    # Absturz nach dem Lesen, vor advance_notification_hwm
+    main._state_store = None
+    lost = [mention['uri'] for mention in main.get_recent_mentions(client_for(bot.notifications))]
+    assert lost
+
+    again = poll(bot)
+    assert again == lost  # nochmal geliefert (die Warteschlange erkennt die Duplikate)
+
+    for _ in range(3):
+        poll(bot)
+    assert_each_processed_once(bot)
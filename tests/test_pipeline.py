@@ -0,0 +1,114 @@
+"""
+Pipeline: Stop-Signal über alle Stufen, Backpressure durch begrenzte Queues
+"""
+
+import threading
+import time
+
+from pipeline import Pipeline, Stage
+
+
+def run_in_thread(pipeline, jobs, **kwargs):
+    """Startet pipeline.run im Hintergrund - hängt ein Stop-Signal, fällt der join-Timeout auf"""
+    outcome = {}
+
+    def run():
+        outcome['results'] = pipeline.run(jobs, **kwargs)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def finish(thread, outcome, timeout=5):
+    thread.join(timeout)
+    assert not thread.is_alive(), 'Pipeline hat nicht beendet (Stop-Signal verloren?)'
+    return outcome['results']
+
+
+def test_all_jobs_pass_all_stages_with_several_workers():
+    pipeline = Pipeline([
+        Stage('double', lambda job: job * 2, workers=3),
+        Stage('inc', lambda job: job + 1, workers=2),
+        Stage('keep', lambda job: job, workers=4),
+    ], queue_size=2)
+
+    results = finish(*run_in_thread(pipeline, range(50)))
+
+    assert sorted(results) == [n * 2 + 1 for n in range(50)]
+    assert [stage.processed for stage in pipeline.stages] == [50, 50, 50]
+
+
+def test_stop_reaches_later_stages_when_nothing_gets_through():
+    def fail(job):
+        if job % 2:
+            raise ValueError('kaputt')
+        return None
+
+    pipeline = Pipeline([
+        Stage('filter', fail, workers=3),
+        Stage('never', lambda job: job, workers=3),
+    ])
+
+    assert finish(*run_in_thread(pipeline, range(10))) == []
+    assert pipeline.stages[0].failed == 5
+    assert pipeline.stages[0].dropped == 5
+    assert pipeline.stages[1].processed == 0
+
+
+def test_empty_input_stops_every_stage():
+    pipeline = Pipeline([Stage(f's{i}', lambda job: job, workers=i + 1) for i in range(4)])
+    assert finish(*run_in_thread(pipeline, [])) == []
+
+
+def test_bounded_queues_stop_reading_input_when_the_last_stage_is_blocked():
+    release = threading.Event()
+    produced = []
+
+    def jobs():
+        for n in range(100):
+            produced.append(n)
+            yield n
+
+    def blocked(job):
+        release.wait()
+        return job
+
+    pipeline = Pipeline([
+        Stage('first', lambda job: job),
+        Stage('second', lambda job: job),
+        Stage('last', blocked),
+    ], queue_size=2)
+    thread, outcome = run_in_thread(pipeline, jobs())
+
+    time.sleep(0.3)
+    # Je Stufe höchstens Queue + ein Job in Arbeit, dazu der Job vor dem vollen put
+    assert len(produced) <= 3 * (2 + 1) + 1
+
+    release.set()
+    assert len(finish(thread, outcome)) == 100
+
+
+def test_on_result_instead_of_collecting():
+    seen = []
+    pipeline = Pipeline([Stage('keep', lambda job: job, workers=2)])
+
+    def on_result(job):
+        if job == 3:
+            raise RuntimeError('Callback kaputt')
+        seen.append(job)
+
+    assert finish(*run_in_thread(pipeline, range(6), on_result=on_result)) == []
+    assert sorted(seen) == [0, 1, 2, 4, 5]
+
+
+def test_observer_sees_every_outcome():
+    events = []
+    pipeline = Pipeline(
+        [Stage('only', lambda job: None if job == 1 else 1 / job)],
+        observer=lambda name, outcome, seconds: events.append((name, outcome))
+    )
+
+    finish(*run_in_thread(pipeline, [0, 1, 2]))
+
+    assert sorted(events) == [('only', 'failed'), ('only', 'processed'), ('only', 'skipped')]
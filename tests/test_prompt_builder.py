@@ -0,0 +1,174 @@
+"""
+Prompt-Aufbau: Cache-Breakpoints, Packen ins Token-Budget und Kalibrierung
+"""
+
+import main
+from prompt_builder import CHARS_PER_TOKEN, ITEM_OVERHEAD_TOKENS, PromptBuilder, TokenEstimator
+
+
+def packed_prompt(posts=3, urls=None):
+    return {
+        'posts': [(i, {'author': f'user{i}', 'text': f'Post {i}'}) for i in range(1, posts + 1)],
+        'omitted_posts': 0,
+        'url_contents': urls or {},
+        'mention': 'Was meinst du?'
+    }
+
+
+def cached_texts(content):
+    return [block['text'] for block in content if 'cache_control' in block]
+
+
+# --- build_prompt_content -----------------------------------------------------
+
+def test_breakpoint_after_older_posts_and_after_urls():
+    content = main.build_prompt_content(packed_prompt(urls={'https://example.org': 'Auszug'}))
+
+    assert cached_texts(content) == ['2. @user2: Post 2', content[2]['text']]
+    assert content[2]['text'].startswith('VERLINKTE WEBSEITEN-INHALTE:')
+    assert 'cache_control' not in content[-1]
+
+
+def test_older_posts_prefix_is_the_same_with_other_urls():
+    first = main.build_prompt_content(packed_prompt(urls={'https://example.org/a': 'A'}))
+    second = main.build_prompt_content(packed_prompt(urls={'https://example.org/b': 'B'}))
+
+    assert first[:2] == second[:2]
+
+
+def test_single_post_only_caches_urls():
+    content = main.build_prompt_content(packed_prompt(posts=1, urls={'https://example.org': 'Auszug'}))
+    assert len(cached_texts(content)) == 1
+    assert cached_texts(content)[0].startswith('VERLINKTE WEBSEITEN-INHALTE:')
+
+    assert cached_texts(main.build_prompt_content(packed_prompt(posts=1))) == []
+
+
+# --- PromptBuilder.pack -------------------------------------------------------
+
+def post(author, length):
+    return {'author': author, 'text': 'x' * length}
+
+
+def post_tokens(estimator, item):
+    return estimator.count(f"@{item['author']}: {item['text']}") + ITEM_OVERHEAD_TOKENS
+
+
+def make_builder(budget, **kwargs):
+    # 1 Zeichen pro Token: Schätzung = Länge + 1
+    return PromptBuilder(budget=budget, estimator=TokenEstimator(chars_per_token=1.0), **kwargs)
+
+
+def positions(packed):
+    return [position for position, _ in packed['posts']]
+
+
+def dropped(packed, part):
+    return [item['label'] for item in packed['dropped'] if item['part'] == part]
+
+
+THREAD = [post('a', 40), post('b', 40), post('c', 40), post('d', 40), post('e', 40)]
+MENTION = 'm' * 29  # 30 Tokens
+
+
+def thread_tokens(builder, posts=THREAD):
+    return sum(post_tokens(builder.estimator, item) for item in posts)
+
+
+def test_everything_fits_exactly_at_budget():
+    builder = make_builder(0)
+    builder.budget = 100 + 30 + thread_tokens(builder)
+
+    packed = builder.pack(MENTION, THREAD, reserved_tokens=100)
+
+    assert positions(packed) == [1, 2, 3, 4, 5]
+    assert packed['tokens'] == packed['budget']
+    assert packed['dropped'] == [] and packed['truncated'] == []
+
+
+def test_one_token_over_budget_drops_the_oldest_post():
+    builder = make_builder(0)
+    builder.budget = 100 + 30 + thread_tokens(builder) - 1
+
+    packed = builder.pack(MENTION, THREAD, reserved_tokens=100)
+
+    assert positions(packed) == [2, 3, 4, 5]
+    assert packed['omitted_posts'] == 1
+    assert dropped(packed, 'post') == ['#1 @a']
+    assert packed['tokens'] <= packed['budget']
+
+
+def test_no_gap_when_an_older_post_would_still_fit():
+    builder = make_builder(0, nearest_posts=1)
+    thread = [post('a', 1), post('b', 200), post('c', 40)]
+    builder.budget = 30 + post_tokens(builder.estimator, thread[2]) + post_tokens(builder.estimator, thread[0])
+
+    packed = builder.pack(MENTION, thread)
+
+    # b passt nicht → auch das kurze a fällt weg
+    assert positions(packed) == [3]
+    assert dropped(packed, 'post') == ['#1 @a', '#2 @b']
+
+
+def test_urls_come_before_older_posts_but_after_nearest():
+    builder = make_builder(0, nearest_posts=2, url_max_tokens=150, min_excerpt_tokens=20)
+    urls = {'https://example.org': 'w ' * 100}  # 201 Tokens
+    nearest = thread_tokens(builder, THREAD[-2:])
+    builder.budget = 30 + nearest + 150 + ITEM_OVERHEAD_TOKENS
+
+    packed = builder.pack(MENTION, THREAD, urls)
+
+    assert positions(packed) == [4, 5]
+    assert list(packed['url_contents']) == ['https://example.org']
+    assert [item['label'] for item in packed['truncated']] == ['https://example.org']
+    assert dropped(packed, 'post') == ['#1 @a', '#2 @b', '#3 @c']
+    assert packed['tokens'] <= packed['budget']
+
+
+def test_url_dropped_before_nearest_posts():
+    builder = make_builder(0, nearest_posts=2, min_excerpt_tokens=80)
+    nearest = thread_tokens(builder, THREAD[-2:])
+    builder.budget = 30 + nearest + 50  # zu wenig für einen sinnvollen Auszug
+
+    packed = builder.pack(MENTION, THREAD, {'https://example.org': 'w ' * 100})
+
+    assert positions(packed) == [4, 5]
+    assert packed['url_contents'] == {}
+    assert dropped(packed, 'url') == ['https://example.org']
+
+
+def test_mention_is_truncated_last():
+    builder = make_builder(200, min_excerpt_tokens=80)
+
+    packed = builder.pack('wort ' * 100, THREAD, {'https://example.org': 'inhalt'})
+
+    assert packed['posts'] == [] and packed['url_contents'] == {}
+    assert packed['mention'].endswith(' …')
+    assert [item['part'] for item in packed['truncated']] == ['mention']
+
+
+def test_pack_is_byte_stable_while_calibration_stays_within_a_step():
+    estimator = TokenEstimator()
+    builder = PromptBuilder(budget=400, estimator=estimator, min_excerpt_tokens=20)
+    urls = {'https://example.org': 'Satz mit Inhalt. ' * 200}
+    before = builder.pack(MENTION, THREAD, urls)
+
+    # Echte Antworten mit leicht schwankendem Verhältnis (3.4-3.6 Zeichen/Token)
+    for tokens in (1000, 1030, 980, 1010, 990):
+        estimator.observe(3500, tokens)
+
+    assert estimator.calibrated != CHARS_PER_TOKEN
+    assert estimator.chars_per_token == CHARS_PER_TOKEN
+    assert builder.pack(MENTION, THREAD, urls) == before
+
+
+def test_calibration_switches_in_whole_steps():
+    estimator = TokenEstimator(step=0.25)
+
+    # Deutlich mehr Zeichen pro Token → der Mittelwert wandert über eine Stufe
+    for _ in range(10):
+        estimator.observe(4500, 1000)
+
+    assert estimator.chars_per_token != CHARS_PER_TOKEN
+    assert (estimator.chars_per_token / 0.25).is_integer()
+    assert abs(estimator.chars_per_token - estimator.calibrated) < 0.25
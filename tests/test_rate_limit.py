@@ -0,0 +1,188 @@
+"""
+RateLimiter: Token-Bucket, Rate-Limit-Header und 429-Wiederholung in limit_client
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import rate_limit
+from rate_limit import RateLimiter, anthropic_rate_limit, atproto_rate_limit, limit_client
+
+NOW = 1_800_000_000.0
+
+
+class Clock:
+    """Ersetzt time.time/time.sleep im Modul - sleep lässt nur die Zeit vorrücken"""
+
+    def __init__(self):
+        self.now = NOW
+        self.slept = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, 'time', SimpleNamespace(time=clock.time, sleep=clock.sleep))
+    return clock
+
+
+# --- Token-Bucket -------------------------------------------------------------
+
+def test_burst_then_one_call_per_refill(clock):
+    limiter = RateLimiter('Test', per_minute=60, burst=3)
+
+    for _ in range(3):
+        assert limiter.acquire() == 0
+
+    # Bucket leer: 1 Token pro Sekunde
+    assert limiter.acquire() == pytest.approx(1.0)
+    assert limiter.acquire() == pytest.approx(1.0)
+    assert limiter.calls == 5
+    assert clock.slept == pytest.approx(2.0)
+
+
+def test_bucket_refills_up_to_burst(clock):
+    limiter = RateLimiter('Test', per_minute=120, burst=2)
+    limiter.acquire()
+    limiter.acquire()
+    assert limiter.min_delay() == pytest.approx(0.5)
+
+    clock.sleep(60)
+    assert limiter.headroom()['tokens'] == 2
+    for _ in range(2):
+        assert limiter.acquire() == 0
+    assert limiter.min_delay() > 0
+
+
+# --- observe() ----------------------------------------------------------------
+
+def test_observe_spreads_reserve_until_reset(clock):
+    limiter = RateLimiter('Test', per_minute=6000, burst=100, reserve=0.1)
+
+    # Noch 10 von 100 Calls, Reset in 50 Sekunden → ein Call alle 5 Sekunden
+    limiter.observe(**atproto_rate_limit({
+        'RateLimit-Limit': '100', 'RateLimit-Remaining': '10', 'RateLimit-Reset': str(NOW + 50)
+    }))
+
+    assert limiter.acquire() == 0
+    assert limiter.min_delay() == pytest.approx(5.0)
+
+    # Genug Luft → keine Bremse
+    limiter.observe(remaining=50)
+    assert limiter.min_delay() == 0
+
+
+def test_exhausted_limit_blocks_until_reset(clock):
+    limiter = RateLimiter('Test', per_minute=600, burst=10)
+    limiter.observe(limit=100, remaining=0, reset_at=NOW + 30)
+
+    assert limiter.min_delay() == pytest.approx(30.0)
+    assert limiter.acquire() == pytest.approx(30.0)
+
+
+def test_429_with_retry_after(clock):
+    limiter = RateLimiter('Test', per_minute=600, burst=10)
+    limiter.observe(**atproto_rate_limit({'Retry-After': '7'}), status=429)
+
+    assert limiter.throttled == 1
+    assert limiter.min_delay() == pytest.approx(7.0)
+
+
+def test_429_without_any_hint_waits_a_minute(clock):
+    limiter = RateLimiter('Test', per_minute=600, burst=10)
+    limiter.observe(status=429)
+    assert limiter.min_delay() == pytest.approx(60.0)
+
+
+def test_header_parsing():
+    assert atproto_rate_limit({'ratelimit-limit': 'kaputt'}) == {
+        'limit': None, 'remaining': None, 'reset_at': None, 'retry_after': None
+    }
+    assert anthropic_rate_limit({
+        'anthropic-ratelimit-requests-limit': '50',
+        'anthropic-ratelimit-requests-remaining': '49',
+        'anthropic-ratelimit-requests-reset': '2027-01-15T08:00:00Z',
+    }) == {'limit': 50, 'remaining': 49, 'retry_after': None,
+           'reset_at': datetime(2027, 1, 15, 8, tzinfo=timezone.utc).timestamp()}
+
+
+# --- limit_client -------------------------------------------------------------
+
+class RateLimited(Exception):
+    """Wie atproto: Fehler mit .response (status_code, headers)"""
+
+    def __init__(self, status_code, headers):
+        super().__init__(f"HTTP {status_code}")
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class FakeXrpcClient:
+    """_invoke liefert nacheinander die vorgegebenen Antworten bzw. Fehler"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def _invoke(self, *args, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def ok(**headers):
+    return SimpleNamespace(status_code=200, headers=headers, content='ok')
+
+
+def test_limit_client_retries_429_after_waiting(clock):
+    limiter = RateLimiter('Test', per_minute=600, burst=10)
+    client = limit_client(FakeXrpcClient([
+        RateLimited(429, {'retry-after': '3'}),
+        ok(**{'ratelimit-limit': '100', 'ratelimit-remaining': '99', 'ratelimit-reset': str(NOW + 300)}),
+    ]), limiter)
+
+    response = client._invoke('app.bsky.feed.getPostThread')
+
+    assert response.content == 'ok'
+    assert client.calls == 2
+    assert clock.slept == pytest.approx(3.0)
+    assert limiter.throttled == 1
+    assert limiter.remaining == 99
+
+
+def test_limit_client_gives_up_after_retries(clock):
+    limiter = RateLimiter('Test', per_minute=600, burst=10)
+    client = limit_client(FakeXrpcClient([RateLimited(429, {'retry-after': '1'})] * 3), limiter, retries=2)
+
+    with pytest.raises(RateLimited):
+        client._invoke('app.bsky.feed.getPostThread')
+    assert client.calls == 3
+
+
+def test_limit_client_does_not_retry_other_errors(clock):
+    limiter = RateLimiter('Test', per_minute=600, burst=10)
+    client = limit_client(FakeXrpcClient([RateLimited(500, {}), ok()]), limiter)
+
+    with pytest.raises(RateLimited):
+        client._invoke('app.bsky.feed.getPostThread')
+    assert client.calls == 1
+    assert clock.slept == 0
+
+
+def test_limit_client_wraps_only_once(clock):
+    limiter = RateLimiter('Test', per_minute=600, burst=10)
+    client = FakeXrpcClient([ok()])
+
+    assert limit_client(limit_client(client, limiter), limiter) is client
+    client._invoke('app.bsky.actor.getProfile')
+    assert limiter.calls == 1
@@ -0,0 +1,193 @@
+"""
+Jetstream-Ingestion: Event-Filter, Reconnect mit Cursor und URI-Dedup
+"""
+
+import queue
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from fakes import FakeJetstreamServer, jetstream_post_event
+from stream import JetstreamSubscriber, parse_event
+
+BOT_DID = 'did:plc:sagematebot'
+USER_DID = 'did:plc:someuser'
+
+
+def bot_post(rkey):
+    return {'uri': f"at://{BOT_DID}/app.bsky.feed.post/{rkey}", 'cid': 'bafyreibot'}
+
+
+# --- parse_event --------------------------------------------------------------
+
+def test_parse_event_detects_mention_facet():
+    event = jetstream_post_event(USER_DID, 'abc', '@sagemate hallo', mention_did=BOT_DID, time_us=42)
+
+    match = parse_event(event, BOT_DID)
+
+    assert match['reason'] == 'mention'
+    assert match['did'] == USER_DID
+    assert match['uri'] == f"at://{USER_DID}/app.bsky.feed.post/abc"
+    assert match['cid'] == event['commit']['cid']
+    assert match['record']['text'] == '@sagemate hallo'
+    assert match['time_us'] == 42
+
+
+def test_parse_event_ignores_mention_of_other_did():
+    event = jetstream_post_event(USER_DID, 'abc', '@jemand', mention_did='did:plc:jemand')
+    assert parse_event(event, BOT_DID) is None
+
+
+def test_parse_event_reply_only_with_include_replies():
+    event = jetstream_post_event(USER_DID, 'abc', 'Danke!', reply_to=bot_post('root'))
+
+    assert parse_event(event, BOT_DID) is None
+    assert parse_event(event, BOT_DID, include_replies=True)['reason'] == 'reply'
+
+    # Reply auf einen fremden Post
+    other = jetstream_post_event(USER_DID, 'def', 'Danke!', reply_to={
+        'uri': 'at://did:plc:jemand/app.bsky.feed.post/root', 'cid': 'bafyreix'})
+    assert parse_event(other, BOT_DID, include_replies=True) is None
+
+
+def test_parse_event_prefers_mention_over_reply():
+    event = jetstream_post_event(USER_DID, 'abc', '@sagemate', mention_did=BOT_DID, reply_to=bot_post('root'))
+    assert parse_event(event, BOT_DID, include_replies=True)['reason'] == 'mention'
+
+
+def test_parse_event_ignores_own_posts():
+    event = jetstream_post_event(BOT_DID, 'abc', '@sagemate', mention_did=BOT_DID, reply_to=bot_post('root'))
+    assert parse_event(event, BOT_DID, include_replies=True) is None
+
+
+@pytest.mark.parametrize('change', [
+    lambda event: event['commit'].update(operation='delete'),
+    lambda event: event['commit'].update(collection='app.bsky.feed.like'),
+    lambda event: event.update(kind='identity'),
+])
+def test_parse_event_ignores_other_events(change):
+    event = jetstream_post_event(USER_DID, 'abc', '@sagemate', mention_did=BOT_DID)
+    change(event)
+    assert parse_event(event, BOT_DID) is None
+
+
+# --- JetstreamSubscriber ------------------------------------------------------
+
+def consume(subscriber):
+    """Liest subscriber.events() in einem Hintergrund-Thread in eine Queue"""
+    received = queue.Queue()
+
+    def run():
+        for match in subscriber.events():
+            received.put(match)
+
+    threading.Thread(target=run, daemon=True).start()
+    return received
+
+
+def wait_until(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'Zeitüberschreitung'
+        time.sleep(0.02)
+
+
+def mention(rkey, time_us):
+    return jetstream_post_event(USER_DID, rkey, '@sagemate', mention_did=BOT_DID, time_us=time_us)
+
+
+def rkeys(received, count):
+    return [received.get(timeout=10)['uri'].rsplit('/', 1)[1] for _ in range(count)]
+
+
+@pytest.fixture
+def server():
+    server = FakeJetstreamServer().start()
+    yield server
+    server.stop()
+
+
+def test_reconnect_rewinds_and_continues_after_drop(server):
+    subscriber = JetstreamSubscriber(BOT_DID, url=server.url, rewind_seconds=5)
+    received = consume(subscriber)
+
+    wait_until(lambda: server.connections == 1)
+    now = int(time.time() * 1_000_000)
+    server.push(mention('first', now))
+    assert rkeys(received, 1) == ['first']
+    assert subscriber.cursor == now
+
+    server.drop_connections()
+    wait_until(lambda: server.connections == 2)
+    server.push(mention('second', now + 1_000_000))
+
+    # Zurückgespult: das Event an der Abbruchstelle kommt nochmal (Dedup macht stream_jobs)
+    assert rkeys(received, 2) == ['first', 'second']
+    assert subscriber.reconnects == 1
+    assert received.empty()
+
+
+def test_resumes_from_saved_cursor(server):
+    now = int(time.time() * 1_000_000)
+    server.push(mention('old', now - 20_000_000))
+    server.push(mention('rewound', now - 3_000_000))
+    server.push(mention('latest', now))
+
+    # Cursor aus einem früheren Lauf, 5 Sekunden Rückspulen
+    subscriber = JetstreamSubscriber(BOT_DID, url=server.url, cursor=now - 1_000_000, rewind_seconds=5)
+    received = consume(subscriber)
+
+    assert rkeys(received, 2) == ['rewound', 'latest']
+    assert subscriber.cursor == now
+    time.sleep(0.2)
+    assert received.empty()
+
+
+# --- stream_jobs --------------------------------------------------------------
+
+class FakeSubscriber:
+    """Liefert vorgegebene Events wie JetstreamSubscriber.events() und endet dann"""
+
+    def __init__(self, events):
+        self._events = events
+
+    def events(self):
+        yield from self._events
+
+
+def stream_events(*rkeys):
+    return [parse_event(mention(rkey, 1_700_000_000_000_000 + i), BOT_DID) for i, rkey in enumerate(rkeys)]
+
+
+@pytest.fixture
+def client():
+    return SimpleNamespace(get_profile=lambda did: SimpleNamespace(handle='someuser.bsky.social'))
+
+
+def test_stream_jobs_skips_duplicate_uris(client):
+    subscriber = FakeSubscriber(stream_events('one', 'one', 'two', 'one'))
+
+    jobs = list(main.stream_jobs(client, subscriber, dry_run=True))
+
+    assert [job['key'].rsplit('/', 1)[1] for job in jobs] == ['one', 'two']
+    assert jobs[0]['item']['author'] == 'someuser.bsky.social'
+    assert jobs[0]['item']['text'] == '@sagemate'
+
+
+def test_stream_jobs_skips_posts_answered_in_earlier_run(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(main, '_work_queue', None)
+    events = stream_events('answered', 'new')
+
+    work_queue = main.get_work_queue()
+    work_queue.enqueue(events[0]['uri'], 'mention', {})
+    work_queue.set_state(events[0]['uri'], 'posted')
+
+    jobs = list(main.stream_jobs(client, FakeSubscriber(events), dry_run=False))
+
+    assert [job['key'] for job in jobs] == [events[1]['uri']]
+    assert jobs[0]['queued']
+    assert work_queue.state(events[1]['uri']) == 'fetched'
@@ -0,0 +1,104 @@
+"""
+ThreadCache: Vorfahren-Index, Single-Flight und Anhängen an gecachte Parents
+"""
+
+from types import SimpleNamespace
+
+from thread_cache import ThreadCache
+
+
+class FakeThreadClient:
+    """
+    get_post_thread über eine lineare Kette post-0 (Thread-Anfang) ... post-n
+
+    Liefert wie die API höchstens parent_height Vorfahren und zählt die Aufrufe.
+    """
+
+    def __init__(self, length):
+        self.parents = {uri(i): uri(i - 1) if i else None for i in range(length)}
+        self.calls = []
+
+    def get_post_thread(self, uri, depth, parent_height):
+        self.calls.append((uri, parent_height))
+        return SimpleNamespace(thread=self._node(uri, parent_height))
+
+    def _node(self, post_uri, parent_height):
+        parent_uri = self.parents[post_uri]
+        parent = None
+        if parent_uri and parent_height > 0:
+            parent = self._node(parent_uri, parent_height - 1)
+        return SimpleNamespace(post=SimpleNamespace(uri=post_uri, cid=f"cid-{post_uri}"), parent=parent)
+
+
+def uri(i):
+    return f"at://did:plc:someuser/app.bsky.feed.post/post-{i}"
+
+
+def chain_length(node):
+    length = 0
+    while node is not None:
+        length += 1
+        node = node.parent
+    return length
+
+
+def test_ancestor_of_truncated_chain_is_a_miss():
+    client = FakeThreadClient(20)
+    cache = ThreadCache(parent_height=5)
+
+    cache.get_thread(client, uri(19))
+    # post-17 liegt zwei Ebenen tiefer, im Cache nur noch 3 statt 5 Vorfahren
+    node = cache.get_thread(client, uri(17))
+
+    assert client.calls == [(uri(19), 5), (uri(17), 5)]
+    assert chain_length(node) == 6
+
+
+def test_ancestor_of_complete_chain_is_a_hit():
+    client = FakeThreadClient(4)
+    cache = ThreadCache(parent_height=5)
+
+    cache.get_thread(client, uri(3))
+    node = cache.get_thread(client, uri(1))  # Kette reicht bis zum Thread-Anfang
+
+    assert len(client.calls) == 1
+    assert chain_length(node) == 2
+    assert cache.stats()['hits'] == 1
+
+
+def test_splices_new_reply_onto_cached_parent_with_full_context():
+    client = FakeThreadClient(20)
+    cache = ThreadCache(parent_height=5)
+
+    cache.get_thread(client, uri(18))
+    node = cache.get_thread(client, uri(19), parent_uri=uri(18))
+
+    # Nur der neue Post wird geladen, die Vorfahren kommen aus dem Cache
+    assert client.calls[-1] == (uri(19), 0)
+    assert cache.stats()['spliced'] == 1
+    assert chain_length(node) >= 6
+
+
+def test_no_splice_onto_shortened_ancestor():
+    client = FakeThreadClient(20)
+    cache = ThreadCache(parent_height=5)
+
+    cache.get_thread(client, uri(19))
+    # post-16 ist nur als Vorfahre mit 2 Ebenen gecacht - ein Reply darauf braucht 4
+    node = cache.get_thread(client, uri(17), parent_uri=uri(16))
+
+    assert client.calls[-1] == (uri(17), 5)
+    assert cache.stats()['spliced'] == 0
+    assert chain_length(node) == 6
+
+
+def test_shorter_chain_does_not_replace_longer_entry():
+    client = FakeThreadClient(20)
+    cache = ThreadCache(parent_height=5)
+
+    cache.get_thread(client, uri(15))
+    cache.get_thread(client, uri(17))  # enthält post-15 mit nur 3 Vorfahren
+    calls = len(client.calls)
+
+    assert chain_length(cache.get_thread(client, uri(15))) == 6
+    assert len(client.calls) == calls
@@ -0,0 +1,179 @@
+"""
+Persistente Arbeitswarteschlange: Zustände, Anläufe, Idempotenz und Fortsetzen nach Absturz
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from work_queue import WorkQueue
+
+BOT_DID = 'did:plc:sagematebot'
+TARGET_URI = 'at://did:plc:someuser/app.bsky.feed.post/target'
+
+
+@pytest.fixture
+def work_queue(tmp_path):
+    return WorkQueue(str(tmp_path / 'work_queue.sqlite3'), max_attempts=3)
+
+
+def pending_keys(work_queue, kind='mention', skip=()):
+    return [key for key, _, _ in work_queue.claim_pending(kind, skip=skip)]
+
+
+# --- WorkQueue ----------------------------------------------------------------
+
+def test_enqueue_returns_stored_state(work_queue):
+    assert work_queue.enqueue('a', 'mention', {'text': 'Hallo'}) == 'fetched'
+
+    work_queue.save('a', 'generated', {'text': 'Hallo', 'response': 'Antwort'}, target_uri=TARGET_URI)
+
+    # Erneut eingelesen (z.B. Notification nochmal gesehen) → Zwischenstand bleibt
+    assert work_queue.enqueue('a', 'mention', {'text': 'Hallo'}) == 'generated'
+    assert work_queue.load('a') == ('generated', {'text': 'Hallo', 'response': 'Antwort'})
+    assert work_queue.load('unbekannt') is None
+
+
+def test_claim_pending_resumes_from_last_state(tmp_path):
+    path = str(tmp_path / 'work_queue.sqlite3')
+    before = WorkQueue(path)
+    before.enqueue('a', 'mention', {})
+    before.enqueue('b', 'mention', {})
+    before.enqueue('c', 'dm', {})
+    before.save('a', 'posting', {'response': 'Antwort'}, target_uri=TARGET_URI)
+    before.set_state('b', 'posted')
+
+    # Neuer Prozess auf derselben Datei
+    after = WorkQueue(path)
+    assert after.claim_pending('mention') == [('a', 'posting', {'response': 'Antwort'})]
+    assert pending_keys(after, 'dm') == ['c']
+    assert pending_keys(after, skip={'a'}) == []
+
+
+def test_claim_pending_gives_up_after_max_attempts(work_queue):
+    work_queue.enqueue('a', 'mention', {})
+
+    for _ in range(3):
+        assert pending_keys(work_queue) == ['a']
+
+    assert pending_keys(work_queue) == []
+    assert work_queue.state('a') == 'dropped'
+
+
+def test_skipped_jobs_do_not_use_up_attempts(work_queue):
+    work_queue.enqueue('a', 'mention', {})
+
+    for _ in range(5):
+        assert pending_keys(work_queue, skip={'a'}) == []
+
+    assert pending_keys(work_queue) == ['a']
+
+
+def test_is_posted_only_for_posted_target(work_queue):
+    work_queue.enqueue('a', 'mention', {})
+    work_queue.save('a', 'posting', {}, target_uri=TARGET_URI)
+    assert not work_queue.is_posted(TARGET_URI)
+
+    work_queue.set_state('a', 'posted')
+    assert work_queue.is_posted(TARGET_URI)
+    assert not work_queue.is_posted('at://did:plc:someuser/app.bsky.feed.post/other')
+
+
+def test_purge_removes_only_old_finished_jobs(work_queue):
+    for key in ('old', 'open'):
+        work_queue.enqueue(key, 'mention', {})
+    work_queue.set_state('old', 'posted')
+
+    assert work_queue.purge(3600) == 0
+    assert work_queue.purge(-1) == 1
+    assert work_queue.state('old') is None
+    assert work_queue.state('open') == 'fetched'
+    assert work_queue.stats() == {'fetched': 1}
+
+
+# --- post_job -----------------------------------------------------------------
+
+class FakeBlueskyClient:
+    """get_post_thread des Ziel-Posts mit den vorhandenen Replies"""
+
+    def __init__(self, reply_dids=()):
+        self.me = SimpleNamespace(did=BOT_DID)
+        self.reply_dids = list(reply_dids)
+
+    def get_post_thread(self, uri, depth, parent_height):
+        replies = [SimpleNamespace(post=SimpleNamespace(author=SimpleNamespace(did=did)))
+                   for did in self.reply_dids]
+        return SimpleNamespace(thread=SimpleNamespace(replies=replies))
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    """main mit Warteschlange in tmp_path; Posten wird nur mitgeschrieben"""
+    monkeypatch.setattr(main, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(main, '_work_queue', None)
+    posted = []
+
+    def reply_to_mention(client, target, response, dry_run=False):
+        posted.append((target['uri'], response))
+        return True
+
+    monkeypatch.setattr(main, 'reply_to_mention', reply_to_mention)
+    return SimpleNamespace(work_queue=main.get_work_queue(), posted=posted)
+
+
+def queued_job(bot, key, state='generated'):
+    """Job wie ihn queue_jobs nach einem Neustart liefert"""
+    job = main.new_job('mention', {'uri': key})
+    job.update(reply_target={'uri': TARGET_URI, 'cid': 'bafyreitarget'}, response='Antwort')
+    bot.work_queue.enqueue(job['key'], 'mention', job)
+    bot.work_queue.save(job['key'], state, job, target_uri=TARGET_URI)
+    key, state, job = bot.work_queue.claim_pending('mention')[0]
+    job['state'] = state
+    job['queued'] = True
+    return job
+
+
+def replies(result):
+    return main._replies_total.value(kind='mention', result=result)
+
+
+def test_crash_while_posting_with_reply_already_there(bot):
+    job = queued_job(bot, 'at://did:plc:someuser/app.bsky.feed.post/m1', state='posting')
+    skipped = replies('skipped')
+    failed = replies('failed')
+
+    main.post_job(FakeBlueskyClient(reply_dids=['did:plc:jemand', BOT_DID]), job)
+
+    assert bot.posted == []
+    assert bot.work_queue.state(job['key']) == 'posted'
+    assert replies('skipped') == skipped + 1
+    assert replies('failed') == failed
+
+
+def test_crash_while_posting_without_reply_posts_once(bot):
+    job = queued_job(bot, 'at://did:plc:someuser/app.bsky.feed.post/m1', state='posting')
+
+    main.post_job(FakeBlueskyClient(reply_dids=['did:plc:jemand']), job)
+
+    assert bot.posted == [(TARGET_URI, 'Antwort')]
+    assert job['success']
+    assert bot.work_queue.is_posted(TARGET_URI)
+
+
+def test_second_job_for_answered_target_is_not_posted(bot):
+    first = queued_job(bot, 'at://did:plc:someuser/app.bsky.feed.post/m1')
+    main.post_job(FakeBlueskyClient(), first)
+    assert bot.work_queue.state(first['key']) == 'posted'
+
+    # Andere Mention (z.B. DM) mit demselben Ziel-Post
+    second = queued_job(bot, 'at://did:plc:someuser/app.bsky.feed.post/m2')
+    skipped = replies('skipped')
+    failed = replies('failed')
+    main.post_job(FakeBlueskyClient(), second)
+
+    assert len(bot.posted) == 1
+    assert not second['success']
+    assert bot.work_queue.state(second['key']) == 'dropped'
+    assert replies('skipped') == skipped + 1
+    assert replies('failed') == failed
@@ -0,0 +1,197 @@
+"""
+Snapshot-Cache für Bluesky-Threads (get_post_thread)
+
+Ohne Cache wird derselbe Thread pro Mention mehrfach geladen: einmal in
+get_parent_post bzw. get_post_from_dm_embed und gleich danach nochmal in
+get_thread_context. Der Cache sorgt dafür, dass jeder Thread pro
+Verarbeitungszyklus nur einmal geladen wird:
+
+- Schlüssel ist die Post-URI; ist die CID bekannt, muss sie passen
+  (sonst gilt der Snapshot als veraltet)
+- Jeder Vorfahre im geladenen Thread wird mit indexiert, zusammen mit der
+  Anzahl Vorfahren die über ihm noch mitgeladen wurden. Ein Post der schon
+  als Parent eines anderen Posts geladen wurde ist nur dann ein Treffer,
+  wenn seine Kette so lang ist wie bei einem eigenen Aufruf (parent_height)
+  oder bis zum Thread-Anfang reicht - sonst bekäme Claude je nach
+  Cache-Reihenfolge weniger Kontext
+- Gleichzeitige Anfragen für dieselbe URI (mehrere Pipeline-Worker)
+  führen nur zu einem einzigen API-Aufruf (Single-Flight)
+- Ist der Parent eines neuen Posts schon im Cache, wird nur der neue
+  Post geladen und an die gecachten Vorfahren angehängt
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class SplicedNode:
+    """Thread-Knoten aus frisch geladenem Post und gecachten Vorfahren"""
+
+    def __init__(self, post, parent):
+        self.post = post
+        self.parent = parent
+
+
+class ThreadCache:
+    """
+    Cache für Thread-Knoten (ThreadViewPost) mit TTL und LRU-Begrenzung
+
+    Args:
+        ttl: Sekunden bis ein Snapshot als veraltet gilt
+        max_entries: Max. Anzahl gecachter Knoten
+        parent_height: Wie viele Vorfahren beim vollen Laden geholt werden
+    """
+
+    def __init__(self, ttl=300, max_entries=1000, parent_height=10):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.parent_height = parent_height
+        self.hits = 0
+        self.misses = 0
+        self.spliced = 0
+
+        # uri -> (zeitpunkt, knoten, Vorfahren-Ebenen über dem Knoten)
+        self._nodes = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get_thread(self, client, uri, cid=None, parent_uri=None):
+        """
+        Liefert den Thread-Knoten eines Posts (mit Vorfahren über .parent)
+
+        Args:
+            client: Bluesky Client
+            uri: URI des Posts
+            cid: CID falls bekannt (Snapshot muss dazu passen)
+            parent_uri: URI des Parent-Posts falls bekannt - ist er gecacht,
+                        wird nur der Post selbst geladen
+        """
+        while True:
+            with self._lock:
+                node = self._lookup(uri, cid, self.parent_height)
+                if node is not None:
+                    self.hits += 1
+                    return node
+
+                event = self._in_flight.get(uri)
+                if event is None:
+                    # Dieser Thread lädt, alle anderen warten auf das Ergebnis
+                    self.misses += 1
+                    event = threading.Event()
+                    self._in_flight[uri] = event
+                    break
+
+            event.wait()
+            with self._lock:
+                node = self._lookup(uri, cid, self.parent_height)
+                if node is not None:
+                    self.hits += 1
+                    return node
+            # Laden ist fehlgeschlagen → selbst versuchen
+
+        try:
+            node, complete = self._fetch(client, uri, parent_uri)
+            self._store(node, complete)
+            return node
+        finally:
+            with self._lock:
+                self._in_flight.pop(uri, None)
+            event.set()
+
+    def _fetch(self, client, uri, parent_uri):
+        """
+        Lädt einen Thread - nur den Post selbst wenn der Parent gecacht ist
+
+        Returns:
+            (Knoten, True wenn die Kette bis zum Thread-Anfang reicht)
+        """
+        if parent_uri:
+            # Der Parent braucht eine Ebene weniger als ein voller Aufruf
+            with self._lock:
+                parent = self._lookup(parent_uri, None, self.parent_height - 1)
+
+            if parent is not None:
+                response = client.get_post_thread(uri=uri, depth=0, parent_height=0)
+                with self._lock:
+                    self.spliced += 1
+                return SplicedNode(response.thread.post, parent), False
+
+        response = client.get_post_thread(uri=uri, depth=0, parent_height=self.parent_height)
+        # Weniger Vorfahren als angefragt → die Kette ist nicht abgeschnitten
+        return response.thread, len(self._chain(response.thread)) <= self.parent_height
+
+    def _lookup(self, uri, cid, height):
+        """
+        Sucht einen frischen Knoten mit mindestens height Vorfahren-Ebenen
+        (Lock muss gehalten werden)
+        """
+        entry = self._entry(uri)
+        if entry is None:
+            return None
+
+        _, node, stored_height = entry
+        if stored_height < height:
+            return None
+
+        if cid and getattr(node.post, 'cid', None) != cid:
+            return None
+
+        self._nodes.move_to_end(uri)
+        return node
+
+    def _entry(self, uri):
+        """Eintrag falls vorhanden und nicht abgelaufen (Lock muss gehalten werden)"""
+        entry = self._nodes.get(uri)
+        if entry is not None and time.monotonic() - entry[0] > self.ttl:
+            del self._nodes[uri]
+            return None
+        return entry
+
+    @staticmethod
+    def _chain(node):
+        """Der Knoten und seine Vorfahren (nur echte Posts, keine NotFound/Blocked)"""
+        chain = []
+        while node is not None and hasattr(node, 'post'):
+            chain.append(node)
+            node = getattr(node, 'parent', None)
+        return chain
+
+    def _store(self, node, complete=False):
+        """
+        Speichert einen Knoten und alle Vorfahren unter ihrer URI
+
+        Ein Vorfahre in Tiefe k hat nur noch parent_height - k Ebenen über
+        sich, ausser die Kette reicht bis zum Thread-Anfang (complete).
+        Ein vorhandener Eintrag mit längerer Kette wird nicht verkürzt.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            for depth, current in enumerate(self._chain(node)):
+                height = self.parent_height if complete else self.parent_height - depth
+                if height < 0:
+                    break
+
+                uri = current.post.uri
+                existing = self._entry(uri)
+                if existing is not None and existing[2] > height and depth > 0:
+                    continue
+
+                self._nodes[uri] = (now, current, height)
+                self._nodes.move_to_end(uri)
+
+            while len(self._nodes) > self.max_entries:
+                self._nodes.popitem(last=False)
+
+    def stats(self):
+        """Treffer, Fehlgriffe und angehängte Vorfahren seit Prozessstart"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'spliced': self.spliced,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._nodes)
+            }
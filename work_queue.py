@@ -0,0 +1,193 @@
+"""
+Persistente Arbeitswarteschlange für Mentions und DMs
+
+Jede Mention/DM wird beim Einlesen lokal gespeichert und durchläuft die
+Zustände
+
+    fetched → enriched → generated → posting → posted
+                                               (bzw. dropped)
+
+Nach jeder Pipeline-Stufe wird der Job samt Zwischenergebnissen (Kontext,
+generierte Antwort) gesichert. Nach einem Absturz geht es beim nächsten
+Start ab der letzten abgeschlossenen Stufe weiter - eine bereits bezahlte
+Claude-Antwort wird nicht neu generiert.
+
+Als Idempotenz-Schlüssel beim Posten dient die URI des Ziel-Posts: Wurde
+auf eine URI schon geantwortet, wird nicht nochmal gepostet.
+
+SQLite im WAL-Modus unter DATA_DIR.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Zustände in Verarbeitungsreihenfolge
+STATES = ('fetched', 'enriched', 'generated', 'posting', 'posted', 'dropped')
+DONE_STATES = ('posted', 'dropped')
+
+
+class WorkQueue:
+    """
+    SQLite-basierte Warteschlange mit Zustand pro Job
+
+    Args:
+        path: Pfad der SQLite-Datei
+        max_attempts: Nach so vielen Anläufen wird ein Job verworfen
+        encode: Funktion für json.dumps(default=...) (z.B. für API-Modelle)
+        decode: Funktion payload_dict -> payload_dict nach json.loads
+    """
+
+    def __init__(self, path, max_attempts=3, encode=None, decode=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_attempts = max_attempts
+        self.encode = encode
+        self.decode = decode
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                state TEXT NOT NULL,
+                target_uri TEXT,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, kind)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS jobs_target ON jobs (target_uri, state)')
+        self._db.commit()
+
+    def _dumps(self, payload):
+        return json.dumps(payload, default=self.encode, ensure_ascii=False)
+
+    def _loads(self, text):
+        payload = json.loads(text)
+        return self.decode(payload) if self.decode else payload
+
+    def enqueue(self, key, kind, payload):
+        """
+        Nimmt einen neu eingelesenen Job auf (Zustand 'fetched')
+
+        Returns:
+            Zustand des Jobs - 'fetched' wenn neu, sonst der gespeicherte
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR IGNORE INTO jobs (key, kind, state, payload, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, kind, 'fetched', self._dumps(payload), now, now)
+            )
+            self._db.commit()
+            row = self._db.execute('SELECT state FROM jobs WHERE key = ?', (key,)).fetchone()
+        return row[0]
+
+    def save(self, key, state, payload, target_uri=None):
+        """Sichert Zustand und Zwischenergebnisse eines Jobs"""
+        with self._lock:
+            self._db.execute(
+                'UPDATE jobs SET state = ?, payload = ?, target_uri = COALESCE(?, target_uri), '
+                'updated_at = ? WHERE key = ?',
+                (state, self._dumps(payload), target_uri, time.time(), key)
+            )
+            self._db.commit()
+
+    def set_state(self, key, state):
+        """Ändert nur den Zustand (z.B. 'posted' oder 'dropped')"""
+        with self._lock:
+            self._db.execute(
+                'UPDATE jobs SET state = ?, updated_at = ? WHERE key = ?',
+                (state, time.time(), key)
+            )
+            self._db.commit()
+
+    def state(self, key):
+        """Gespeicherter Zustand eines Jobs (None wenn unbekannt)"""
+        with self._lock:
+            row = self._db.execute('SELECT state FROM jobs WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def load(self, key):
+        """Zustand und Payload eines Jobs (None wenn unbekannt)"""
+        with self._lock:
+            row = self._db.execute('SELECT state, payload FROM jobs WHERE key = ?', (key,)).fetchone()
+        return (row[0], self._loads(row[1])) if row else None
+
+    def is_posted(self, target_uri):
+        """True wenn auf diese URI schon geantwortet wurde (Idempotenz beim Posten)"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM jobs WHERE target_uri = ? AND state = 'posted' LIMIT 1",
+                (target_uri,)
+            ).fetchone()
+        return row is not None
+
+    def claim_pending(self, kind, skip=()):
+        """
+        Liefert alle unfertigen Jobs einer Art (älteste zuerst) und zählt den Anlauf
+
+        Jobs die schon max_attempts Anläufe hatten, werden verworfen.
+
+        Args:
+            kind: 'mention' oder 'dm'
+            skip: Schlüssel die gerade anderswo laufen (werden nicht geliefert)
+
+        Returns:
+            Liste von (key, state, payload)
+        """
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT key, state, payload, attempts FROM jobs '
+                'WHERE kind = ? AND state NOT IN (?, ?) ORDER BY created_at',
+                (kind, *DONE_STATES)
+            ).fetchall()
+
+            pending = []
+            now = time.time()
+            for key, state, payload, attempts in rows:
+                if key in skip:
+                    continue
+                if attempts >= self.max_attempts:
+                    print(f"⚠️ Job {key} nach {attempts} Anläufen verworfen (Zustand: {state})")
+                    self._db.execute(
+                        "UPDATE jobs SET state = 'dropped', updated_at = ? WHERE key = ?",
+                        (now, key)
+                    )
+                    continue
+
+                self._db.execute(
+                    'UPDATE jobs SET attempts = attempts + 1 WHERE key = ?', (key,)
+                )
+                pending.append((key, state, payload))
+
+            self._db.commit()
+
+        return [(key, state, self._loads(payload)) for key, state, payload in pending]
+
+    def purge(self, max_age):
+        """Entfernt abgeschlossene Jobs die älter als max_age Sekunden sind"""
+        with self._lock:
+            cursor = self._db.execute(
+                'DELETE FROM jobs WHERE state IN (?, ?) AND updated_at < ?',
+                (*DONE_STATES, time.time() - max_age)
+            )
+            self._db.commit()
+        return cursor.rowcount
+
+    def stats(self):
+        """Anzahl Jobs pro Zustand"""
+        with self._lock:
+            rows = self._db.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall()
+        return {state: count for state, count in rows}